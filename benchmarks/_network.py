@@ -0,0 +1,78 @@
+import random
+import sqlite3
+from pathlib import Path
+
+from logistics.database.setup import setup_new_database
+
+
+def create_network_database(
+        db_path: Path,
+        *,
+        warehouses: int,
+        connections_per_warehouse: int = 3,
+        products: int = 100,
+        stocked_fraction: float = 0.2,
+        seed: int = 42
+) -> None:
+    """
+    Creates a synthetic, strongly connected network for the benchmarks.
+    Warehouses are placed on a ring (so every warehouse is reachable) with extra random shortcuts, all two-way.
+    """
+    rng = random.Random(seed)  # noqa: S311 - Deterministic benchmark data, not cryptography
+    setup_new_database(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, ?, ?)",
+            ((i, f"warehouse {i}", f"region {i % 16}/site {i}", 10**12) for i in range(1, warehouses + 1))
+        )
+
+        edges: set[tuple[int, int]] = set()
+        for i in range(1, warehouses + 1):
+            edges.add((i, i % warehouses + 1))
+            for _ in range(connections_per_warehouse - 1):
+                j = rng.randint(1, warehouses)
+                if j != i:
+                    edges.add((i, j))
+        conn.executemany(
+            "INSERT INTO connections (source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way) "
+            "VALUES (?, ?, ?, 1)",
+            [(source, target, rng.randint(10, 600)) for source, target in sorted(edges)]
+        )
+
+        conn.executemany(
+            "INSERT INTO products (id, name, barcode, volume_cm) VALUES (?, ?, ?, ?)",
+            ((i, f"product {i}", i, rng.randint(1, 1000)) for i in range(1, products + 1))
+        )
+        conn.executemany(
+            "INSERT INTO stock (warehouse_id, product_id, count) VALUES (?, ?, ?)",
+            (
+                (w, p, rng.randint(1, 1000))
+                for w in range(1, warehouses + 1)
+                for p in range(1, products + 1)
+                if rng.random() < stocked_fraction
+            )
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def create_grid_connections(side: int, seed: int = 42) -> list[tuple[int, int, int, int]]:
+    """
+    In-memory, road-like network: a side x side grid of two-way connections with random travel times.
+    Returns the same rows as `Database.get_routing_graph`: (connection_id, source_id, target_id, minutes)
+    """
+    rng = random.Random(seed)  # noqa: S311 - Deterministic benchmark data, not cryptography
+    rows: list[tuple[int, int, int, int]] = []
+    for row in range(side):
+        for column in range(side):
+            node = row * side + column + 1
+            for neighbour in (node + 1 if column + 1 < side else None, node + side if row + 1 < side else None):
+                if neighbour is None:
+                    continue
+                minutes = rng.randint(10, 60)
+                rows.append((len(rows) + 1, node, neighbour, minutes))
+                rows.append((len(rows) + 1, neighbour, node, minutes))
+    return rows
@@ -0,0 +1,104 @@
+import http.client
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics.database.database import Database
+from logistics.database.read_cache import ReadCache
+from logistics.pipeline_loops.api_loop import API_CACHE_SIZE, ApiServer
+
+WAREHOUSES: int = 2000
+TRANSPORTS: int = 2000
+CONNECTIONS: int = 4  # Of the pool
+CLIENTS: int = 8
+REQUESTS_PER_CLIENT: int = 250
+
+
+def dispatch(database: Database) -> None:
+    rng = random.Random(3)  # noqa: S311
+    stock: dict[int, dict[int, int]] = {}
+    for warehouse_id, product_id, count in database.get_stock_of_products(range(1, 101)):
+        stock.setdefault(warehouse_id, {})[product_id] = count
+    transports = []
+    for connection_id, source, target, _ in rng.sample(database.get_routing_graph(), TRANSPORTS):
+        if source in stock:
+            product_id = next(iter(stock[source]))
+            if stock[source][product_id] > 0:
+                stock[source][product_id] -= 1
+                transports.append((source, target, [connection_id], {product_id: 1}))
+    database.create_transports(transports, start_time=0)
+
+
+def load(server: ApiServer, paths: list[str], conditional: bool) -> tuple[float, list[float]]:
+    """`CLIENTS` threads polling over keep-alive connections, returns the seconds and the latencies."""
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(seed: int) -> None:
+        rng = random.Random(seed)  # noqa: S311
+        conn = http.client.HTTPConnection(*server.server_address)
+        etags: dict[str, str] = {}
+        own: list[float] = []
+        try:
+            for _ in range(REQUESTS_PER_CLIENT):
+                path = rng.choice(paths)
+                headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+                start = time.perf_counter()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                own.append(time.perf_counter() - start)
+                if response.status not in (200, 304):
+                    raise RuntimeError(f"{path}: {response.status}")
+                etags[path] = response.getheader("ETag")
+        finally:
+            conn.close()
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(CLIENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_network_database(db_path, warehouses=WAREHOUSES)
+        dispatch(Database(db_path))
+        print(f"{WAREHOUSES} warehouses, {TRANSPORTS} transports, {CLIENTS} clients, {CONNECTIONS} connections")
+
+        server = ApiServer(db_path, 0, CONNECTIONS)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            scenarios = [
+                # Every request a different warehouse, nothing is served from the response cache
+                ("warehouse details, uncached", [f"/warehouses/{i}" for i in range(1, WAREHOUSES + 1)], False),
+                ("product distribution, uncached", [f"/products/{i}/distribution" for i in range(1, 101)], False),
+                ("listings, cached", ["/warehouses", "/transports/active", "/transports/etas"], False),
+                ("listings, If-None-Match", ["/warehouses", "/transports/active", "/transports/etas"], True),
+            ]
+            for label, paths, conditional in scenarios:
+                server.cache = ReadCache(API_CACHE_SIZE)  # Every scenario starts cold
+                seconds, latencies = load(server, paths, conditional)
+                latencies.sort()
+                print(
+                    f"  {label}: {len(latencies) / seconds:,.0f} requests/s, "
+                    f"p50 {statistics.median(latencies) * 1000:.2f} ms, "
+                    f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms"
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
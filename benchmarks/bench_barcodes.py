@@ -0,0 +1,68 @@
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from logistics.database.barcodes import product_barcode
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+
+PRODUCTS: int = 50_000
+SCANS: int = 100_000
+DISTINCT_SCANNED: int = 5000  # Products in a delivery
+UNKNOWN_FRACTION: float = 0.01
+
+
+def main() -> None:
+    rng = random.Random(13)  # noqa: S311
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        setup_new_database(db_path)
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute(
+                "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (1, 'w', 'l', ?)", (10**12,)
+            )
+            conn.executemany(
+                "INSERT INTO products (id, name, barcode, volume_cm) VALUES (?, ?, ?, 1)",
+                ((i, f"product {i}", product_barcode(i)) for i in range(1, PRODUCTS + 1))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        database = Database(db_path)
+
+        delivery = [product_barcode(i) for i in rng.sample(range(1, PRODUCTS + 1), DISTINCT_SCANNED)]
+        unknown = [product_barcode(PRODUCTS + i) for i in range(1, 100)]
+        scans = [
+            rng.choice(unknown) if rng.random() < UNKNOWN_FRACTION else rng.choice(delivery) for _ in range(SCANS)
+        ]
+        print(f"{PRODUCTS} products, {SCANS} scans of {DISTINCT_SCANNED} products")
+
+        start = time.perf_counter()
+        for barcode in delivery[:1000]:
+            database.get_product_by_barcode(barcode)
+        seconds = time.perf_counter() - start
+        print(f"  get_product_by_barcode: {1000 / seconds:,.0f} lookups/s")
+
+        start = time.perf_counter()
+        for barcode in delivery[:100]:
+            database._cursor.execute("SELECT id FROM products NOT INDEXED WHERE barcode = ?", (barcode,)).fetchone()
+        seconds = time.perf_counter() - start
+        print(f"  without the index: {100 / seconds:,.0f} lookups/s")
+
+        start = time.perf_counter()
+        database.resolve_barcodes(set(scans))
+        seconds = time.perf_counter() - start
+        print(f"  resolve_barcodes: {SCANS / seconds:,.0f} scans/s")
+
+        # The stock capacity trigger sums the warehouse stock for every product added, it dominates the intake
+        start = time.perf_counter()
+        skipped = database.add_scanned_stock(1, scans)
+        seconds = time.perf_counter() - start
+        print(f"  add_scanned_stock: {SCANS / seconds:,.0f} scans/s ({len(skipped)} unknown barcodes)")
+
+
+if __name__ == "__main__":
+    main()
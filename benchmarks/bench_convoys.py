@@ -0,0 +1,80 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+HUBS: int = 4  # Fully connected, two-way
+SPOKES_PER_HUB: int = 50  # Two-way to their hub only, every transport goes through one or two hubs
+WAVES: int = 5  # Dispatch minutes, 10 minutes apart
+TRANSPORTS_PER_WAVE: int = 2_000
+
+
+def create_database(db_path: Path, convoys: bool) -> Database:
+    setup_new_database(db_path)
+    database = Database(db_path, synchronous=False, convoys=convoys)
+    hubs = database.add_warehouses([(f"hub {i}", "hub", 10**12) for i in range(HUBS)])
+    spokes = database.add_warehouses(
+        [(f"spoke {i}", f"hub {i % HUBS}", 10**12) for i in range(HUBS * SPOKES_PER_HUB)]
+    )
+    database.add_transport_routes(
+        [(hubs[i], hubs[j], 120, True) for i in range(HUBS) for j in range(i + 1, HUBS)]
+        + [(spoke, hubs[i % HUBS], 30, True) for i, spoke in enumerate(spokes)]
+    )
+    database.add_product("parcel", 1)
+    for spoke in spokes:
+        database.add_stock(spoke, 1, WAVES * TRANSPORTS_PER_WAVE)
+    return database
+
+
+def measure(db_path: Path, convoys: bool) -> None:
+    rng = random.Random(7)  # noqa: S311
+    database = create_database(db_path, convoys)
+    spokes = [warehouse[0] for warehouse in database.get_warehouses() if warehouse[1].startswith("spoke")]
+    router = Router()
+    router.refresh(database)
+
+    ticks = rows = 0
+    seconds = 0.0
+
+    def run_until(minute: int | None) -> None:
+        nonlocal ticks, rows, seconds
+        while (due := database.get_next_arrival_minute()) is not None and (minute is None or due <= minute):
+            changes = database._conn.total_changes
+            start = time.perf_counter()
+            _run_update(database, router, due)
+            seconds += time.perf_counter() - start
+            rows += database._conn.total_changes - changes
+            ticks += 1
+
+    for wave in range(WAVES):
+        run_until(wave * 10)
+        transports = []
+        for _ in range(TRANSPORTS_PER_WAVE):
+            source, target = rng.sample(spokes, 2)
+            transports.append((source, target, router.find_path(source, target).connection_ids, {1: 1}))
+        database.create_transports(transports, start_time=wave * 10)
+    run_until(None)
+
+    legs, convoy_count = database._cursor.execute(
+        "SELECT COUNT(*), (SELECT COUNT(*) FROM convoys) FROM transport_routes"
+    ).fetchone()
+    print(
+        f"convoys {'on ' if convoys else 'off'}: {ticks} ticks, {rows:,} rows written "
+        f"({rows / ticks:,.0f} per tick), {seconds:.2f}s in the ticks, {legs:,} legs"
+        + (f" in {convoy_count:,} convoys ({legs / convoy_count:.1f} legs each)" if convoys else "")
+    )
+
+
+def main() -> None:
+    for convoys in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            measure(Path(tmp) / "bench.sqlite", convoys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics.database.database import Database
+from logistics.pipeline_loops.dispatch import dispatch_transports
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.router import Router
+
+WAREHOUSES = 2_000
+DISPATCHES = 2_000
+
+
+def main() -> None:
+    rng = random.Random(7)  # noqa: S311
+    for batch_size in (1, 10, 100):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "bench.sqlite"
+            create_network_database(db_path, warehouses=WAREHOUSES, products=50, stocked_fraction=0.2)
+            with sqlite3.connect(db_path) as conn:
+                stocked = conn.execute("SELECT warehouse_id, product_id FROM stock WHERE count > 0").fetchall()
+            database = Database(db_path)
+            router = Router()
+            router.refresh(database)  # The graph is loaded once, like in a running console
+            clock = VirtualClock()
+            clock.set_scale(0)
+
+            requests = []
+            for source, product in rng.sample(stocked, DISPATCHES):
+                target = rng.randint(1, WAREHOUSES)
+                requests.append((source, target if target != source else source % WAREHOUSES + 1, {product: 1}))
+
+            # The transaction alone: stock, cargo, capacity check, route plan and first leg
+            started = time.perf_counter()
+            routed = [
+                (source, target, router.find_path(source, target).connection_ids, stock)
+                for source, target, stock in requests[DISPATCHES // 2:]
+            ]
+            routing = time.perf_counter() - started
+            started = time.perf_counter()
+            for i in range(0, len(routed), batch_size):
+                database.dispatch_transports(routed[i:i + batch_size], 0, router.graph_version)
+            writing = time.perf_counter() - started
+
+            # Routing included, the way the console dispatches
+            started = time.perf_counter()
+            for i in range(0, DISPATCHES // 2, batch_size):
+                dispatch_transports(database, router, clock, requests[i:i + batch_size])
+            pipeline = time.perf_counter() - started
+
+            count = DISPATCHES // 2
+            print(
+                f"{batch_size:>3} per transaction: writing {count / writing:>6,.0f}/s, "
+                f"routing {count / routing:>4,.0f}/s (Dijkstra, {WAREHOUSES} warehouses), "
+                f"dispatching with routing {count / pipeline:>4,.0f}/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import heapq
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks._network import create_grid_connections
+from logistics.routing.graph import CSRGraph, find_path
+
+QUERIES: int = 200
+
+type AdjacencyMap = dict[int, list[tuple[int, int, int]]]
+
+
+def build_adjacency_map(connections: list[tuple[int, int, int, int]]) -> AdjacencyMap:
+    """The dict-of-lists representation the CSR graph replaced, kept here as the baseline."""
+    graph: AdjacencyMap = {}
+    for conn_id, src, tgt, cost in connections:
+        if src not in graph:
+            graph[src] = []
+        graph[src].append((cost, tgt, conn_id))
+    return graph
+
+
+def find_path_adjacency_map(graph: AdjacencyMap, source: int, target: int) -> tuple[int, list[int]] | None:
+    pq = [(0, source)]
+    min_costs = {source: 0}
+    predecessors: dict[int, tuple[int, int]] = {}
+    while pq:
+        cost, u = heapq.heappop(pq)
+        if u == target:
+            path = []
+            while u != source:
+                u, conn_id = predecessors[u]
+                path.append(conn_id)
+            return cost, path[::-1]
+        if cost > min_costs[u]:
+            continue
+        for edge_cost, v, conn_id in graph.get(u, ()):
+            new_cost = cost + edge_cost
+            if new_cost < min_costs.get(v, float('inf')):
+                min_costs[v] = new_cost
+                predecessors[v] = (u, conn_id)
+                heapq.heappush(pq, (new_cost, v))
+    return None
+
+
+def measure_build(build: Callable[[], object]) -> tuple[object, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    graph = build()
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph, elapsed, memory
+
+
+def main() -> None:
+    rng = random.Random(5)  # noqa: S311
+    # ~10k and ~100k directed edges
+    for side in (50, 159):
+        connections = create_grid_connections(side)
+        nodes = side * side
+        queries = [(rng.randint(1, nodes), rng.randint(1, nodes)) for _ in range(QUERIES)]
+        print(f"{nodes} warehouses, {len(connections)} edges")
+
+        dict_graph, dict_build, dict_memory = measure_build(lambda c=connections: build_adjacency_map(c))
+        csr_graph, csr_build, csr_memory = measure_build(lambda c=connections: CSRGraph.from_connections(c))
+
+        start = time.perf_counter()
+        for source, target in queries:
+            find_path_adjacency_map(dict_graph, source, target)
+        dict_query = (time.perf_counter() - start) / QUERIES
+
+        start = time.perf_counter()
+        for source, target in queries:
+            find_path(csr_graph, source, target)
+        csr_query = (time.perf_counter() - start) / QUERIES
+
+        for name, build, memory, query in (
+            ("dict", dict_build, dict_memory, dict_query),
+            ("csr", csr_build, csr_memory, csr_query),
+        ):
+            print(
+                f"  {name:<5} memory {memory / 1024:9.1f} KiB ({memory / len(connections):6.1f} B/edge), "
+                f"build {build * 1000:8.2f} ms, query {query * 1000:7.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics.database.database import Database
+from logistics.database.journal import EventJournal
+from logistics.database.replay import replay_journal
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+WAREHOUSES: int = 200
+MINUTES: int = 2 * 24 * 60
+DISPATCH_EVERY: int = 10  # Virtual minutes between two dispatch batches
+DISPATCH_BATCH: int = 20
+
+
+def run_workload(database: Database) -> float:
+    """Dispatches, arrivals, unloads and stock changes of two virtual days. Returns the seconds it took."""
+    rng = random.Random(3)  # noqa: S311
+    router = Router()
+    router.refresh(database)
+    start = time.perf_counter()
+    for minute in range(1, MINUTES + 1):
+        if minute % DISPATCH_EVERY == 0:
+            transports = []
+            for _ in range(DISPATCH_BATCH):
+                source, target = rng.sample(range(1, WAREHOUSES + 1), 2)
+                path = router.find_path(source, target)
+                database.add_stock(source, 1, 10)
+                transports.append((source, target, path.connection_ids, {1: 10}))
+            database.create_transports(transports, start_time=minute)
+        _run_update(database, router, minute)
+    database.flush_journal()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path, journaled_path, journal_path = (Path(tmp) / name for name in ("plain", "journaled", "journal"))
+        for db_path in (plain_path, journaled_path):
+            create_network_database(db_path, warehouses=WAREHOUSES)
+
+        plain_seconds = run_workload(Database(plain_path))
+        journal = EventJournal(journal_path)
+        journaled_seconds = run_workload(Database(journaled_path, journal))
+        events = journal.last_sequence
+
+        print(f"{WAREHOUSES} warehouses, {MINUTES} virtual minutes, {events} journaled events")
+        print(
+            f"  live: {plain_seconds:.2f}s without the journal, {journaled_seconds:.2f}s with it "
+            f"({(journaled_seconds / plain_seconds - 1) * 100:+.1f}%)"
+        )
+
+        # The network itself was not created through the journal, start from a snapshot of it
+        snapshot_path = Path(tmp) / "snapshot"
+        create_network_database(snapshot_path, warehouses=WAREHOUSES)
+        report = replay_journal(journal_path, Path(tmp) / "replayed", snapshot_path=snapshot_path)
+        print(
+            f"  replay: {report.events} events in {report.seconds:.2f}s "
+            f"({report.events / report.seconds:.0f} events/s, {MINUTES * 60 / report.seconds:.0f}x virtual time)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import inspect
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics import metrics
+from logistics.database.database import Database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+WAREHOUSES: int = 500
+TRANSPORTS: int = 3000
+ROUNDS: int = 3  # Alternating runs of both variants, the best of each is kept
+
+
+class UninstrumentedDatabase(Database):
+    """`Database` without the latency histogram of its operations."""
+    __slots__ = ()
+
+
+for _name, _method in vars(Database).items():
+    if inspect.isfunction(_method) and hasattr(_method, "__wrapped__") and not _name.startswith(("_", "iter_")):
+        setattr(UninstrumentedDatabase, _name, _method.__wrapped__)
+
+
+def dispatch(database: Database) -> None:
+    rng = random.Random(7)  # noqa: S311
+    graph = database.get_routing_graph()
+    first_legs: dict[int, int] = {}
+    for connection_id, source, _, _ in graph:
+        first_legs.setdefault(source, connection_id)
+    stocked = [
+        (warehouse_id, product_id) for warehouse_id, product_id, _ in database.get_stock_of_products(range(1, 101))
+    ]
+    transports = []
+    for source, product_id in rng.choices(stocked, k=TRANSPORTS):
+        target = rng.randint(1, WAREHOUSES)
+        if target != source:
+            transports.append((source, target, [first_legs[source]], {product_id: 1}))
+    database.create_transports(transports, start_time=0)
+
+
+def run(database: Database, instrumented: bool) -> tuple[float, int]:
+    """Processes all the arrivals, with the tick metrics of the event loop if instrumented."""
+    router = Router()
+    ticks = 0
+    start = time.perf_counter()
+    while (minute := database.get_next_arrival_minute()) is not None:
+        tick_start = time.perf_counter()
+        _run_update(database, router, minute)
+        if instrumented:
+            metrics.LOOP_LAG_SECONDS.set(0)
+            metrics.TICK_SECONDS.observe(time.perf_counter() - tick_start)
+        ticks += 1
+    return time.perf_counter() - start, ticks
+
+
+def sql_observations() -> int:
+    return sum(cumulative[-1] for cumulative, _ in metrics.SQL_SECONDS.snapshot().values())
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = Path(tmp) / "base.sqlite"
+        create_network_database(base_path, warehouses=WAREHOUSES)
+        base = Database(base_path)
+        dispatch(base)
+        print(f"{WAREHOUSES} warehouses, {TRANSPORTS} transports routed to the end")
+
+        best: dict[bool, float] = {}
+        for i in range(ROUNDS):
+            for instrumented in (False, True):
+                db_path = Path(tmp) / f"run-{i}-{instrumented}.sqlite"
+                base.create_snapshot(db_path)
+                database = (Database if instrumented else UninstrumentedDatabase)(db_path)
+                observations = sql_observations()
+                seconds, ticks = run(database, instrumented)
+                best[instrumented] = min(best.get(instrumented, seconds), seconds)
+                if instrumented and i == 0:
+                    observations = sql_observations() - observations
+                    print(f"  {ticks} ticks, {observations / ticks:.1f} timed database operations per tick")
+
+        overhead = best[True] / best[False] - 1
+        print(f"  uninstrumented: {best[False]:.2f} s, instrumented: {best[True]:.2f} s ({overhead:+.1%})")
+
+        start = time.perf_counter()
+        for _ in range(100_000):
+            metrics.SQL_SECONDS.observe(0.001, "bench")
+        print(f"  one histogram observation: {(time.perf_counter() - start) / 100_000 * 1e6:.2f} µs")
+        start = time.perf_counter()
+        metrics.REGISTRY.expose()
+        print(f"  one scrape: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
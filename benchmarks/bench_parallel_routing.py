@@ -0,0 +1,81 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_grid_connections
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.pipeline_loops.arrivals import collect_arrivals, write_arrivals
+from logistics.routing.parallel import RoutingPool
+from logistics.routing.router import Router
+
+SIDE: int = 60
+WAVE: int = 2000  # Transports arriving in the same minute, none of them with a planned route
+ARRIVAL_MINUTE: int = 100
+WORKERS: list[int] = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def create_wave_database(db_path: Path) -> None:
+    """A grid network and a wave of transports that all end their first leg at `ARRIVAL_MINUTE`."""
+    rows = create_grid_connections(SIDE)
+    setup_new_database(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, 'grid', ?)",
+            ((i, f"warehouse {i}", 10**12) for i in range(1, SIDE * SIDE + 1))
+        )
+        conn.executemany(
+            "INSERT INTO connections "
+            "(id, source_warehouse_id, target_warehouse_id, transportation_time_minutes) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    rng = random.Random(9)  # noqa: S311
+    database = Database(db_path)
+    by_minutes: dict[int, list[tuple[int, int, list[int], dict[int, int]]]] = {}
+    for _ in range(WAVE):
+        connection_id, source, _, minutes = rng.choice(rows)
+        by_minutes.setdefault(minutes, []).append((source, rng.randint(1, SIDE * SIDE), [connection_id], {}))
+    for minutes, transports in by_minutes.items():
+        database.create_transports(transports, start_time=ARRIVAL_MINUTE - minutes)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_wave_database(db_path)
+        database, router = Database(db_path), Router()
+        router.refresh(database)
+        print(f"{SIDE * SIDE} warehouses, {WAVE} transports arriving at once, {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        expected = collect_arrivals(database, router, ARRIVAL_MINUTE)
+        print(f"  in-process: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        for workers in WORKERS:
+            pool = RoutingPool(workers)
+            try:
+                pool.find_paths(router, [(1, 1)] * pool.min_batch)  # Starts the workers with the graph
+                start = time.perf_counter()
+                arrivals = collect_arrivals(database, router, ARRIVAL_MINUTE, routing_pool=pool)
+                seconds = time.perf_counter() - start
+            finally:
+                pool.close()
+            if arrivals != expected:
+                raise RuntimeError(f"The routes of {workers} workers differ from the in-process ones")
+            print(f"  {workers} workers: {seconds * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        write_arrivals(database, router, ARRIVAL_MINUTE, expected)
+        print(f"  one batched write: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_grid_connections
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.routing.graph import CSRGraph, find_path, shortest_path_tree
+from logistics.routing.rerouting import reroute_after_connection_change
+
+SIDE: int = 40  # Two SIDE x SIDE grids
+DESTINATIONS: int = 200
+TRANSPORTS: int = 5000
+
+
+def create_two_region_database(db_path: Path) -> tuple[int, list[tuple[int, int, int, int]]]:
+    """
+    Two grids joined by a fast hub connection (the returned id) and a slow bypass,
+    so every transport between the regions is planned through the hub.
+    """
+    region = create_grid_connections(SIDE)
+    offset_nodes, offset_ids = SIDE * SIDE, len(region)
+    rows = region + [(c + offset_ids, s + offset_nodes, t + offset_nodes, m) for c, s, t, m in region]
+    hub_id = len(rows) + 1
+    rows.append((hub_id, SIDE * SIDE // 2, offset_nodes + SIDE * SIDE // 2, 10))
+    rows.append((hub_id + 1, 1, offset_nodes + 1, 600))
+
+    setup_new_database(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, ?, ?)",
+            ((i, f"warehouse {i}", f"region {i > offset_nodes}", 10**12) for i in range(1, 2 * offset_nodes + 1))
+        )
+        conn.executemany(
+            "INSERT INTO connections "
+            "(id, source_warehouse_id, target_warehouse_id, transportation_time_minutes) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        conn.execute("INSERT INTO products (id, name, barcode, volume_cm) VALUES (1, 'box', 1, 1)")
+        conn.executemany(
+            "INSERT INTO stock (warehouse_id, product_id, count) VALUES (?, 1, ?)",
+            ((i, TRANSPORTS) for i in range(1, offset_nodes + 1))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return hub_id, rows
+
+
+def main() -> None:
+    rng = random.Random(11)  # noqa: S311
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        hub_id, rows = create_two_region_database(db_path)
+        database = Database(db_path)
+
+        # Dispatch the transports from region 1 to region 2, with the full planned route
+        reverse_graph = CSRGraph.from_connections(rows, reverse=True)
+        destinations = rng.sample(range(SIDE * SIDE + 1, 2 * SIDE * SIDE + 1), DESTINATIONS)
+        trees = {destination: shortest_path_tree(reverse_graph, destination)[1] for destination in destinations}
+        transports = []
+        for _ in range(TRANSPORTS):
+            source, destination = rng.randint(1, SIDE * SIDE), rng.choice(destinations)
+            path, curr = [], source
+            while curr != destination:
+                curr, connection_id = trees[destination][curr]
+                path.append(connection_id)
+            transports.append((source, destination, path, {1: 1}))
+        database.create_transports(transports, start_time=0)
+        print(f"{2 * SIDE * SIDE} warehouses, {len(rows)} connections, {TRANSPORTS} transports through the hub")
+
+        report = reroute_after_connection_change(
+            database, hub_id, lambda: database.change_warehouse_connection_transportation_target(hub_id, 2000)
+        )
+        print(
+            f"  incremental: {report.rerouted}/{report.affected} rerouted in {report.seconds * 1000:.1f} ms "
+            f"({len(report.unreachable)} unreachable)"
+        )
+
+        # Baseline: one Dijkstra per affected transport, as the event loop would do at every next stop
+        graph = CSRGraph.from_connections(database.get_routing_graph())
+        start = time.perf_counter()
+        for source, destination, _, _ in transports:
+            find_path(graph, source, destination)
+        print(f"  per-transport Dijkstra (no writes): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
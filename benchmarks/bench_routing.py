@@ -0,0 +1,50 @@
+import random
+import time
+
+from benchmarks._network import create_grid_connections
+from logistics.routing.contraction import build_contraction_hierarchy, find_path_ch
+from logistics.routing.graph import CSRGraph, find_path
+from logistics.routing.landmarks import build_landmark_index, find_path_alt
+
+QUERIES: int = 200
+
+
+def main() -> None:
+    rng = random.Random(3)  # noqa: S311
+    for side in (30, 100):
+        connections = create_grid_connections(side)
+        graph = CSRGraph.from_connections(connections)
+        reverse_graph = CSRGraph.from_connections(connections, reverse=True)
+        nodes = side * side
+        queries = [(rng.randint(1, nodes), rng.randint(1, nodes)) for _ in range(QUERIES)]
+
+        start = time.perf_counter()
+        index = build_landmark_index(graph, reverse_graph, graph_version=0)
+        landmarks_time = time.perf_counter() - start
+        start = time.perf_counter()
+        hierarchy = build_contraction_hierarchy(connections, graph_version=0)
+        hierarchy_time = time.perf_counter() - start
+        print(
+            f"{nodes} warehouses, {len(connections)} connections, "
+            f"landmarks built in {landmarks_time:.3f}s, "
+            f"contraction hierarchy built in {hierarchy_time:.3f}s ({len(hierarchy.edges)} edges)"
+        )
+
+        for name, search in (
+            ("dijkstra", lambda s, t, g=graph: find_path(g, s, t)),
+            ("alt", lambda s, t, g=graph, i=index: find_path_alt(g, i, s, t)),
+            ("ch", lambda s, t, h=hierarchy: find_path_ch(h, s, t)),
+        ):
+            expanded = 0
+            start = time.perf_counter()
+            for source, target in queries:
+                expanded += search(source, target).nodes_expanded
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {name:<9} {elapsed / QUERIES * 1000:8.3f} ms/query, "
+                f"{expanded / QUERIES:10.1f} nodes expanded/query"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from logistics.database.barcodes import product_barcode
+from logistics.database.database import SEARCH_LIMIT, Database
+from logistics.database.setup import setup_new_database
+
+PRODUCTS: int = 200_000
+VOCABULARY: int = 3000  # Distinct words drawn, fewer remain after the duplicates
+QUERIES: int = 200
+SYLLABLES: list[str] = ["ka", "lo", "mi", "ter", "sun", "dra", "vel", "po", "rin", "gal", "se", "tor", "bu", "nek"]
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def like_search(database: Database, query: str) -> list[tuple[int, str, int]]:
+    """What the lookup would have to do without the index, unranked."""
+    first, second = query.split()
+    return database._cursor.execute(
+        "SELECT id, name, barcode FROM products WHERE (name LIKE ? OR name LIKE ?) AND (name LIKE ? OR name LIKE ?) "
+        "LIMIT ?",
+        (f"{first}%", f"% {first}%", f"{second}%", f"% {second}%", SEARCH_LIMIT)
+    ).fetchall()
+
+
+def time_queries(search: Callable[[str], object], queries: list[str]) -> str:
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return f"{(time.perf_counter() - start) / len(queries) * 1000:.2f} ms per query"
+
+
+def main() -> None:
+    rng = random.Random(17)  # noqa: S311
+    vocabulary = sorted({random_word(rng) for _ in range(VOCABULARY)})
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        setup_new_database(db_path)
+        conn = sqlite3.connect(db_path)
+        try:
+            start = time.perf_counter()
+            conn.executemany(
+                "INSERT INTO products (id, name, barcode, volume_cm) VALUES (?, ?, ?, 1)",
+                (
+                    (i, " ".join(rng.sample(vocabulary, 3)), product_barcode(i))
+                    for i in range(1, PRODUCTS + 1)
+                )
+            )
+            conn.commit()
+            seconds = time.perf_counter() - start
+            print(f"{PRODUCTS} products ({len(vocabulary)} words) inserted and indexed in {seconds:.2f} s")
+        finally:
+            conn.close()
+        database = Database(db_path)
+
+        # What an operator types: the starts of two words of a product name
+        names = [row[0].split() for row in database._cursor.execute("SELECT name FROM products").fetchall()]
+        queries = [f"{words[0][:4]} {words[2][:3]}" for words in rng.sample(names, QUERIES)]
+
+        # Typos match nothing, the LIKE scan then reads the whole table
+        misses = [f"{first}q {second}" for first, second in (query.split() for query in queries)]
+        for label, batch in (("matching", queries), ("typo", misses)):
+            print(f"  {label} queries:")
+            print(f"    full-text prefix search: {time_queries(lambda query: database.search_products(query), batch)}")
+            print(f"    LIKE scan:               {time_queries(lambda query: like_search(database, query), batch)}")
+
+
+if __name__ == "__main__":
+    main()
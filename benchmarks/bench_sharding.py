@@ -0,0 +1,132 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks._network import create_grid_connections
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.pipeline_loops.sharding import ShardedArrivalProcessor, ShardingMethod
+from logistics.routing.router import Router
+
+REGIONS: int = 8
+SIDE: int = 12  # Every region is a SIDE x SIDE grid, the regions form a ring joined by single bridges
+TRANSPORTS: int = 1000
+CROSS_REGION_FRACTION: float = 0.1
+WORKERS: list[int] = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def create_regions_database(db_path: Path) -> list[tuple[int, int, int, int]]:
+    region = create_grid_connections(SIDE)
+    nodes = SIDE * SIDE
+    rows: list[tuple[int, int, int, int]] = []
+    for r in range(REGIONS):
+        rows.extend((c + r * len(region), s + r * nodes, t + r * nodes, m) for c, s, t, m in region)
+    for r in range(REGIONS):
+        source, target = r * nodes + nodes // 2, (r + 1) % REGIONS * nodes + 1
+        rows.append((len(rows) + 1, source, target, 120))
+        rows.append((len(rows) + 1, target, source, 120))
+
+    setup_new_database(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, ?, ?)",
+            (
+                (i, f"warehouse {i}", f"region {(i - 1) // nodes}/site {i}", 10**12)
+                for i in range(1, REGIONS * nodes + 1)
+            )
+        )
+        conn.executemany(
+            "INSERT INTO connections "
+            "(id, source_warehouse_id, target_warehouse_id, transportation_time_minutes) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        conn.execute("INSERT INTO products (id, name, barcode, volume_cm) VALUES (1, 'box', 1, 1)")
+        conn.executemany(
+            "INSERT INTO stock (warehouse_id, product_id, count) VALUES (?, 1, ?)",
+            ((i, TRANSPORTS) for i in range(1, REGIONS * nodes + 1))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return rows
+
+
+def dispatch(database: Database, rows: list[tuple[int, int, int, int]]) -> None:
+    """Mostly regional transports with only their first leg planned, the event loop routes them at the first stop."""
+    rng = random.Random(5)  # noqa: S311
+    nodes = SIDE * SIDE
+    first_legs: dict[int, int] = {}
+    for connection_id, source, _, _ in rows:
+        first_legs.setdefault(source, connection_id)
+
+    transports = []
+    for _ in range(TRANSPORTS):
+        source = rng.randint(1, REGIONS * nodes)
+        region = (source - 1) // nodes
+        if rng.random() < CROSS_REGION_FRACTION:
+            region = rng.randrange(REGIONS)
+        target = rng.randint(region * nodes + 1, (region + 1) * nodes)
+        if target != source:
+            transports.append((source, target, [first_legs[source]], {1: 1}))
+    database.create_transports(transports, start_time=0)
+
+
+def run(database: Database, process: Callable[[int], object]) -> tuple[float, int]:
+    """Processes all the arrivals, returns the seconds it took and the number of ticks."""
+    ticks = 0
+    start = time.perf_counter()
+    while (minute := database.get_next_arrival_minute()) is not None:
+        process(minute)
+        ticks += 1
+    return time.perf_counter() - start, ticks
+
+
+def dump(database: Database) -> list[list[tuple]]:
+    return [
+        database._cursor.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()  # noqa: S608
+        for table in ("transports", "transport_routes", "stock")
+    ]
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = Path(tmp) / "base.sqlite"
+        rows = create_regions_database(base_path)
+        base = Database(base_path)
+        dispatch(base, rows)
+        print(f"{REGIONS} regions of {SIDE * SIDE} warehouses, {TRANSPORTS} transports, {os.cpu_count()} CPUs")
+
+        db_path = Path(tmp) / "single.sqlite"
+        base.create_snapshot(db_path)
+        database, router = Database(db_path), Router()
+        seconds, ticks = run(database, lambda minute: _run_update(database, router, minute))
+        expected = dump(database)
+        print(f"  single-threaded: {seconds:.2f} s for {ticks} ticks, {router.queries} routing queries")
+
+        for method in ShardingMethod:
+            for workers in WORKERS:
+                db_path = Path(tmp) / f"{method}-{workers}.sqlite"
+                base.create_snapshot(db_path)
+                database, router = Database(db_path), Router()
+                processor = ShardedArrivalProcessor(db_path, workers, method)
+                try:
+                    processor.process(database, router, -1)  # Starts the workers, nothing is due yet
+                    seconds, ticks = run(database, lambda minute: processor.process(database, router, minute))  # noqa: B023
+                finally:
+                    processor.close()
+                if dump(database) != expected:
+                    raise RuntimeError(f"{method} with {workers} workers diverged from the single-threaded run")
+                print(
+                    f"  {method}, {workers} workers: {seconds:.2f} s, "
+                    f"{processor.stats.handoffs} cross-shard handoffs of {processor.stats.arrivals} arrivals"
+                )
+
+
+if __name__ == "__main__":
+    main()
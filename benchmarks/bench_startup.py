@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics.database.setup import get_db_status
+
+WAREHOUSES: int = 2000
+HISTORY_ROWS: int = 5_000_000  # Stock snapshots, the bulk of a long-running database
+RUNS: int = 5
+FIRST_MENU_MARKER: str = "Exit"  # Last option of the main menu
+
+
+def create_large_database(db_path: Path) -> None:
+    create_network_database(db_path, warehouses=WAREHOUSES)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO stock_snapshots (warehouse_id, timestamp, filled_volume, is_keyframe, product_counts) "
+            "VALUES (?, ?, 0, 0, x'0102')",
+            ((i % WAREHOUSES, i // WAREHOUSES) for i in range(HISTORY_ROWS))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def time_to_first_menu(config_home: Path) -> float:
+    """Seconds from the start of the interpreter until the main menu is printed."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "logistics.main"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        env={**os.environ, "XDG_CONFIG_HOME": str(config_home)},
+    )
+    try:
+        for line in process.stdout:
+            if FIRST_MENU_MARKER in line:
+                return time.perf_counter() - start
+        raise RuntimeError("The app exited before showing the menu")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_large_database(db_path)
+        print(f"{WAREHOUSES} warehouses, {HISTORY_ROWS} history rows, {db_path.stat().st_size / 2**20:.0f} MiB")
+
+        for count_rows in (True, False):
+            start = time.perf_counter()
+            status = get_db_status(db_path, count_rows=count_rows)
+            seconds = time.perf_counter() - start
+            mode = "COUNT(*)" if count_rows else "fast"
+            print(f"  health check ({mode}): {seconds * 1000:.1f} ms, has data: {status.has_data}")
+
+        config_dir = Path(tmp) / "logistics"
+        config_dir.mkdir()
+        (config_dir / "config.toml").write_text(
+            f'database_location = "{tmp}"\ndatabase_name = "bench.sqlite"\nevent_journal = false\n'
+        )
+        times = [time_to_first_menu(Path(tmp)) for _ in range(RUNS)]
+        print(f"  time to first menu: {statistics.median(times) * 1000:.0f} ms (median of {RUNS})")
+
+
+if __name__ == "__main__":
+    main()
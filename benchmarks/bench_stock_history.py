@@ -0,0 +1,74 @@
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_network_database
+from logistics.database.database import Database
+from logistics.database.stock_history import StockHistoryRecorder, get_stock_history
+
+WAREHOUSES: int = 200
+PRODUCTS: int = 100
+CHANGES_PER_INTERVAL: int = 5  # Products whose count changes in every warehouse between two snapshots
+INTERVAL_MINUTES: int = 60
+DAYS: int = 14
+
+
+def database_bytes(conn: sqlite3.Connection) -> int:
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - freelist_count) * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def main() -> None:
+    rng = random.Random(7)  # noqa: S311
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        create_network_database(db_path, warehouses=WAREHOUSES, products=PRODUCTS)
+        database = Database(db_path)
+        conn = sqlite3.connect(db_path)
+        stocked = conn.execute("SELECT warehouse_id, product_id FROM stock").fetchall()
+        by_warehouse: dict[int, list[int]] = {}
+        for warehouse_id, product_id in stocked:
+            by_warehouse.setdefault(warehouse_id, []).append(product_id)
+
+        recorder = StockHistoryRecorder(INTERVAL_MINUTES)
+        recorder.record(database, 0)  # Initial keyframes, not counted
+        size_before = database_bytes(conn)
+
+        record_seconds = 0.0
+        intervals = DAYS * 24 * 60 // INTERVAL_MINUTES
+        for interval in range(1, intervals + 1):
+            conn.executemany(
+                "UPDATE stock SET count = count + ? WHERE warehouse_id = ? AND product_id = ?",
+                [
+                    (rng.randint(1, 50), warehouse_id, product_id)
+                    for warehouse_id, products in by_warehouse.items()
+                    for product_id in rng.sample(products, min(CHANGES_PER_INTERVAL, len(products)))
+                ]
+            )
+            conn.commit()
+            start = time.perf_counter()
+            recorder.record(database, interval * INTERVAL_MINUTES)
+            record_seconds += time.perf_counter() - start
+
+        history_bytes = database_bytes(conn) - size_before
+        warehouse_days = len(by_warehouse) * DAYS
+        print(
+            f"{len(by_warehouse)} warehouses, {len(stocked) / len(by_warehouse):.0f} stocked products each, "
+            f"{CHANGES_PER_INTERVAL} changed every {INTERVAL_MINUTES} min, {DAYS} days"
+        )
+        print(f"  storage: {history_bytes / warehouse_days:.0f} B per warehouse-day ({history_bytes / 1024:.0f} KiB)")
+        print(f"  recording: {record_seconds / intervals * 1000:.1f} ms per interval (one batch)")
+
+        start = time.perf_counter()
+        for warehouse_id in by_warehouse:
+            get_stock_history(database, warehouse_id, 3 * 24 * 60, 10 * 24 * 60, step=6 * 60)
+        print(f"  query: {(time.perf_counter() - start) / len(by_warehouse) * 1000:.2f} ms per 7 day range at 6 h")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_grid_connections
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.database.topology_import import import_topology, read_connections_csv, read_warehouses_csv
+
+SIDE: int = 70  # Grid of SIDE x SIDE warehouses, two-way connections between neighbours
+ROW_BY_ROW_WAREHOUSES: int = 500  # The row-by-row import is measured on a prefix and extrapolated
+
+
+def write_csv(tmp: Path) -> tuple[Path, Path]:
+    warehouses_path = tmp / "warehouses.csv"
+    with warehouses_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "location", "capacity"))
+        writer.writerows((f"site {i}", f"region {i % 16}/site {i}", 10**9) for i in range(1, SIDE * SIDE + 1))
+    connections_path = tmp / "connections.csv"
+    with connections_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("source", "target", "time", "two_way"))
+        # The grid rows come in both directions, one two-way row per pair
+        writer.writerows(
+            (f"site {source}", f"site {target}", minutes, "true")
+            for _, source, target, minutes in create_grid_connections(SIDE)
+            if source < target
+        )
+    return warehouses_path, connections_path
+
+
+def row_by_row(database: Database, warehouses_path: Path, connections_path: Path) -> tuple[float, int]:
+    """One statement and one commit per warehouse and connection, names resolved with a query each."""
+    start = time.perf_counter()
+    imported = set()
+    for record in read_warehouses_csv(warehouses_path):
+        if len(imported) == ROW_BY_ROW_WAREHOUSES:
+            break
+        database.add_warehouse(*record)
+        imported.add(record.name)
+    for record in read_connections_csv(connections_path):
+        if record.source not in imported or record.target not in imported:
+            continue
+        source = database.search_warehouses(record.source)[0][0]
+        target = database.search_warehouses(record.target)[0][0]
+        database.add_transport_route(source, target, record.minutes, record.two_way)
+    return time.perf_counter() - start, len(imported)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        warehouses_path, connections_path = write_csv(Path(tmp))
+
+        db_path = Path(tmp) / "bulk.sqlite"
+        setup_new_database(db_path)
+        database = Database(db_path)
+        version = database.get_routing_graph_version()
+        start = time.perf_counter()
+        report = import_topology(database, read_warehouses_csv(warehouses_path), read_connections_csv(connections_path))
+        bulk = time.perf_counter() - start
+        print(
+            f"bulk import: {report.warehouses_added} warehouses, {report.connections_added} connections "
+            f"in {bulk:.2f} s, {len(report.components)} component(s), "
+            f"graph version {version} -> {database.get_routing_graph_version()} in one commit"
+        )
+
+        db_path = Path(tmp) / "rows.sqlite"
+        setup_new_database(db_path)
+        database = Database(db_path)
+        seconds, warehouses = row_by_row(database, warehouses_path, connections_path)
+        estimate = seconds / warehouses * SIDE * SIDE
+        print(
+            f"row by row:  {warehouses} warehouses in {seconds:.2f} s, ~{estimate:.1f} s for the whole network "
+            f"({estimate / bulk:.0f}x), one commit and graph version per connection"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._network import create_grid_connections
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.routing.graph import CSRGraph
+
+SIDE: int = 300  # Undirected road grid of SIDE x SIDE warehouses
+REPEATS: int = 5  # Graph loads per variant, the best is kept
+EDITS: int = 200  # Travel time changes of roads
+
+
+def create_database(db_path: Path, two_way: bool) -> list[int]:
+    """The same grid as two one-way rows per road, or as one two-way row. Returns the rows of every road."""
+    setup_new_database(db_path)
+    roads = [(source, target, minutes) for _, source, target, minutes in create_grid_connections(SIDE)[::2]]
+    if two_way:
+        rows = [(i + 1, source, target, minutes, 1) for i, (source, target, minutes) in enumerate(roads)]
+    else:
+        rows = [
+            (2 * i + 1 + back, *((target, source) if back else (source, target)), minutes, 0)
+            for i, (source, target, minutes) in enumerate(roads)
+            for back in (0, 1)
+        ]
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, 'grid', 1)",
+            ((i, f"warehouse {i}") for i in range(1, SIDE * SIDE + 1))
+        )
+        conn.executemany(
+            "INSERT INTO connections "
+            "(id, source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def measure(db_path: Path, two_way: bool) -> None:
+    connection_ids = create_database(db_path, two_way)
+    database = Database(db_path)
+
+    load = build = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        connections = database.get_routing_graph()
+        loaded = time.perf_counter()
+        graph = CSRGraph.from_connections(connections)
+        load, build = min(load, loaded - start), min(build, time.perf_counter() - loaded)
+
+    # A road edited from the console: one update per row of the road
+    roads = [connection_ids[i:i + 1] if two_way else connection_ids[2 * i:2 * i + 2] for i in range(EDITS)]
+    start = time.perf_counter()
+    for road in roads:
+        for connection_id in road:
+            database.change_warehouse_connection_transportation_target(connection_id, 99)
+    edit = (time.perf_counter() - start) / EDITS
+
+    print(
+        f"  {'one two-way row' if two_way else 'two one-way rows'} per road: {len(connection_ids):,} rows, "
+        f"{graph.edge_count:,} edges, {db_path.stat().st_size / 2**20:.1f} MiB, "
+        f"load {load * 1000:.0f} ms + build {build * 1000:.0f} ms, edit {edit * 1000:.2f} ms per road"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{SIDE}x{SIDE} road grid")
+        for two_way in (False, True):
+            measure(Path(tmp) / f"grid-{two_way}.sqlite", two_way)
+
+
+if __name__ == "__main__":
+    main()
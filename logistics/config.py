@@ -1,37 +1,61 @@
 import dataclasses
+import functools
 from dataclasses import dataclass
 from pathlib import Path
 
-import toml
-from platformdirs import user_config_dir
-
 from logistics.database.setup import try_setup_new_database
 from logistics.io_utils import ask_for_bool, ask_for_string, warn
 
-_config_path: Path = Path(user_config_dir(appname="logistics", appauthor="pipr", roaming=True)) / "config.toml"
+# `toml` and `platformdirs` are imported where they are used, they are a noticeable part of the startup time
+
+
+@functools.cache
+def _config_path() -> Path:
+    from platformdirs import user_config_dir
+
+    return Path(user_config_dir(appname="logistics", appauthor="pipr", roaming=True)) / "config.toml"
 
 
 @dataclass(slots=True)
 class Config:
     database_location: str = "./"
     database_name: str = "humble_logistics.sqlite"
+    routing_algorithm: str = "dijkstra"  # See `logistics.routing.router.RoutingAlgorithm`
+    archive_after_minutes: int = 7 * 24 * 60  # Finished transports move to the archive tables after a virtual week
+    stock_history_interval_minutes: int = 60  # Virtual minutes between stock level snapshots, 0 disables them
+    event_journal: bool = True  # Journal every mutation next to the database, see `logistics.database.journal`
+    event_shards: int = 1  # Worker processes for the arrivals, 1 keeps them on the event loop thread
+    shard_by: str = "clustering"  # See `logistics.pipeline_loops.sharding.ShardingMethod`
+    routing_workers: int = 0  # Processes routing the large arrival waves of an unsharded event loop, 0 disables them
+    api_port: int = 0  # Local port of the HTTP/JSON read API (see `logistics.pipeline_loops.api_loop`), 0 disables it
+    api_connections: int = 4  # Read-only database connections of the API
+    metrics_port: int = 0  # Local port of the Prometheus metrics (see `logistics.metrics`), 0 disables it
+    transport_convoys: bool = False  # Legs leaving together on a connection share one arrival write, see `convoys`
 
     @property
     def database_path(self) -> Path:
         return Path(self.database_location, self.database_name)
 
+    @property
+    def journal_path(self) -> Path:
+        return self.database_path.with_name(self.database_path.stem + ".journal.sqlite")
+
     def save(self) -> None:
-        with _config_path.open("w") as f:
+        import toml
+
+        with _config_path().open("w") as f:
             f.write(toml.dumps(dataclasses.asdict(self)))
 
 
 def read() -> Config:
-    with _config_path.open() as f:
+    import toml
+
+    with _config_path().open() as f:
         return Config(**toml.load(f))
 
 
 def get_config() -> Config | None:
-    if not _config_path.exists():
+    if not _config_path().exists():
         create_config = ask_for_bool("No config file has been found, do you want to setup a new one now?")
         if create_config:
             config = Config()
@@ -53,7 +77,7 @@ def get_config() -> Config | None:
             if len(database_filename) != 0:
                 config.database_name = database_filename
 
-            _config_path.parent.mkdir(parents=True, exist_ok=True)
+            _config_path().parent.mkdir(parents=True, exist_ok=True)
             config.save()
             return config
         else:
@@ -62,7 +86,7 @@ def get_config() -> Config | None:
 
 
 def parse_config_path(path: str) -> str:
-    return path.replace("%config%", str(_config_path.parent))
+    return path.replace("%config%", str(_config_path().parent))
 
 
 def check_for_database(config: Config) -> bool:
@@ -0,0 +1,27 @@
+# GS1 prefix 2 (20-29): restricted circulation numbers, free for in-house numbering
+BARCODE_PREFIX: str = "2"
+
+# Digits of the product id in the barcode, between the prefix and the check digit
+PRODUCT_ID_DIGITS: int = 11
+
+
+def ean13_check_digit(digits: str) -> int:
+    """Check digit of the first 12 digits of an EAN-13, weighted 1, 3, 1, 3, ... from the left."""
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits))
+    return (10 - total % 10) % 10
+
+
+def product_barcode(product_id: int) -> int:
+    """
+    The EAN-13 barcode of the product: the prefix, the zero-padded id and the check digit.
+    The same on every run and for every database, and unique as the id is. Renames keep it.
+    """
+    if not 0 < product_id < 10**PRODUCT_ID_DIGITS:
+        raise ValueError(f"Product id '{product_id}' does not fit in an EAN-13 barcode")
+    digits = f"{BARCODE_PREFIX}{product_id:0{PRODUCT_ID_DIGITS}d}"
+    return int(f"{digits}{ean13_check_digit(digits)}")
+
+
+def is_valid_ean13(barcode: int) -> bool:
+    digits = str(barcode).zfill(13)
+    return 0 <= barcode < 10**13 and ean13_check_digit(digits[:12]) == int(digits[12])
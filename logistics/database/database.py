@@ -1,69 +1,334 @@
 import atexit
+import functools
+import inspect
+import json
+import re
 import sqlite3
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
 from datetime import UTC, datetime
 from importlib import resources
 from pathlib import Path
+from typing import Any, Concatenate
 
-from io_utils import error
+from logistics import database, metrics
+from logistics.database.barcodes import product_barcode
+from logistics.database.journal import EventJournal
+from logistics.database.read_cache import ReadCache, ReadCacheStats
+from logistics.io_utils import error
 
-from logistics import database
+# Rows pulled from SQLite per `fetchmany` call by the streaming (`iter_*`) read APIs
+FETCH_BATCH_SIZE: int = 256
 
+# Matches returned by the full-text searches
+SEARCH_LIMIT: int = 10
 
+_MAX_INTEGER: int = 2**63 - 1
+
+# (warehouse, stock, incoming_transports, outgoing_transports, passing_transports)
+type WarehouseDetails = tuple[
+    tuple[int, str, str, int, int, int] | None,
+    list[tuple[int, str, int, int, int]],
+    list[tuple[int, int, str, str]],
+    list[tuple[int, int, str, str]],
+    list[tuple[int, int, str, str, int, str, str]],
+]
+
+
+@functools.cache
 def fetch_sql(path: str) -> str:
     return (resources.files(database) / f"sql/{path}").read_text(encoding="utf-8")
 
 
-class Database:
-    __slots__ = ("_conn", "_cursor")
+# Names of the `Database` methods recorded in the event journal, the only ones a replay may call
+JOURNALED_METHODS: set[str] = set()
+
+
+class StaleGraphError(Exception):
+    """The connections changed since the routes were computed, nothing was written."""
+
+
+def _journaled[**P, R](method: Callable[Concatenate["Database", P], R]) -> Callable[Concatenate["Database", P], R]:
+    """
+    Records the call in the event journal when the method commits (see `Database._commit`).
+    Calls made from within another journaled method are part of the outer event.
+    """
+    JOURNALED_METHODS.add(method.__name__)
 
-    def __init__(self, db_path: Path):
-        self._conn = sqlite3.connect(db_path, timeout=10)
+    @functools.wraps(method)
+    def wrapper(self: "Database", *args: P.args, **kwargs: P.kwargs) -> R:
+        if self._journal is None or self._pending_event is not None:
+            return method(self, *args, **kwargs)
+        self._pending_event = (method.__name__, args, kwargs)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._pending_event = None
+
+    return wrapper
+
+
+def _timed_operations[T: type](cls: T) -> T:
+    """
+    Records the latency of every public method in `metrics.SQL_SECONDS`, labelled with the method name.
+    The streaming `iter_*` methods are left out, they only create the generator.
+    Calls made from within another timed method are part of the outer operation, they are not recorded on their own.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if not name.startswith(("_", "iter_")) and inspect.isfunction(attribute):
+            setattr(cls, name, _timed(attribute))
+    return cls
+
+
+def _timed[**P, R](method: Callable[Concatenate["Database", P], R]) -> Callable[Concatenate["Database", P], R]:
+    observe = metrics.SQL_SECONDS.observe
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: "Database", *args: P.args, **kwargs: P.kwargs) -> R:
+        if self._timing:
+            return method(self, *args, **kwargs)
+        self._timing = True
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            observe(time.perf_counter() - start, name)
+            self._timing = False
+
+    return wrapper
+
+
+def _prefix_query(text: str) -> str | None:
+    """FTS5 query matching every word of the text as a prefix, None if there are no words."""
+    words = re.findall(r"\w+", text)
+    if len(words) == 0:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+@_timed_operations
+class Database:
+    __slots__ = (
+        "_conn", "_convoys", "_cursor", "_journal", "_pending_event", "_read_cache", "_timing", "_write_generation",
+    )
+
+    def __init__(
+            self,
+            db_path: Path,
+            journal: EventJournal | None = None,
+            *,
+            synchronous: bool = True,
+            read_only: bool = False,
+            convoys: bool = False
+    ):
+        if read_only:
+            # Pooled connections are handed from thread to thread, used by one at a time
+            self._conn = sqlite3.connect(
+                f"{db_path.resolve().as_uri()}?mode=ro", timeout=10, uri=True, check_same_thread=False
+            )
+        else:
+            self._conn = sqlite3.connect(db_path, timeout=10)
         self._conn.execute("PRAGMA foreign_keys = ON")  # Ensure foreign key validation
+        if not synchronous:
+            # No fsync per commit, for bulk rebuilds only: an OS crash may leave the file corrupt
+            self._conn.execute("PRAGMA synchronous = OFF")
         self._cursor = self._conn.cursor()
+        self._journal = journal
+        # The legs this connection starts join the convoy of their connection and minute, see the `convoys` table
+        self._convoys = convoys
+        self._pending_event: tuple[str, tuple, dict[str, Any]] | tuple[()] | None = None
+        self._read_cache = ReadCache()
+        self._write_generation = 0  # Commits of this connection, `PRAGMA data_version` only counts the others
+        self._timing = False  # Within a method recorded by `_timed`
 
         # Safe connection closing on application exit
         atexit.register(self._conn.close)
 
-    # --------- DATA RETRIVAL TASKS ------------------------------------------------------------------------------------
-    def get_warehouses(self) -> list[tuple[int, str, str, int, int, int]]:
-        return self._cursor.execute(fetch_sql("warehouses.sql")).fetchall()
-
-    def get_warehouse_details(
-            self, warehouse_id: int
-    ) -> tuple[
-        tuple[int, str, str, int, int, int],
-        list[tuple[int, str, int, int, int]],
-        list[tuple[int, int, str, str]],
-        list[tuple[int, int, str, str]],
-        list[tuple[int, str, str]],
-    ]:
-        warehouse_id_str = str(warehouse_id)
+    def _commit(self) -> None:
+        """
+        Commits, journaling the running mutation first.
+        The write lock is still held here, so the journal order is the commit order of all the connections.
+        """
+        self._write_generation += 1
+        if not self._pending_event:
+            self._conn.commit()
+            return
 
-        def get_sql(path: str) -> str:
-            return fetch_sql("warehouse_details/" + path + ".sql")
+        sequence = self._journal.append(*self._pending_event)
+        self._pending_event = ()  # Recorded, a second commit of the same call is not a new event
+        try:
+            self._conn.commit()
+        except sqlite3.Error:
+            self._journal.discard(sequence)
+            raise
+        self._journal.flush_if_due()
+
+    @contextmanager
+    def _read_transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        A deferred transaction for reads that have to agree with each other, rolled back at the end (nothing to commit).
+        Inside a running transaction the reads join it instead, and leave it open.
+        """
+        if self._conn.in_transaction:
+            yield self._cursor
+            return
+
+        self._cursor.execute("BEGIN DEFERRED")
+        try:
+            yield self._cursor
+        finally:
+            self._conn.rollback()
+
+    def _data_version(self) -> tuple[int, int]:
+        """Changes with every commit, of this or any other connection."""
+        return self._cursor.execute("PRAGMA data_version").fetchone()[0], self._write_generation
+
+    def flush_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.flush()
+
+    def create_snapshot(self, snapshot_path: Path) -> int:
+        """
+        Copies the database to the snapshot file, tagged with the sequence number of the last journal event
+        it contains, the starting point of `logistics.database.replay.replay_journal`. Returns that sequence number.
+        """
+        # Hold the write lock on a second connection, so nothing is committed (or journaled) during the copy.
+        # The backup itself cannot read through a connection that is in a write transaction.
+        db_path = self._conn.execute("PRAGMA database_list").fetchone()[2]
+        lock = sqlite3.connect(db_path, timeout=10)
+        snapshot = sqlite3.connect(snapshot_path)
+        try:
+            lock.execute("BEGIN IMMEDIATE")
+            sequence = self._journal.last_sequence if self._journal is not None else 0
+            self._conn.backup(snapshot)
+            snapshot.execute("INSERT OR REPLACE INTO journal_position (id, sequence) VALUES (0, ?)", (sequence,))
+            snapshot.commit()
+        finally:
+            snapshot.close()
+            lock.rollback()
+            lock.close()
+        return sequence
+
+    def get_journal_position(self) -> int:
+        """Sequence number of the last journal event contained in this snapshot or replayed database, 0 if none."""
+        row = self._cursor.execute("SELECT sequence FROM journal_position").fetchone()
+        return row[0] if row is not None else 0
+
+    def set_journal_position(self, sequence: int) -> None:
+        self._cursor.execute("INSERT OR REPLACE INTO journal_position (id, sequence) VALUES (0, ?)", (sequence,))
+        self._conn.commit()
+
+    # --------- STREAMING READS ----------------------------------------------------------------------------------------
+    def _iter_rows(self, query: str, parameters: Sequence[Any] = ()) -> Iterator[tuple]:
+        """
+        Lazily yields the rows of the query, pulling them from SQLite in batches of `FETCH_BATCH_SIZE`.
+        A dedicated cursor is used, so other queries can run while the generator is suspended.
+        """
+        cursor = self._conn.execute(query, parameters)
+        try:
+            while rows := cursor.fetchmany(FETCH_BATCH_SIZE):
+                yield from rows
+        finally:
+            cursor.close()
+
+    def _iter_cached_rows(self, query: str) -> Iterator[tuple]:
+        """
+        `_iter_rows` through the read cache, keyed on the query.
+        The rows are cached once the generator is exhausted, a listing closed after its first page is not.
+        """
+        version = self._data_version()
+        rows = self._read_cache.get(query, version)
+        if rows is not None:
+            yield from rows
+            return
+
+        collected: list[tuple] | None = []
+        for row in self._iter_rows(query):
+            if collected is not None:
+                collected.append(row)
+                if len(collected) > self._read_cache.max_rows:
+                    collected = None  # Too large to be cached anyway
+            yield row
+        if collected is not None:
+            self._read_cache.put(query, version, collected, len(collected))
+
+    def _get_cached_rows(self, query: str) -> list[tuple]:
+        return self._read_cache.get_or_compute(
+            query, self._data_version(), lambda: self._cursor.execute(query).fetchall()
+        )
 
-        query = get_sql("warehouse_details")
-        warehouse = self._cursor.execute(query, warehouse_id_str).fetchone()
+    def get_read_cache_stats(self) -> ReadCacheStats:
+        return self._read_cache.stats()
 
-        query = get_sql("stock")
-        stock = self._cursor.execute(query, warehouse_id_str).fetchall()
+    def iter_warehouses(self) -> Iterator[tuple[int, str, str, int, int, int]]:
+        return self._iter_cached_rows(fetch_sql("warehouses.sql"))
 
-        query = get_sql("incoming_transports")
-        incoming_transports = self._cursor.execute(query, warehouse_id_str).fetchall()
+    def iter_warehouse_connections(self) -> Iterator[tuple[int, int, str, str, int, str, str, int, int]]:
+        return self._iter_cached_rows(fetch_sql("warehouse_connections.sql"))
 
-        query = get_sql("outgoing_transports")
-        outgoing_transports = self._cursor.execute(query, warehouse_id_str).fetchall()
+    def iter_products(self) -> Iterator[tuple[int, str, int, int]]:
+        return self._iter_cached_rows("SELECT * FROM products")
 
-        query = get_sql("passing_transports")
-        passing_transports = self._cursor.execute(query, (warehouse_id, warehouse_id)).fetchall()
+    def iter_active_transports(self) -> Iterator[tuple]:
+        return self._iter_rows(fetch_sql("get_active_transports.sql"))
+
+    def iter_finished_transports(
+            self, completed_from: int | None = None, completed_to: int | None = None
+    ) -> Iterator[tuple]:
+        """
+        Finished transports (hot and archived) completed within [completed_from, completed_to), newest first.
+        Pulled one keyset page of `FETCH_BATCH_SIZE` rows at a time.
+        """
+        before: tuple[int, int] | None = None
+        while True:
+            page = self.get_finished_transports_page(
+                completed_from=completed_from, completed_to=completed_to, before=before
+            )
+            yield from page
+            if len(page) < FETCH_BATCH_SIZE:
+                return
+            before = (page[-1][9], page[-1][0])
+
+    # --------- DATA RETRIVAL TASKS ------------------------------------------------------------------------------------
+    def get_warehouses(self) -> list[tuple[int, str, str, int, int, int]]:
+        return self._get_cached_rows(fetch_sql("warehouses.sql"))
+
+    def get_warehouse_details(self, warehouse_id: int) -> WarehouseDetails:
+        """
+        All five sections read in one transaction, so they agree with each other.
+        Served from the read cache until the next commit of any connection.
+        """
+        return self._read_cache.get_or_compute(
+            ("get_warehouse_details", warehouse_id),
+            self._data_version(),
+            lambda: self._read_warehouse_details(warehouse_id),
+            lambda details: 1 + sum(len(section) for section in details[1:])
+        )
+
+    def _read_warehouse_details(self, warehouse_id: int) -> WarehouseDetails:
+        def get_sql(path: str) -> str:
+            return fetch_sql("warehouse_details/" + path + ".sql")
+
+        parameters = (warehouse_id,)
+        with self._read_transaction() as cursor:
+            warehouse = cursor.execute(get_sql("warehouse_details"), parameters).fetchone()
+            stock = cursor.execute(get_sql("stock"), parameters).fetchall()
+            incoming_transports = cursor.execute(get_sql("incoming_transports"), parameters).fetchall()
+            outgoing_transports = cursor.execute(get_sql("outgoing_transports"), parameters).fetchall()
+            passing_transports = cursor.execute(
+                get_sql("passing_transports"), {"warehouse_id": warehouse_id}
+            ).fetchall()
 
         return warehouse, stock, incoming_transports, outgoing_transports, passing_transports
 
-    def get_warehouse_connections(self) -> list[tuple[int, int, str, str, int, str, str]]:
-        return self._cursor.execute(fetch_sql("warehouse_connections.sql")).fetchall()
+    def get_warehouse_connections(self) -> list[tuple[int, int, str, str, int, str, str, int, int]]:
+        return self._get_cached_rows(fetch_sql("warehouse_connections.sql"))
 
     def get_products(self) -> list[tuple[int, str, int, int]]:
-        return self._cursor.execute("SELECT * FROM products").fetchall()
+        return self._get_cached_rows("SELECT * FROM products")
 
     def get_stock(self, warehouse_id: int) -> list[tuple[int, int]]:
         return self._cursor.execute(
@@ -86,43 +351,121 @@ class Database:
     def get_active_transports(self) -> list[tuple[int, int]]:
         return self._cursor.execute(fetch_sql("get_active_transports.sql")).fetchall()
 
-    def get_finished_transports(self) -> list[tuple[int, int]]:
-        return self._cursor.execute(fetch_sql("get_finished_transports.sql")).fetchall()
+    def count_in_flight_transports(self) -> int:
+        return self._cursor.execute("SELECT COUNT(*) FROM transports WHERE completed_timestamp IS NULL").fetchone()[0]
+
+    def get_finished_transports(self) -> list[tuple]:
+        return list(self.iter_finished_transports())
 
-    def get_active_transport_details(self, warehouse_id: int) -> tuple[
+    def get_finished_transports_page(
+            self,
+            *,
+            completed_from: int | None = None,
+            completed_to: int | None = None,
+            before: tuple[int, int] | None = None,
+            limit: int = FETCH_BATCH_SIZE
+    ) -> list[tuple[int, int, str, str, int, str, str, int, int, int, int]]:
+        """
+        One page of finished transports completed within [completed_from, completed_to), newest first.
+        `before` is the (completion_time, transport_id) key of the last row of the previous page.
+        Format: (id, source_id, source_name, source_location, target_id, target_name, target_location,
+                 stop_count, start_time, completion_time, total_time)
+        """
+        before_completed, before_id = before if before is not None else (_MAX_INTEGER, _MAX_INTEGER)
+        return self._cursor.execute(
+            fetch_sql("get_finished_transports_page.sql"),
+            {
+                "completed_from": completed_from if completed_from is not None else -_MAX_INTEGER,
+                "completed_to": completed_to if completed_to is not None else _MAX_INTEGER,
+                "before_completed": before_completed,
+                "before_id": before_id,
+                "limit": limit,
+            }
+        ).fetchall()
+
+    def get_active_transport_details(self, transport_id: int) -> tuple[
         tuple[int, int, str, str, int, str, str, int, int, int, int],
         list[tuple[int, int, str, str, int, str, str, int, int | None]],
         list[tuple[int, str, int, int, int]]
     ]:
         details = self._cursor.execute(
-            fetch_sql("get_active_transport_details.sql"),
-            (warehouse_id,)
+            fetch_sql("transport_details/get_active_transport_details.sql"),
+            (transport_id,)
         ).fetchone()
-        stops, cargo = self._get_common_transport_details(warehouse_id)
+        stops, cargo = self._get_common_transport_details(transport_id)
         return details, stops, cargo
 
-    def get_finished_transport_details(self, warehouse_id: int) -> tuple[
+    def get_finished_transport_details(self, transport_id: int) -> tuple[
         tuple[int, int, str, str, int, str, str, int, int],
         list[tuple[int, int, str, str, int, str, str, int, int | None]],
         list[tuple[int, str, int, int, int]]
     ]:
         details = self._cursor.execute(
-            fetch_sql("get_finished_transport_details.sql"),
-            (warehouse_id,)
+            fetch_sql("transport_details/get_finished_transport_details.sql"),
+            (transport_id,)
         ).fetchone()
-        stops, cargo = self._get_common_transport_details(warehouse_id)
+        if details is None:
+            # Not in the hot tables anymore, read it from the archive
+            details = self._cursor.execute(fetch_sql("archive/get_transport_details.sql"), (transport_id,)).fetchone()
+            stops = self._cursor.execute(fetch_sql("archive/get_stops.sql"), (transport_id,)).fetchall()
+            cargo = self._cursor.execute(fetch_sql("archive/get_cargo.sql"), (transport_id,)).fetchall()
+            return details, stops, cargo
+        stops, cargo = self._get_common_transport_details(transport_id)
         return details, stops, cargo
 
-    def _get_common_transport_details(self, warehouse_id: int) -> tuple[
+    def _get_common_transport_details(self, transport_id: int) -> tuple[
         list[tuple[int, int, str, str, int, str, str, int, int | None]],
         list[tuple[int, str, int, int, int]]
     ]:
-        stops = self._cursor.execute(fetch_sql("get_stops.sql"), (warehouse_id,)).fetchall()
-        cargo = self._cursor.execute(fetch_sql("get_cargo.sql"), (warehouse_id,)).fetchall()
+        stops = self._cursor.execute(fetch_sql("transport_details/get_stops.sql"), (transport_id,)).fetchall()
+        cargo = self._cursor.execute(fetch_sql("transport_details/get_cargo.sql"), (transport_id,)).fetchall()
         return stops, cargo
 
-    def is_transport_active(self, warehouse_id: int) -> bool:
-        return bool(self._cursor.execute(fetch_sql("is_transport_active.sql"), (warehouse_id,)).fetchone())
+    def get_planned_stops(self, transport_id: int) -> list[tuple[int, int, str, str, int, str, str, int]]:
+        """
+        Remaining steps of the route plan, empty if the transport has to be replanned at its next stop.
+        Format: (step, source_id, source_name, source_location, target_id, target_name, target_location, minutes)
+        """
+        return self._cursor.execute(
+            fetch_sql("transport_details/get_planned_stops.sql"),
+            (transport_id,)
+        ).fetchall()
+
+    def get_transport_etas(self, transport_id: int | None = None) -> list[tuple[int, int, int, int, int | None]]:
+        """
+        Expected arrivals of the in-flight transports (or only of the given one), in minutes.
+        The final one is None when the transport has no route plan to its target, it is routed at its next stop.
+        Format: (transport_id, next_stop_id, next_stop_eta, target_id, target_eta)
+        """
+        return self._cursor.execute(
+            fetch_sql("transport_details/get_etas.sql"),
+            {"transport_id": transport_id}
+        ).fetchall()
+
+    def get_product_distribution(self, product_id: int) -> tuple[list[tuple[int, str, str, int]], int]:
+        """
+        The stock of the product in every warehouse holding it, largest first, and the count on the way.
+        Format: ([(warehouse_id, warehouse_name, warehouse_location, count)], in_transit_count)
+        """
+        stock = self._cursor.execute(
+            "SELECT warehouses.id, warehouses.name, warehouses.location, stock.count "
+            "FROM stock JOIN warehouses ON stock.warehouse_id = warehouses.id "
+            "WHERE stock.product_id = ? ORDER BY stock.count DESC, warehouses.id",
+            (product_id,)
+        ).fetchall()
+        in_transit = self._cursor.execute(
+            "SELECT COALESCE(SUM(transported_stock.count), 0) "
+            "FROM transported_stock JOIN transports ON transported_stock.transport_id = transports.id "
+            "WHERE transported_stock.product_id = ? AND transports.completed_timestamp IS NULL",
+            (product_id,)
+        ).fetchone()[0]
+        return stock, in_transit
+
+    def is_transport_active(self, transport_id: int) -> bool:
+        return bool(self._cursor.execute(
+            fetch_sql("transport_details/is_transport_active.sql"),
+            (transport_id,)
+        ).fetchone()[0])
 
     def get_warehouse_name(self, warehouse_id: int) -> str:
         return self._cursor.execute("SELECT name FROM warehouses WHERE id=?", (warehouse_id,)).fetchone()
@@ -136,6 +479,49 @@ class Database:
     def get_product_name(self, product_id: int) -> str:
         return self._cursor.execute("SELECT name FROM products WHERE id=?", (product_id,)).fetchone()
 
+    def search_warehouses(self, text: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, str, str]]:
+        """
+        Warehouses where every word of the text starts a word of the name or location, best matches first.
+        Format: (id, name, location)
+        """
+        query = _prefix_query(text)
+        if query is None:
+            return []
+        return self._cursor.execute(
+            "SELECT warehouses.id, warehouses.name, warehouses.location FROM warehouses_search "
+            "JOIN warehouses ON warehouses.id = warehouses_search.rowid "
+            "WHERE warehouses_search MATCH ? ORDER BY warehouses_search.rank LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+    def search_products(self, text: str, limit: int = SEARCH_LIMIT) -> list[tuple[int, str, int]]:
+        """
+        Products where every word of the text starts a word of the name, best matches first.
+        Format: (id, name, barcode)
+        """
+        query = _prefix_query(text)
+        if query is None:
+            return []
+        return self._cursor.execute(
+            "SELECT products.id, products.name, products.barcode FROM products_search "
+            "JOIN products ON products.id = products_search.rowid "
+            "WHERE products_search MATCH ? ORDER BY products_search.rank LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+    def get_product_by_barcode(self, barcode: int) -> tuple[int, str, int, int] | None:
+        """Through the unique barcode index. Format: (id, name, barcode, volume_cm)"""
+        return self._cursor.execute(
+            "SELECT id, name, barcode, volume_cm FROM products WHERE barcode = ?", (barcode,)
+        ).fetchone()
+
+    def resolve_barcodes(self, barcodes: Iterable[int]) -> dict[int, int]:
+        """Product ids of the known barcodes, in one query. Format: {barcode: product_id}"""
+        return dict(self._cursor.execute(
+            "SELECT barcode, id FROM products WHERE barcode IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(barcodes)),)
+        ).fetchall())
+
     def get_product_volume(self, product_id: int) -> int:
         return self._cursor.execute("SELECT volume_cm FROM products WHERE id=?", (product_id,)).fetchone()
 
@@ -150,8 +536,35 @@ class Database:
     def get_transport_source(self, transport_id: int) -> int:
         return self._cursor.execute("SELECT target_warehouse_id FROM transports WHERE id=?", (transport_id,)).fetchone()
 
-    def get_active_transports_event(self) -> list[tuple[int, int, int, int, int, int]]:
-        return self._cursor.execute(fetch_sql("get_active_transports_event.sql")).fetchall()
+    def get_next_arrival_minute(self) -> int | None:
+        """The earliest minute at which an in-flight transport reaches the end of its current leg, None if none is."""
+        return self._cursor.execute(
+            "SELECT MIN(due) FROM ("
+            "    SELECT transport_routes.start_timestamp + connections.transportation_time_minutes AS due "
+            "    FROM transport_routes JOIN connections ON transport_routes.connection_id = connections.id "
+            "    WHERE transport_routes.arrival_timestamp IS NULL AND transport_routes.convoy_id IS NULL "
+            "    UNION ALL "
+            # The legs in a convoy arrive with it, the few convoys are scanned instead of their legs
+            "    SELECT convoys.start_timestamp + connections.transportation_time_minutes "
+            "    FROM convoys JOIN connections ON convoys.connection_id = connections.id "
+            "    WHERE convoys.arrival_timestamp IS NULL AND EXISTS ("
+            "        SELECT 1 FROM transport_routes WHERE convoy_id = convoys.id AND arrival_timestamp IS NULL"
+            "    )"
+            ")"
+        ).fetchone()[0]
+
+    def get_due_arrivals(
+            self, minute: int, warehouse_ids: Sequence[int] | None = None
+    ) -> list[tuple[int, int, int, int, int | None, int | None]]:
+        """
+        Open legs that reach their stop by the given minute, optionally only those stopping at the given warehouses,
+        with the next step of the route plan (None if there is none left).
+        Format: (transport_route_id, transport_id, stop_warehouse_id, target_warehouse_id, next_step, connection_id)
+        """
+        return self._cursor.execute(
+            fetch_sql("get_due_arrivals.sql"),
+            {"minute": minute, "warehouse_ids": None if warehouse_ids is None else json.dumps(list(warehouse_ids))}
+        ).fetchall()
 
     def get_cargo(self, transport_id: int) -> list[tuple[int, int]]:
         return self._cursor.execute(
@@ -161,19 +574,339 @@ class Database:
 
     def get_routing_graph(self) -> list[tuple[int, int, int, int]]:
         """
-        Returns all valid connections for pathfinding.
+        Returns all valid connections for pathfinding, a two-way connection once in each direction:
+        the way back (target to source) under the negated connection id.
         Format: (connection_id, source_id, target_id, minutes)
         """
+        rows = self._cursor.execute(
+            "SELECT id, source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way FROM connections"
+        ).fetchall()
+        forward = [(connection_id, source, target, minutes) for connection_id, source, target, minutes, _ in rows]
+        forward.extend(
+            (-connection_id, target, source, minutes)
+            for connection_id, source, target, minutes, two_way in rows
+            if two_way
+        )
+        return forward
+
+    def get_routing_graph_version(self) -> int:
+        """Bumped by triggers on every change of the connections."""
+        return self._cursor.execute("SELECT version FROM routing_graph_version").fetchone()[0]
+
+    def get_contraction_hierarchy(self) -> tuple[int, bytes, bytes, bytes] | None:
+        """
+        Returns the stored routing index, if there is one.
+        Format: (graph_version, node_ids, node_ranks, edges)
+        """
+        return self._cursor.execute(
+            "SELECT graph_version, node_ids, node_ranks, edges FROM routing_contraction_hierarchy"
+        ).fetchone()
+
+    def get_contraction_hierarchy_version(self) -> int | None:
+        """Returns the graph version of the stored routing index, without loading it."""
+        row = self._cursor.execute("SELECT graph_version FROM routing_contraction_hierarchy").fetchone()
+        return None if row is None else row[0]
+
+    def get_stock_of_products(self, product_ids: Iterable[int]) -> Iterator[tuple[int, int, int]]:
+        """
+        Returns the stock of all the given products across the network.
+        Format: (warehouse_id, product_id, count)
+        """
+        return self._iter_rows(
+            "SELECT warehouse_id, product_id, count FROM stock WHERE product_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(product_ids)),)
+        )
+
+    def iter_stock_levels(self) -> Iterator[tuple[int, int, int, int]]:
+        """
+        The whole stock, ordered by warehouse and product.
+        Format: (warehouse_id, product_id, count, product_volume_cm)
+        """
+        return self._iter_rows(
+            "SELECT stock.warehouse_id, stock.product_id, stock.count, products.volume_cm "
+            "FROM stock JOIN products ON stock.product_id = products.id "
+            "ORDER BY stock.warehouse_id, stock.product_id"
+        )
+
+    def get_stock_snapshots(self, warehouse_id: int, start: int, end: int) -> list[tuple[int, int, int, bytes]]:
+        """
+        Stock snapshots of the warehouse before `end`, starting from the last keyframe at or before `start`
+        (or from the first snapshot after it, if there is none).
+        Format: (timestamp, filled_volume, is_keyframe, product_counts)
+        """
         return self._cursor.execute(
-            "SELECT id, source_warehouse_id, target_warehouse_id, transportation_time_minutes FROM connections"
+            "SELECT timestamp, filled_volume, is_keyframe, product_counts FROM stock_snapshots "
+            "WHERE warehouse_id = :warehouse_id AND timestamp < :end AND timestamp >= COALESCE(("
+            "    SELECT MAX(timestamp) FROM stock_snapshots "
+            "    WHERE warehouse_id = :warehouse_id AND is_keyframe = 1 AND timestamp <= :start"
+            "), :start) "
+            "ORDER BY timestamp",
+            {"warehouse_id": warehouse_id, "start": start, "end": end}
         ).fetchall()
 
+    @_journaled
     def add_next_transport_leg(self, transport_id: int, connection_id: int, start_time: int) -> None:
+        """The connection id is negative for the way back of a two-way connection, as in the routing graph."""
+        self._start_leg(transport_id, connection_id, start_time)
+        self._commit()
+
+    def _start_leg(
+            self,
+            transport_id: int,
+            connection_id: int,
+            start_time: int,
+            convoy_ids: dict[tuple[int, bool, int], int] | None = None
+    ) -> None:
+        """
+        Inserts the open leg, in the convoy leaving on the connection at that minute if convoys are on,
+        without committing. The connection id is negative for the way back of a two-way connection.
+        `convoy_ids` caches the convoys found by the previous legs of the same transaction.
+        """
+        convoy_id = None
+        if self._convoys:
+            key = (abs(connection_id), connection_id < 0, start_time)
+            convoy_id = None if convoy_ids is None else convoy_ids.get(key)
+            if convoy_id is None:
+                row = self._cursor.execute(
+                    "SELECT id FROM convoys "
+                    "WHERE connection_id = ? AND reverse = ? AND start_timestamp = ? AND arrival_timestamp IS NULL",
+                    key
+                ).fetchone()
+                convoy_id = row[0] if row is not None else self._cursor.execute(
+                    "INSERT INTO convoys (connection_id, reverse, start_timestamp) VALUES (?, ?, ?)", key
+                ).lastrowid
+                if convoy_ids is not None:
+                    convoy_ids[key] = convoy_id
         self._cursor.execute(
-            "INSERT INTO transport_routes (transport_id, connection_id, start_timestamp) VALUES (?, ?, ?)",
-            (transport_id, connection_id, start_time)
+            "INSERT INTO transport_routes (transport_id, connection_id, reverse, start_timestamp, convoy_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (transport_id, abs(connection_id), connection_id < 0, start_time, convoy_id)
         )
-        self._conn.commit()
+
+    @_journaled
+    def start_next_planned_leg(self, transport_id: int, start_time: int) -> bool:
+        """
+        Starts the next leg of the stored route plan and advances the plan by one step.
+        Returns False if there is no next step (no plan, or it was invalidated by a connection change).
+        """
+        row = self._cursor.execute(
+            "SELECT IIF(steps.reverse, -steps.connection_id, steps.connection_id) FROM transport_route_plans plans "
+            "JOIN transport_route_plan_steps steps "
+            "ON plans.transport_id = steps.transport_id AND plans.next_step = steps.step "
+            "WHERE plans.transport_id = ?",
+            (transport_id,)
+        ).fetchone()
+        if row is None:
+            return False
+
+        self._cursor.execute(
+            "UPDATE transport_route_plans SET next_step = next_step + 1 WHERE transport_id = ?",
+            (transport_id,)
+        )
+        self.add_next_transport_leg(transport_id, row[0], start_time)
+        return True
+
+    @_journaled
+    def replan_transport_route(self, transport_id: int, connection_ids: Sequence[int], start_time: int) -> None:
+        """Replaces the route plan of the transport with the new path and starts its first leg."""
+        self._start_route_plan(transport_id, connection_ids, start_time)
+        self._commit()
+
+    def _start_route_plan(
+            self,
+            transport_id: int,
+            connection_ids: Sequence[int],
+            start_time: int,
+            convoy_ids: dict[tuple[int, bool, int], int] | None = None
+    ) -> None:
+        """Stores the route plan and starts its first leg, without committing. See `_start_leg` for `convoy_ids`."""
+        if len(connection_ids) == 0:
+            raise ValueError(f"Route plan of transport '{transport_id}' has no steps")
+
+        self._cursor.execute("DELETE FROM transport_route_plan_steps WHERE transport_id = ?", (transport_id,))
+        self._cursor.execute(
+            "INSERT OR REPLACE INTO transport_route_plans (transport_id, next_step) VALUES (?, 1)",
+            (transport_id,)
+        )
+        self._cursor.executemany(
+            "INSERT INTO transport_route_plan_steps (transport_id, step, connection_id, reverse) VALUES (?, ?, ?, ?)",
+            [
+                (transport_id, step, abs(connection_id), connection_id < 0)
+                for step, connection_id in enumerate(connection_ids)
+            ]
+        )
+        self._start_leg(transport_id, connection_ids[0], start_time, convoy_ids)
+
+    def get_route_plans_through(self, connection_id: int) -> list[tuple[int, int, int, int, int]]:
+        """
+        In-flight transports whose remaining route plan uses the connection, through the connection index.
+        Format: (transport_id, open_transport_route_id, next_step, next_stop_warehouse_id, target_warehouse_id)
+        """
+        return self._cursor.execute(fetch_sql("get_route_plans_through.sql"), (connection_id,)).fetchall()
+
+    @_journaled
+    def replace_route_plans(self, plans: Sequence[tuple[int, int, int, Sequence[int]]]) -> int:
+        """
+        Writes the new remaining steps of many route plans in a single transaction.
+        Format: (transport_id, open_transport_route_id, next_step, [connection_id, ...])
+        A plan is skipped if its transport already left the leg it was on, or already got a new plan,
+        since the event loop replans on its own at the next stop. Returns the number of plans written.
+        """
+        self._cursor.execute("BEGIN IMMEDIATE")  # Take the write lock before checking, the event loop writes too
+        try:
+            rows: list[tuple[int, int, int, bool]] = []
+            written = 0
+            for transport_id, transport_route_id, next_step, connection_ids in plans:
+                still_valid = self._cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM open_transport_legs WHERE id = ?) "
+                    "AND NOT EXISTS (SELECT 1 FROM transport_route_plan_steps WHERE transport_id = ? AND step >= ?)",
+                    (transport_route_id, transport_id, next_step)
+                ).fetchone()[0]
+                if still_valid:
+                    rows.extend(
+                        (transport_id, next_step + i, abs(connection_id), connection_id < 0)
+                        for i, connection_id in enumerate(connection_ids)
+                    )
+                    written += 1
+            self._cursor.executemany(
+                "INSERT INTO transport_route_plan_steps (transport_id, step, connection_id, reverse) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
+        return written
+
+    @_journaled
+    def archive_finished_transports(self, arrived_before: int, limit: int) -> int:
+        """
+        Moves up to `limit` transports that arrived before the given minute, with their legs and cargo,
+        from the hot tables to the archive tables in a single transaction. Returns the number of archived transports.
+        """
+        self._cursor.execute("BEGIN IMMEDIATE")
+        try:
+            transport_ids = [row[0] for row in self._cursor.execute(
+                fetch_sql("archive/finished_transport_ids.sql"),
+                (arrived_before, limit)
+            ).fetchall()]
+            if len(transport_ids) > 0:
+                ids = (json.dumps(transport_ids),)
+                self._cursor.execute(fetch_sql("archive/archive_transports.sql"), ids)
+                self._cursor.execute(fetch_sql("archive/archive_transport_routes.sql"), ids)
+                self._cursor.execute(fetch_sql("archive/archive_transported_stock.sql"), ids)
+                convoy_ids = (json.dumps([row[0] for row in self._cursor.execute(
+                    "SELECT DISTINCT convoy_id FROM transport_routes "
+                    "WHERE transport_id IN (SELECT value FROM json_each(?)) AND convoy_id IS NOT NULL",
+                    ids
+                )]),)
+                for table in ("transported_stock", "transport_routes"):
+                    self._cursor.execute(
+                        f"DELETE FROM {table} WHERE transport_id IN (SELECT value FROM json_each(?))",  # noqa: S608
+                        ids
+                    )
+                # The convoys are gone with their last leg
+                self._cursor.execute(
+                    "DELETE FROM convoys WHERE id IN (SELECT value FROM json_each(?)) "
+                    "AND NOT EXISTS (SELECT 1 FROM transport_routes WHERE convoy_id = convoys.id)",
+                    convoy_ids
+                )
+                self._cursor.execute("DELETE FROM transports WHERE id IN (SELECT value FROM json_each(?))", ids)
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
+        return len(transport_ids)
+
+    @_journaled
+    def complete_transport(self, transport_id: int, completed_time: int) -> None:
+        """
+        Called once the cargo was unloaded at the target. Stores the completion time of the finished-transports
+        history and drops the route plan, finished transports keep only their legs.
+        """
+        self._cursor.execute(
+            "UPDATE transports SET completed_timestamp = ? WHERE id = ?",
+            (completed_time, transport_id)
+        )
+        self._cursor.execute("DELETE FROM transport_route_plan_steps WHERE transport_id = ?", (transport_id,))
+        self._cursor.execute("DELETE FROM transport_route_plans WHERE transport_id = ?", (transport_id,))
+        self._commit()
+
+    @_journaled
+    def apply_arrivals(
+            self, minute: int, arrivals: Sequence[tuple[int, int, int, int, int | None, Sequence[int]]]
+    ) -> list[int]:
+        """
+        Processes many arrivals in a single transaction, in the given order.
+        Format: (transport_route_id, transport_id, stop_warehouse_id, target_warehouse_id, next_step,
+                 [connection_id, ...])
+        At the target the cargo is unloaded and the transport completed. Otherwise, with a `next_step` the leg of that
+        plan step (the only connection) is started, without it the connections replace the plan. No connections
+        means there is no path, only the arrival is stored.
+        The arrival of the legs in a convoy is stored once, on the convoy.
+        Returns the transports whose plan changed since `next_step` was read, they are left waiting at the stop.
+        """
+        stale: list[int] = []
+        convoy_legs: list[int] = []
+        convoy_ids: dict[tuple[int, bool, int], int] = {}
+        self._cursor.execute("BEGIN IMMEDIATE")
+        try:
+            for transport_route_id, transport_id, stop_id, target_id, next_step, connection_ids in arrivals:
+                if self._cursor.execute(
+                    "UPDATE transport_routes SET arrival_timestamp = ? WHERE id = ? AND convoy_id IS NULL",
+                    (minute, transport_route_id)
+                ).rowcount == 0:
+                    convoy_legs.append(transport_route_id)
+                if stop_id == target_id:
+                    self._unload_transport(transport_id, target_id, minute)
+                elif next_step is not None:
+                    advanced = self._cursor.execute(
+                        "UPDATE transport_route_plans SET next_step = next_step + 1 "
+                        "WHERE transport_id = ? AND next_step = ? AND EXISTS ("
+                        "    SELECT 1 FROM transport_route_plan_steps WHERE transport_id = ? AND step = ? "
+                        "    AND connection_id = ? AND reverse = ?"
+                        ")",
+                        (
+                            transport_id, next_step, transport_id, next_step,
+                            abs(connection_ids[0]), connection_ids[0] < 0
+                        )
+                    ).rowcount
+                    if advanced == 0:
+                        stale.append(transport_id)
+                        continue
+                    self._start_leg(transport_id, connection_ids[0], minute, convoy_ids)
+                elif len(connection_ids) > 0:
+                    self._start_route_plan(transport_id, connection_ids, minute, convoy_ids)
+            if len(convoy_legs) > 0:
+                # One write for all the legs of each arriving convoy
+                self._cursor.execute(
+                    "UPDATE convoys SET arrival_timestamp = ? WHERE arrival_timestamp IS NULL AND id IN ("
+                    "    SELECT convoy_id FROM transport_routes WHERE id IN (SELECT value FROM json_each(?))"
+                    ")",
+                    (minute, json.dumps(convoy_legs))
+                )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
+        metrics.ARRIVALS.inc(len(arrivals))
+        metrics.UNLOADS.inc(sum(arrival[2] == arrival[3] for arrival in arrivals))
+        return stale
+
+    def _unload_transport(self, transport_id: int, warehouse_id: int, completed_time: int) -> None:
+        """Moves the cargo into the warehouse stock and completes the transport, without committing."""
+        self._cursor.execute(
+            "INSERT INTO stock (warehouse_id, product_id, count) "
+            "SELECT ?, product_id, count FROM transported_stock WHERE transport_id = ? AND true "
+            "ON CONFLICT(product_id, warehouse_id) DO UPDATE SET count = count + excluded.count",
+            (warehouse_id, transport_id)
+        )
+        self._cursor.execute(
+            "UPDATE transports SET completed_timestamp = ? WHERE id = ?", (completed_time, transport_id)
+        )
+        self._cursor.execute("DELETE FROM transport_route_plan_steps WHERE transport_id = ?", (transport_id,))
+        self._cursor.execute("DELETE FROM transport_route_plans WHERE transport_id = ?", (transport_id,))
 
     def get_warehouse_connection_source_warehouse_id(self, connection_id: int) -> int:
         return self._cursor.execute(
@@ -188,22 +921,37 @@ class Database:
         ).fetchone()
 
     # --------- DATA MANIPULATION TASKS --------------------------------------------------------------------------------
+    @_journaled
     def add_warehouse(self, name: str, location: str, capacity: int) -> None:
         self._cursor.execute(
             "INSERT INTO warehouses (name, location, capacity_volume_cm)"
             "VALUES (?, ? ,?)",
             (name.lower(), location.lower(), capacity)
         ).fetchone()
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def add_product(self, name: str, volume_cm: int) -> None:
         name = name.strip().lower()
-        self._cursor.execute(
-            "INSERT INTO products (name, barcode, volume_cm) VALUES (?, ?, ?)",
-            (name, hash(name), volume_cm)  # hash() is enough of a barcode approximation
-        ).fetchone()
-        self._conn.commit()
+        # The barcode is derived from the id, so the id is taken up front, never reusing one like AUTOINCREMENT
+        self._cursor.execute("BEGIN IMMEDIATE")
+        try:
+            product_id = self._cursor.execute(
+                "SELECT MAX("
+                "    COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'products'), 0),"
+                "    COALESCE((SELECT MAX(id) FROM products), 0)"
+                ") + 1"
+            ).fetchone()[0]
+            self._cursor.execute(
+                "INSERT INTO products (id, name, barcode, volume_cm) VALUES (?, ?, ?, ?)",
+                (product_id, name, product_barcode(product_id), volume_cm)
+            )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
 
+    @_journaled
     def add_stock(self, warehouse_id: int, product_id: int, count: int) -> None:
         if count < 0:
             raise ValueError("count must be positive")
@@ -211,23 +959,91 @@ class Database:
         query = fetch_sql("add_stock.sql")
         try:
             self._cursor.execute(query, (product_id, warehouse_id, count))
-            self._conn.commit()
+            self._commit()
         except sqlite3.IntegrityError as e:
             # Catches foreign key violations (e.g., product/warehouse doesn't exist)
             error(f"Error adding stock: {e}")
             raise
 
-    def add_transport_route(self, source_warehouse_id: int, destination_warehouse_id: int, minutes: int) -> None:
+    @_journaled
+    def add_scanned_stock(self, warehouse_id: int, barcodes: Sequence[int]) -> list[int]:
+        """
+        Stock intake from a scanner, one barcode per scanned item, added to the warehouse in a single transaction.
+        Returns the barcodes matching no product, in the order they were first scanned, they are skipped.
+        """
+        counts = Counter(barcodes)
+        self._cursor.execute("BEGIN IMMEDIATE")
+        try:
+            product_ids = self.resolve_barcodes(counts)
+            self._cursor.executemany(
+                fetch_sql("add_stock.sql"),
+                [(product_ids[barcode], warehouse_id, count) for barcode, count in counts.items()
+                 if barcode in product_ids]
+            )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
+        return [barcode for barcode in counts if barcode not in product_ids]
+
+    @_journaled
+    def add_transport_route(
+            self, source_warehouse_id: int, destination_warehouse_id: int, minutes: int, two_way: bool = False
+    ) -> None:
         self._cursor.execute(
-            "INSERT INTO connections (source_warehouse_id, target_warehouse_id, transportation_time_minutes) "
-            "VALUES (?, ? ,?)",
-            (source_warehouse_id, destination_warehouse_id, minutes)
+            "INSERT INTO connections (source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way) "
+            "VALUES (?, ?, ?, ?)",
+            (source_warehouse_id, destination_warehouse_id, minutes, two_way)
         ).fetchone()
-        self._conn.commit()
+        self._commit()
+
+    @_journaled
+    def add_warehouses(self, warehouses: Sequence[tuple[str, str, int]]) -> list[int]:
+        """
+        Adds many warehouses in a single transaction, returns their ids in the same order.
+        Format: (name, location, capacity)
+        """
+        self._cursor.execute("BEGIN IMMEDIATE")
+        try:
+            last_id = self._cursor.execute("SELECT COALESCE(MAX(id), 0) FROM warehouses").fetchone()[0]
+            self._cursor.executemany(
+                "INSERT INTO warehouses (name, location, capacity_volume_cm) VALUES (?, ?, ?)",
+                ((name.lower(), location.lower(), capacity) for name, location, capacity in warehouses)
+            )
+            # The write lock is held, the ids past the previous maximum are all ours
+            warehouse_ids = [
+                row[0] for row in self._cursor.execute(
+                    "SELECT id FROM warehouses WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+            ]
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
+        return warehouse_ids
+
+    @_journaled
+    def add_transport_routes(self, connections: Sequence[tuple[int, int, int, bool]]) -> None:
+        """
+        Adds many connections in a single transaction, so the routing caches see one new graph version.
+        Format: (source_warehouse_id, target_warehouse_id, minutes, two_way)
+        """
+        try:
+            self._cursor.executemany(
+                "INSERT INTO connections "
+                "(source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way) VALUES (?, ?, ?, ?)",
+                connections
+            )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+        self._commit()
 
+    @_journaled
     def initialize_transport(
             self, source_warehouse_id: int, target_warehouse_id: int, transport_stock: dict[int, int]
     ) -> bool:
+        """Only the transport and its cargo, without taking the stock or starting a leg. See `dispatch_transports`."""
         self._cursor.execute(
             "INSERT INTO transports (source_warehouse_id, target_warehouse_id) VALUES (?, ?)",
             (source_warehouse_id, target_warehouse_id)
@@ -238,9 +1054,108 @@ class Database:
                 "INSERT INTO transported_stock (transport_id, product_id, count) VALUES (?, ?, ?)",
                 (transport_id, product_id, count)
             )
-        self._conn.commit()
+        self._commit()
+        metrics.DISPATCHES.inc()
         return True
 
+    @_journaled
+    def create_transports(
+            self, transports: Sequence[tuple[int, int, Sequence[int], dict[int, int]]], start_time: int
+    ) -> list[int]:
+        """
+        Creates all the transports in a single transaction.
+        Their cargo is moved out of the source stock, the whole route is stored as the route plan
+        and the first leg of each transport is started.
+        Format: (source_warehouse_id, target_warehouse_id, [connection_id, ...], {product_id: count})
+        Nothing is written if any of the sources does not hold the requested stock.
+        """
+        try:
+            convoy_ids: dict[tuple[int, bool, int], int] = {}
+            transport_ids = [self._create_transport(*transport, start_time, convoy_ids) for transport in transports]
+        except (sqlite3.Error, ValueError):
+            self._conn.rollback()
+            raise
+        self._commit()
+        metrics.DISPATCHES.inc(len(transport_ids))
+        return transport_ids
+
+    @_journaled
+    def dispatch_transports(
+            self,
+            transports: Sequence[tuple[int, int, Sequence[int], dict[int, int]]],
+            start_time: int,
+            graph_version: int | None = None
+    ) -> list[int]:
+        """
+        `create_transports` that also reserves room at the destinations, in a single transaction.
+        Format: (source_warehouse_id, target_warehouse_id, [connection_id, ...], {product_id: count})
+        Nothing is written if a source does not hold the stock (ValueError), if a destination has no room for its
+        stock and all the cargo heading to it (ValueError), or if the routing graph is not at `graph_version`
+        anymore (StaleGraphError).
+        """
+        self._cursor.execute("BEGIN IMMEDIATE")  # The stock, the capacities and the graph cannot change from here on
+        try:
+            if graph_version is not None and graph_version != self.get_routing_graph_version():
+                raise StaleGraphError(f"The routes were computed on graph version '{graph_version}'")
+            convoy_ids: dict[tuple[int, bool, int], int] = {}
+            transport_ids = [self._create_transport(*transport, start_time, convoy_ids) for transport in transports]
+            # The new transports already count as reserved, a destination only has to hold its total
+            overfilled = self._cursor.execute(
+                fetch_sql("get_overfilled_warehouses.sql"),
+                (json.dumps(list({transport[1] for transport in transports})),)
+            ).fetchall()
+            if len(overfilled) > 0:
+                warehouse_ids = ", ".join(str(row[0]) for row in overfilled)
+                raise ValueError(f"Not enough free capacity for the cargo in warehouses: {warehouse_ids}")
+        except (sqlite3.Error, ValueError, StaleGraphError):
+            self._conn.rollback()
+            raise
+        self._commit()
+        metrics.DISPATCHES.inc(len(transport_ids))
+        return transport_ids
+
+    def _create_transport(
+            self,
+            source_warehouse_id: int,
+            target_warehouse_id: int,
+            connection_ids: Sequence[int],
+            transport_stock: dict[int, int],
+            start_time: int,
+            convoy_ids: dict[tuple[int, bool, int], int] | None = None
+    ) -> int:
+        """Inserts the transport, its cargo taken from the source, its route plan and first leg, without committing."""
+        self._cursor.execute(
+            "INSERT INTO transports (source_warehouse_id, target_warehouse_id) VALUES (?, ?)",
+            (source_warehouse_id, target_warehouse_id)
+        )
+        transport_id: int = self._cursor.lastrowid
+        self._cursor.executemany(
+            "INSERT INTO transported_stock (transport_id, product_id, count) VALUES (?, ?, ?)",
+            [(transport_id, product_id, count) for product_id, count in transport_stock.items()]
+        )
+        self._take_stock(source_warehouse_id, transport_stock)
+        self._start_route_plan(transport_id, connection_ids, start_time, convoy_ids)
+        return transport_id
+
+    def _take_stock(self, warehouse_id: int, taken_stock: dict[int, int]) -> None:
+        """Decrements the stock without committing, raises ValueError if there is not enough of it."""
+        for product_id, count in taken_stock.items():
+            self._cursor.execute(
+                "UPDATE stock SET count = count - ? WHERE warehouse_id = ? AND product_id = ? AND count > ?",
+                (count, warehouse_id, product_id, count)
+            )
+            if self._cursor.rowcount == 0:
+                # The whole stock is taken, the row has to go (count must stay positive)
+                self._cursor.execute(
+                    "DELETE FROM stock WHERE warehouse_id = ? AND product_id = ? AND count = ?",
+                    (warehouse_id, product_id, count)
+                )
+                if self._cursor.rowcount == 0:
+                    raise ValueError(
+                        f"Warehouse '{warehouse_id}' does not hold '{count}' units of product '{product_id}'"
+                    )
+
+    @_journaled
     def remove_stock(self, warehouse_id: int, product_id: int, count: int | None) -> None:
         if count is not None and count < 0:
             raise ValueError("count must be positive")
@@ -264,64 +1179,79 @@ class Database:
         else:  # current_count - count < 0
             raise ValueError("You can't remove more that what's there to remove")
 
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def remove_warehouse(self, warehouse_id: int) -> None:
         self._cursor.execute("DELETE FROM warehouses WHERE id=?", (warehouse_id,)).fetchone()
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def remove_product(self, product_id: int) -> None:
         self._cursor.execute("DELETE FROM products WHERE id=?", (product_id,)).fetchone()
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def remove_warehouse_connection(self, connection_id: int) -> None:
         self._cursor.execute("DELETE FROM connections WHERE id=?", (connection_id,))
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def reroute_transport(self, transport_id: int, new_target_warehouse_id: int) -> None:
         self._cursor.execute(
             "UPDATE transports SET target_warehouse_id = ? WHERE id = ?",
             (new_target_warehouse_id, transport_id)
         ).fetchone()
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_warehouse_name(self, warehouse_id: int, new_name: str) -> None:
         self._cursor.execute("UPDATE warehouses SET name = ? WHERE id = ?", (new_name, warehouse_id))
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_warehouse_location(self, warehouse_id: int, new_location: str) -> None:
         self._cursor.execute("UPDATE warehouses SET location = ? WHERE id = ?", (new_location, warehouse_id))
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_warehouse_capacity(self, warehouse_id: int, new_capacity: int) -> None:
         self._cursor.execute("UPDATE warehouses SET capacity_volume_cm = ? WHERE id = ?", (new_capacity, warehouse_id))
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_product_name(self, product_id: int, new_name: str) -> None:
-        self._cursor.execute(
-            "UPDATE products SET name = ?, barcode = ? WHERE id = ?",
-            (new_name, hash(new_name), product_id)
-        )
-        self._conn.commit()
+        # The barcode stays, it is printed on the products already in stock
+        self._cursor.execute("UPDATE products SET name = ? WHERE id = ?", (new_name, product_id))
+        self._commit()
 
+    @_journaled
     def change_product_volume(self, product_id: int, new_volume: int) -> None:
         self._cursor.execute("UPDATE products SET volume_cm = ? WHERE id = ?", (new_volume, product_id))
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_warehouse_connection_source(self, connection_id: int, new_source_warehouse_id: int) -> None:
         self._cursor.execute(
             "UPDATE connections SET source_warehouse_id = ? WHERE id = ?",
             (new_source_warehouse_id, connection_id)
         )
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def change_warehouse_connection_target(self, connection_id: int, new_target_warehouse_id: int) -> None:
         self._cursor.execute(
             "UPDATE connections SET target_warehouse_id = ? WHERE id = ?",
             (new_target_warehouse_id, connection_id)
         )
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
+    def change_warehouse_connection_two_way(self, connection_id: int, two_way: bool) -> None:
+        self._cursor.execute("UPDATE connections SET two_way = ? WHERE id = ?", (two_way, connection_id))
+        self._commit()
+
+    @_journaled
     def change_warehouse_connection_transportation_target(
             self, connection_id: int, new_transportation_time: int
     ) -> None:
@@ -329,15 +1259,37 @@ class Database:
             "UPDATE connections SET transportation_time_minutes = ? WHERE id = ?",
             (new_transportation_time, connection_id)
         )
-        self._conn.commit()
+        self._commit()
 
+    def add_stock_snapshots(self, snapshots: Sequence[tuple[int, int, int, int, bytes]]) -> None:
+        """
+        Appends one interval of stock snapshots in a single transaction.
+        Format: (warehouse_id, timestamp, filled_volume, is_keyframe, product_counts)
+        """
+        self._cursor.executemany(
+            "INSERT OR REPLACE INTO stock_snapshots "
+            "(warehouse_id, timestamp, filled_volume, is_keyframe, product_counts) VALUES (?, ?, ?, ?, ?)",
+            snapshots
+        )
+        self._commit()
+
+    def save_contraction_hierarchy(self, graph_version: int, node_ids: bytes, node_ranks: bytes, edges: bytes) -> None:
+        self._cursor.execute(
+            "INSERT OR REPLACE INTO routing_contraction_hierarchy (id, graph_version, node_ids, node_ranks, edges) "
+            "VALUES (0, ?, ?, ?, ?)",
+            (graph_version, node_ids, node_ranks, edges)
+        )
+        self._commit()
+
+    @_journaled
     def change_transport_route_arrival(self, transport_route_id: int, arrival_time_minutes: int) -> None:
         self._cursor.execute(
             "UPDATE transport_routes SET arrival_timestamp = ? WHERE id = ?",
             (arrival_time_minutes, transport_route_id)
         )
-        self._conn.commit()
+        self._commit()
 
+    @_journaled
     def upsert_cargo(self, warehouse_id: int, cargo: list[tuple[int, int]]) -> None:
         self._cursor.executemany(
             f"""
@@ -348,7 +1300,7 @@ class Database:
             """,
             cargo
         )
-        self._conn.commit()
+        self._commit()
 
     # --------- TIME HELPERS -------------------------------------------------------------------------------------------
 
@@ -365,3 +1317,4 @@ class Database:
         if db_minutes is None:
             return None
         return datetime.fromtimestamp(db_minutes * 60, tz=UTC)
+
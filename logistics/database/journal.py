@@ -0,0 +1,115 @@
+"""
+Append-only journal of every mutation of the database.
+
+Each journaled `Database` method (see `database.JOURNALED_METHODS`) is one event: the method name and its
+arguments, recorded right before the method commits. The SQLite write lock is still held at that point,
+so the events of all the loops end up in commit order, and replaying them on the same starting state
+(an empty schema, or a snapshot taken with `Database.create_snapshot`) rebuilds the same tables, ids included.
+Rolled back calls never reach the journal.
+
+The events are buffered and written to their own SQLite file in batches of `JOURNAL_BATCH_SIZE`,
+or at least every `JOURNAL_FLUSH_SECONDS`: a crash loses at most the unflushed batch.
+"""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+# Events per journal write transaction
+JOURNAL_BATCH_SIZE: int = 512
+
+# Real seconds an event may stay in the buffer before the next commit flushes it
+JOURNAL_FLUSH_SECONDS: float = 1.0
+
+_JOURNAL_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS events (
+    sequence INTEGER PRIMARY KEY,
+    virtual_time REAL NOT NULL, -- Virtual epoch seconds at the commit
+    method TEXT NOT NULL,       -- Journaled `Database` method
+    arguments TEXT NOT NULL     -- JSON [[positional, ...], {keyword: value}]
+) STRICT;
+"""
+
+
+class EventJournal:
+    """Shared by the `Database` connections of all the loops."""
+    __slots__ = ("_buffer", "_clock", "_conn", "_last_flush", "_lock", "last_sequence")
+
+    def __init__(self, journal_path: Path, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buffer: list[tuple[int, float, str, str]] = []
+        self._last_flush = time.monotonic()
+
+        self._conn = sqlite3.connect(journal_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_JOURNAL_SCHEMA)
+        self.last_sequence: int = self._conn.execute("SELECT COALESCE(MAX(sequence), 0) FROM events").fetchone()[0]
+
+        # Write out the last batch on application exit
+        atexit.register(self.close)
+
+    def append(self, method: str, args: tuple, kwargs: dict[str, Any]) -> int:
+        """Buffers one event, returns its sequence number."""
+        arguments = json.dumps([args, kwargs], separators=(",", ":"))
+        with self._lock:
+            self.last_sequence += 1
+            self._buffer.append((self.last_sequence, self._clock(), method, arguments))
+            return self.last_sequence
+
+    def discard(self, sequence: int) -> None:
+        """Drops a buffered event whose commit failed."""
+        with self._lock:
+            self._buffer = [event for event in self._buffer if event[0] != sequence]
+
+    def flush_if_due(self) -> None:
+        if len(self._buffer) >= JOURNAL_BATCH_SIZE or time.monotonic() - self._last_flush >= JOURNAL_FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered events in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if len(self._buffer) == 0:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO events (sequence, virtual_time, method, arguments) VALUES (?, ?, ?, ?)",
+                    self._buffer
+                )
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def iter_journal(
+        journal_path: Path, after: int = 0, until: int | None = None
+) -> Iterator[tuple[int, float, str, list, dict[str, Any]]]:
+    """
+    The events with `after < sequence <= until`, in order.
+    Format: (sequence, virtual_time, method, args, kwargs)
+    """
+    conn = sqlite3.connect(f"file:{journal_path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(
+            "SELECT sequence, virtual_time, method, arguments FROM events "
+            "WHERE sequence > ? AND sequence <= ? ORDER BY sequence",
+            (after, until if until is not None else 2**63 - 1)
+        )
+        while rows := cursor.fetchmany(1024):
+            for sequence, virtual_time, method, arguments in rows:
+                args, kwargs = json.loads(arguments, object_pairs_hook=_int_keys)
+                yield sequence, virtual_time, method, args, kwargs
+    finally:
+        conn.close()
+
+
+def _int_keys(pairs: list[tuple[str, Any]]) -> dict[Any, Any]:
+    """JSON turns the int keys of the {product_id: count} arguments into strings, this turns them back."""
+    return {int(key) if key.lstrip("-").isdigit() else key: value for key, value in pairs}
@@ -0,0 +1,46 @@
+import atexit
+import queue
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from logistics.database.database import Database
+
+
+class ReadOnlyPool:
+    """
+    Read-only connections to the database, for the threads serving reads next to the pipeline loops.
+    Each connection is used by one thread at a time, `connection` blocks while all of them are taken.
+    """
+    __slots__ = ("_connections", "_version_connection", "_version_lock", "size")
+
+    def __init__(self, db_path: Path, size: int):
+        if size < 1:
+            raise ValueError("The pool needs at least one connection")
+
+        self.size = size
+        self._connections: queue.SimpleQueue[Database] = queue.SimpleQueue()
+        for _ in range(size):
+            self._connections.put(Database(db_path, read_only=True))
+        # `PRAGMA data_version` is only comparable on one connection, this one never reads anything else
+        self._version_connection = sqlite3.connect(
+            f"{db_path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._version_lock = threading.Lock()
+
+        atexit.register(self._version_connection.close)
+
+    @contextmanager
+    def connection(self) -> Iterator[Database]:
+        database = self._connections.get()
+        try:
+            yield database
+        finally:
+            self._connections.put(database)
+
+    def data_version(self) -> int:
+        """Changes with every commit to the database (the pool itself never writes)."""
+        with self._version_lock:
+            return self._version_connection.execute("PRAGMA data_version").fetchone()[0]
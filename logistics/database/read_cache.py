@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+# Results kept per connection
+READ_CACHE_SIZE: int = 64
+
+# Rows kept per connection over all the results, larger results are not cached at all
+READ_CACHE_MAX_ROWS: int = 100_000
+
+
+@dataclass(frozen=True, slots=True)
+class ReadCacheStats:
+    hits: int
+    misses: int
+    evictions: int  # Results dropped to stay within the size limits, not the invalidations
+    entries: int
+    rows: int
+
+
+class ReadCache:
+    """
+    LRU of query results, valid for one version of the database only.
+    The version is whatever the caller compares (see `Database._data_version`), any change empties the cache.
+    Bounded by the number of results and by their total number of rows.
+    The results are shared between the callers, so they must not be modified.
+    """
+    __slots__ = ("_entries", "_rows", "_version", "evictions", "hits", "max_rows", "maxsize", "misses")
+
+    def __init__(self, maxsize: int = READ_CACHE_SIZE, max_rows: int = READ_CACHE_MAX_ROWS):
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._version: Hashable = None
+        self._entries: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()  # key -> (value, rows)
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> ReadCacheStats:
+        return ReadCacheStats(self.hits, self.misses, self.evictions, len(self._entries), self._rows)
+
+    def get(self, key: Hashable, version: Hashable) -> object | None:
+        """The cached value, or None (counted as a miss) if there is none for this version."""
+        if version != self._version:
+            self._entries.clear()
+            self._rows = 0
+            self._version = version
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, version: Hashable, value: object, rows: int) -> None:
+        if rows > self.max_rows:
+            return
+        if version != self._version:
+            if len(self._entries) > 0:
+                return  # Computed for an older version
+            self._version = version
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._rows -= previous[1]
+
+        self._entries[key] = (value, rows)
+        self._rows += rows
+        while len(self._entries) > self.maxsize or self._rows > self.max_rows:
+            _, (_, evicted_rows) = self._entries.popitem(last=False)
+            self._rows -= evicted_rows
+            self.evictions += 1
+
+    def get_or_compute[T](
+            self, key: Hashable, version: Hashable, compute: Callable[[], T], rows: Callable[[T], int] = len
+    ) -> T:
+        value = self.get(key, version)
+        if value is None:
+            value = compute()
+            self.put(key, version, value, rows(value))
+        return value
@@ -17,10 +17,45 @@ class TableName(StrEnum):
     TRANSPORTS = "transports"
     TRANSPORT_ROUTES = "transport_routes"
     TRANSPORTED_STOCK = "transported_stock"
+    ROUTING_GRAPH_VERSION = "routing_graph_version"
+    ROUTING_CONTRACTION_HIERARCHY = "routing_contraction_hierarchy"
+    TRANSPORT_ROUTE_PLANS = "transport_route_plans"
+    TRANSPORT_ROUTE_PLAN_STEPS = "transport_route_plan_steps"
+    ARCHIVED_TRANSPORTS = "archived_transports"
+    ARCHIVED_TRANSPORT_ROUTES = "archived_transport_routes"
+    ARCHIVED_TRANSPORTED_STOCK = "archived_transported_stock"
+    STOCK_SNAPSHOTS = "stock_snapshots"
+    JOURNAL_POSITION = "journal_position"
+    WAREHOUSES_SEARCH = "warehouses_search"
+    PRODUCTS_SEARCH = "products_search"
+    CONVOYS = "convoys"
 
 
 EXPECTED_TABLES: frozenset[str] = frozenset(t for t in TableName)
 
+# Filled by the schema itself, a row in them does not make the database non-empty
+_SEEDED_TABLES: frozenset[str] = frozenset((TableName.ROUTING_GRAPH_VERSION,))
+
+# Upgrade scripts from `sql/migrations/`, the schema version (`PRAGMA user_version`) is the number of applied ones.
+# `.database_schema.sql` always creates the latest schema directly.
+MIGRATIONS: tuple[str, ...] = (
+    "001_routing_graph_version.sql",
+    "002_routing_contraction_hierarchy.sql",
+    "003_transport_route_plans.sql",
+    "004_route_plan_invalidation.sql",
+    "005_transport_archive.sql",
+    "006_transport_completion.sql",
+    "007_stock_snapshots.sql",
+    "008_journal_position.sql",
+    "009_active_transport_indexes.sql",
+    "010_product_barcodes.sql",
+    "011_search_index.sql",
+    "012_two_way_connections.sql",
+    "013_transport_convoys.sql",
+    "014_two_way_plan_invalidation.sql",
+)
+SCHEMA_VERSION: int = len(MIGRATIONS)
+
 
 @dataclass(slots=True)
 class DBStatus:
@@ -33,9 +68,11 @@ class DBStatus:
     is_valid_sqlite: bool = False
     read_permission: bool = False
     write_permission: bool = False
+    schema_version: int = 0  # `PRAGMA user_version`, the number of applied migrations
     tables_present: set[str] = field(default_factory=set)
     tables_unknown: set[str] = field(default_factory=set)
-    row_counts: dict[str, int] = field(default_factory=dict)
+    tables_with_data: set[str] = field(default_factory=set)
+    row_counts: dict[str, int] = field(default_factory=dict)  # Only filled by `get_db_status(count_rows=True)`
 
     @property
     def tables_missing(self) -> frozenset[str]:
@@ -43,7 +80,12 @@ class DBStatus:
 
     @property
     def has_data(self) -> bool:
-        return any(count > 0 for count in self.row_counts.values())
+        return len(self.tables_with_data - _SEEDED_TABLES) != 0
+
+    @property
+    def is_outdated(self) -> bool:
+        """Created by an older version of the app, `migrate_database` brings it up to date."""
+        return self.schema_version < SCHEMA_VERSION
 
     @property
     def has_unknown_tables(self) -> bool:
@@ -59,7 +101,12 @@ class DBStatus:
         )
 
 
-def get_db_status(db_path: Path) -> DBStatus:
+def get_db_status(db_path: Path, *, count_rows: bool = False) -> DBStatus:
+    """
+    Inspects the file without modifying it. The schema is read from `sqlite_master` and `PRAGMA user_version`,
+    and each table is only probed for its first row: the check stays instant on a multi-GB database.
+    The full `COUNT(*)` of every table (a scan of each) is only done with `count_rows`.
+    """
     status = DBStatus()
 
     # --- 1. Find the "Anchor" (Deepest Existing Directory) ---
@@ -93,10 +140,10 @@ def get_db_status(db_path: Path) -> DBStatus:
         return status
 
     status.exists = True
-    status.file_readable = os.access(db_path, os.R_OK)
-    status.file_writable = os.access(db_path, os.W_OK)
+    status.read_permission = os.access(db_path, os.R_OK)
+    status.write_permission = os.access(db_path, os.W_OK)
 
-    if not status.file_readable:
+    if not status.read_permission:
         return status
 
     # --- 4. Check SQLite Internal Structure ---
@@ -106,15 +153,18 @@ def get_db_status(db_path: Path) -> DBStatus:
             status.is_valid_sqlite = True
             cursor = conn.cursor()
 
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+            # Without the shadow tables storing the full-text indexes
+            cursor.execute(
+                "SELECT name FROM pragma_table_list "
+                "WHERE schema = 'main' AND type IN ('table', 'virtual') AND name NOT LIKE 'sqlite_%'"
+            )
             found_tables = {row[0] for row in cursor.fetchall()}
+            status.schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
 
             status.tables_present = found_tables.intersection(EXPECTED_TABLES)
             status.tables_unknown = found_tables - EXPECTED_TABLES
 
-            for table in status.tables_present:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                status.row_counts[table] = cursor.fetchone()[0]
+            _probe_tables(cursor, status, count_rows=count_rows)
 
     except sqlite3.DatabaseError:
         status.is_valid_sqlite = False
@@ -122,6 +172,19 @@ def get_db_status(db_path: Path) -> DBStatus:
     return status
 
 
+def _probe_tables(cursor: sqlite3.Cursor, status: DBStatus, *, count_rows: bool) -> None:
+    for table in status.tables_present:
+        if count_rows:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            status.row_counts[table] = cursor.fetchone()[0]
+            has_rows = status.row_counts[table] > 0
+        else:
+            # Stops at the first row instead of scanning the table
+            has_rows = cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table} LIMIT 1)").fetchone()[0]  # noqa: S608
+        if has_rows:
+            status.tables_with_data.add(table)
+
+
 def setup_new_database(db_path: Path) -> None:
     schema_script = fetch_sql(".database_schema.sql")
 
@@ -137,6 +200,29 @@ def setup_new_database(db_path: Path) -> None:
         conn.close()
 
 
+def migrate_database(db_path: Path) -> int:
+    """
+    Brings an existing database up to `SCHEMA_VERSION`, each migration is applied in its own transaction.
+    Returns the number of applied migrations.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        version: int = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number in range(version + 1, SCHEMA_VERSION + 1):
+            migration = MIGRATIONS[number - 1]
+            conn.executescript(
+                f"BEGIN;\n{fetch_sql(f'migrations/{migration}')}\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
+            log(f"Applied database migration '{migration}'")
+        return max(SCHEMA_VERSION - version, 0)
+    except sqlite3.Error as e:
+        conn.rollback()
+        error(f"Database migration failed: {e}")
+        raise
+    finally:
+        conn.close()
+
+
 def try_setup_new_database(
         path: str = "./", db_name: str = "humble_logistics.sqlite"
 ) -> tuple[bool, tuple[str, str] | None]:
@@ -15,6 +15,7 @@ CREATE TABLE connections (
     source_warehouse_id INTEGER NOT NULL,
     target_warehouse_id INTEGER NOT NULL,
     transportation_time_minutes INTEGER NOT NULL,
+    two_way INTEGER NOT NULL DEFAULT 0 CHECK (two_way IN (0, 1)), -- Also from target to source, in the same time
 
     FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
     FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id),
@@ -27,11 +28,13 @@ CREATE TABLE connections (
 CREATE TABLE products (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
-    barcode INTEGER NOT NULL,
+    barcode INTEGER NOT NULL, -- EAN-13, see `logistics.database.barcodes`
     -- mass INTEGER NOT NULL,
     volume_cm INTEGER NOT NULL
 ) STRICT;
 
+CREATE UNIQUE INDEX products_barcode ON products (barcode);
+
 -- 4. Stock
 CREATE TABLE stock (
     warehouse_id INTEGER NOT NULL,
@@ -100,11 +103,19 @@ CREATE TABLE transports (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     source_warehouse_id INTEGER NOT NULL,
     target_warehouse_id INTEGER NOT NULL,
+    completed_timestamp INTEGER, -- Set when the cargo is unloaded at the target
 
     FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
     FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id)
 ) STRICT;
 
+-- Finished transports by completion time, for the time-range and keyset paginated history
+CREATE INDEX transports_completed ON transports (completed_timestamp, id) WHERE completed_timestamp IS NOT NULL;
+
+-- In-flight transports by their endpoints, for the warehouse details and the reserved capacity
+CREATE INDEX transports_active_source ON transports (source_warehouse_id) WHERE completed_timestamp IS NULL;
+CREATE INDEX transports_active_target ON transports (target_warehouse_id) WHERE completed_timestamp IS NULL;
+
 -- 6. Transport Routes
 CREATE TABLE transport_routes (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -112,11 +123,20 @@ CREATE TABLE transport_routes (
     connection_id INTEGER NOT NULL,
     start_timestamp INTEGER NOT NULL, -- Store as Unix Epoch minutes
     arrival_timestamp INTEGER,        -- Nullable if not arrived yet
+    reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1)), -- From target to source of a two-way connection
+    convoy_id INTEGER, -- No FK, the archive deletes a convoy with its last leg (an FK would need an index on every leg)
 
     FOREIGN KEY (transport_id) REFERENCES transports(id),
     FOREIGN KEY (connection_id) REFERENCES connections(id)
 ) STRICT;
 
+-- The leg each in-flight transport is currently on, the legs in a convoy are found through their convoy instead
+CREATE INDEX transport_routes_open_legs ON transport_routes (transport_id)
+WHERE arrival_timestamp IS NULL AND convoy_id IS NULL;
+
+-- Every leg of a transport, for finding the finished ones (and for the transport details)
+CREATE INDEX transport_routes_transport ON transport_routes (transport_id);
+
 -- 7. Transported Stock
 CREATE TABLE transported_stock (
     transport_id INTEGER NOT NULL,
@@ -126,4 +146,267 @@ CREATE TABLE transported_stock (
     PRIMARY KEY (transport_id, product_id),
     FOREIGN KEY (transport_id) REFERENCES transports(id),
     FOREIGN KEY (product_id) REFERENCES products(id)
-) STRICT;
\ No newline at end of file
+) STRICT;
+
+-- 8. Routing Graph Version
+-- Bumped on every change of the connections, so the routing caches of both loops can tell when they are stale
+CREATE TABLE routing_graph_version (
+    id INTEGER PRIMARY KEY CHECK ( id = 0 ),
+    version INTEGER NOT NULL
+) STRICT;
+
+INSERT INTO routing_graph_version (id, version) VALUES (0, 0);
+
+CREATE TRIGGER bump_routing_graph_version_insert
+AFTER INSERT ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_routing_graph_version_update
+AFTER UPDATE ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_routing_graph_version_delete
+AFTER DELETE ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
+
+-- 9. Routing Contraction Hierarchy
+-- Preprocessed routing index (see `logistics.routing.contraction`), packed int64 arrays.
+-- Only valid while `graph_version` matches `routing_graph_version.version`.
+CREATE TABLE routing_contraction_hierarchy (
+    id INTEGER PRIMARY KEY CHECK ( id = 0 ),
+    graph_version INTEGER NOT NULL,
+    node_ids BLOB NOT NULL,
+    node_ranks BLOB NOT NULL,
+    edges BLOB NOT NULL
+) STRICT;
+
+-- 10. Transport Route Plans
+-- The full route is planned once at dispatch, every stop only advances `next_step`.
+-- Steps from `next_step` on are deleted whenever a connection they use is edited or removed
+-- (or the transport is rerouted), the event loop replans the transports left without a next step.
+CREATE TABLE transport_route_plans (
+    transport_id INTEGER PRIMARY KEY,
+    next_step INTEGER NOT NULL, -- Index of the step the transport takes at its next stop
+
+    FOREIGN KEY (transport_id) REFERENCES transports(id)
+) STRICT;
+
+CREATE TABLE transport_route_plan_steps (
+    transport_id INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    connection_id INTEGER NOT NULL, -- No FK, the plan is dropped by the triggers below when the connection goes
+    reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1)),
+
+    PRIMARY KEY (transport_id, step),
+    FOREIGN KEY (transport_id) REFERENCES transport_route_plans(transport_id)
+) STRICT, WITHOUT ROWID;
+
+CREATE INDEX transport_route_plan_steps_connection ON transport_route_plan_steps (connection_id, transport_id);
+
+CREATE TRIGGER invalidate_route_plans_connection_update
+AFTER UPDATE OF source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way ON connections
+-- A connection getting faster (or two-way) cannot make the shortest paths through it any longer, those plans are kept
+WHEN NEW.source_warehouse_id <> OLD.source_warehouse_id
+    OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+    OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+    OR NEW.two_way < OLD.two_way
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+        -- Only losing the way back leaves the plans in the forward direction valid
+        AND (
+            used.reverse = 1
+            OR NEW.source_warehouse_id <> OLD.source_warehouse_id
+            OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+            OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+        )
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+CREATE TRIGGER invalidate_route_plans_connection_delete
+AFTER DELETE ON connections
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+CREATE TRIGGER invalidate_route_plan_reroute
+AFTER UPDATE OF target_warehouse_id ON transports
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id = NEW.id
+    AND step >= (SELECT next_step FROM transport_route_plans WHERE transport_id = NEW.id);
+END;
+
+-- 11. Transport Archive
+-- Finished transports with their legs and cargo, moved out of the hot tables by the archive loop
+CREATE TABLE archived_transports (
+    id INTEGER PRIMARY KEY, -- Same id as in `transports`, which never reuses ids (AUTOINCREMENT)
+    source_warehouse_id INTEGER NOT NULL,
+    target_warehouse_id INTEGER NOT NULL,
+    start_timestamp INTEGER NOT NULL,
+    arrival_timestamp INTEGER NOT NULL,
+
+    FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
+    FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id)
+) STRICT;
+
+CREATE TABLE archived_transport_routes (
+    id INTEGER PRIMARY KEY, -- Same id as in `transport_routes`
+    transport_id INTEGER NOT NULL,
+    connection_id INTEGER NOT NULL, -- No FK, archived legs must not prevent removing the connection
+    source_warehouse_id INTEGER NOT NULL,
+    target_warehouse_id INTEGER NOT NULL,
+    start_timestamp INTEGER NOT NULL,
+    arrival_timestamp INTEGER NOT NULL,
+
+    FOREIGN KEY (transport_id) REFERENCES archived_transports(id),
+    FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
+    FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id)
+) STRICT;
+
+CREATE INDEX archived_transport_routes_transport ON archived_transport_routes (transport_id);
+
+CREATE TABLE archived_transported_stock (
+    transport_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+
+    PRIMARY KEY (transport_id, product_id),
+    FOREIGN KEY (transport_id) REFERENCES archived_transports(id),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+) STRICT;
+
+CREATE INDEX archived_transports_completed ON archived_transports (arrival_timestamp, id);
+
+-- 12. Stock Snapshots
+-- Append-only, delta-encoded history of the stock levels (see `logistics.database.stock_history`)
+CREATE TABLE stock_snapshots (
+    warehouse_id INTEGER NOT NULL, -- No FK, the history outlives removed warehouses
+    timestamp INTEGER NOT NULL,    -- Virtual epoch minutes
+    filled_volume INTEGER NOT NULL,
+    is_keyframe INTEGER NOT NULL,  -- 1: full product counts, 0: changes since the previous snapshot
+    product_counts BLOB NOT NULL,  -- See `logistics.database.stock_history.encode_counts`
+
+    PRIMARY KEY (warehouse_id, timestamp)
+) STRICT, WITHOUT ROWID;
+
+-- 13. Journal Position
+-- Where a replay of the event journal continues from (see `logistics.database.journal`)
+CREATE TABLE journal_position (
+    id INTEGER PRIMARY KEY CHECK (id = 0), -- Single row, only on snapshots and replayed databases
+    sequence INTEGER NOT NULL              -- Last event of the event journal contained in this database
+) STRICT;
+
+-- 14. Search
+-- Full-text prefix search for the console lookups, external content tables kept in sync by the triggers
+CREATE VIRTUAL TABLE warehouses_search USING fts5(
+    name, location, content = 'warehouses', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3'
+);
+
+CREATE VIRTUAL TABLE products_search USING fts5(
+    name, content = 'products', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'
+);
+
+CREATE TRIGGER warehouses_search_insert AFTER INSERT ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (rowid, name, location) VALUES (NEW.id, NEW.name, NEW.location);
+END;
+
+CREATE TRIGGER warehouses_search_delete AFTER DELETE ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (warehouses_search, rowid, name, location)
+    VALUES ('delete', OLD.id, OLD.name, OLD.location);
+END;
+
+CREATE TRIGGER warehouses_search_update AFTER UPDATE OF name, location ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (warehouses_search, rowid, name, location)
+    VALUES ('delete', OLD.id, OLD.name, OLD.location);
+    INSERT INTO warehouses_search (rowid, name, location) VALUES (NEW.id, NEW.name, NEW.location);
+END;
+
+CREATE TRIGGER products_search_insert AFTER INSERT ON products
+BEGIN
+    INSERT INTO products_search (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER products_search_delete AFTER DELETE ON products
+BEGIN
+    INSERT INTO products_search (products_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+END;
+
+CREATE TRIGGER products_search_update AFTER UPDATE OF name ON products
+BEGIN
+    INSERT INTO products_search (products_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO products_search (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+-- 15. Convoys
+-- Optional (see `Database(convoys=True)`): the legs leaving on the same connection, in the same direction and minute
+-- share one row, whose arrival is written once for all of them.
+-- A leg in a convoy keeps its own row (per-transport history), its arrival is the convoy's unless it has its own.
+CREATE TABLE convoys (
+    id INTEGER PRIMARY KEY,
+    connection_id INTEGER NOT NULL,
+    reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1)),
+    start_timestamp INTEGER NOT NULL, -- Unix Epoch minutes
+    arrival_timestamp INTEGER,        -- Nullable if not arrived yet
+
+    FOREIGN KEY (connection_id) REFERENCES connections(id)
+) STRICT;
+
+-- The convoy a leg leaving now joins, and the convoys on the road
+CREATE UNIQUE INDEX convoys_open ON convoys (connection_id, reverse, start_timestamp) WHERE arrival_timestamp IS NULL;
+
+CREATE INDEX transport_routes_convoy ON transport_routes (convoy_id) WHERE convoy_id IS NOT NULL;
+
+-- Every leg with its arrival, the one of its convoy if it has none of its own
+CREATE VIEW transport_legs AS
+SELECT
+    transport_routes.id,
+    transport_routes.transport_id,
+    transport_routes.connection_id,
+    transport_routes.reverse,
+    transport_routes.start_timestamp,
+    COALESCE(transport_routes.arrival_timestamp, convoys.arrival_timestamp) AS arrival_timestamp
+FROM transport_routes
+LEFT JOIN convoys ON transport_routes.convoy_id = convoys.id;
+
+-- The legs on the road, each kind through its own index (by leg or by transport)
+CREATE VIEW open_transport_legs AS
+SELECT id, transport_id, connection_id, reverse, start_timestamp
+FROM transport_routes
+WHERE arrival_timestamp IS NULL AND convoy_id IS NULL
+UNION ALL
+SELECT members.id, members.transport_id, members.connection_id, members.reverse, members.start_timestamp
+FROM convoys
+JOIN transport_routes members ON convoys.id = members.convoy_id
+WHERE convoys.arrival_timestamp IS NULL AND members.arrival_timestamp IS NULL;
+
+-- Bumped alongside every migration in `setup.MIGRATIONS`
+PRAGMA user_version = 14;
\ No newline at end of file
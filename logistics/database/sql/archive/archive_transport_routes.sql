@@ -0,0 +1,16 @@
+-- The warehouses are copied from the connection (in the direction of the leg),
+-- the connection itself might be removed later on
+INSERT INTO archived_transport_routes (
+    id, transport_id, connection_id, source_warehouse_id, target_warehouse_id, start_timestamp, arrival_timestamp
+)
+SELECT
+    legs.id,
+    legs.transport_id,
+    legs.connection_id,
+    IIF(legs.reverse, connections.target_warehouse_id, connections.source_warehouse_id),
+    IIF(legs.reverse, connections.source_warehouse_id, connections.target_warehouse_id),
+    legs.start_timestamp,
+    legs.arrival_timestamp
+FROM transport_legs legs
+JOIN connections ON legs.connection_id = connections.id
+WHERE legs.transport_id IN (SELECT value FROM json_each(?));
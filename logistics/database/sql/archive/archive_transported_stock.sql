@@ -0,0 +1,4 @@
+INSERT INTO archived_transported_stock (transport_id, product_id, count)
+SELECT transport_id, product_id, count
+FROM transported_stock
+WHERE transport_id IN (SELECT value FROM json_each(?));
@@ -0,0 +1,11 @@
+INSERT INTO archived_transports (id, source_warehouse_id, target_warehouse_id, start_timestamp, arrival_timestamp)
+SELECT
+    transports.id,
+    transports.source_warehouse_id,
+    transports.target_warehouse_id,
+    MIN(transport_routes.start_timestamp),
+    transports.completed_timestamp
+FROM transports
+JOIN transport_routes ON transports.id = transport_routes.transport_id
+WHERE transports.id IN (SELECT value FROM json_each(?))
+GROUP BY transports.id;
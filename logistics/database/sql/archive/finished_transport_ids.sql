@@ -0,0 +1,6 @@
+-- Transports completed (arrived and unloaded) before the given minute, oldest first
+SELECT id
+FROM transports
+WHERE completed_timestamp < ?
+ORDER BY completed_timestamp, id
+LIMIT ?;
@@ -0,0 +1,9 @@
+SELECT
+    products.id,
+    products.name,
+    products.barcode,
+    archived_transported_stock.count,
+    (archived_transported_stock.count * products.volume_cm) AS total_volume
+FROM archived_transported_stock
+JOIN products ON archived_transported_stock.product_id = products.id
+WHERE archived_transported_stock.transport_id = ?;
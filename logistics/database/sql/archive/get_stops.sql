@@ -0,0 +1,11 @@
+SELECT
+    archived_transport_routes.id,
+    w_source.id, w_source.name, w_source.location,
+    w_target.id, w_target.name, w_target.location,
+    archived_transport_routes.start_timestamp,
+    archived_transport_routes.arrival_timestamp
+FROM archived_transport_routes
+JOIN warehouses w_source ON archived_transport_routes.source_warehouse_id = w_source.id
+JOIN warehouses w_target ON archived_transport_routes.target_warehouse_id = w_target.id
+WHERE archived_transport_routes.transport_id = ?
+ORDER BY archived_transport_routes.start_timestamp ASC;
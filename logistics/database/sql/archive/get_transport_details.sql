@@ -0,0 +1,17 @@
+SELECT
+    t.id,
+    -- Master Source
+    w_source.id,
+    w_source.name,
+    w_source.location,
+    -- Master Target
+    w_target.id,
+    w_target.name,
+    w_target.location,
+    -- Times
+    t.start_timestamp,
+    t.arrival_timestamp
+FROM archived_transports t
+JOIN warehouses w_source ON t.source_warehouse_id = w_source.id
+JOIN warehouses w_target ON t.target_warehouse_id = w_target.id
+WHERE t.id = ?;
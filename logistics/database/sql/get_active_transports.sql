@@ -11,8 +11,8 @@ SELECT
     -- Overall Start Time
     (
         SELECT MIN(all_routes.start_timestamp)
-        FROM transport_routes
-        WHERE transport_routes.transport_id = transports.id
+        FROM transport_routes all_routes
+        WHERE all_routes.transport_id = transports.id
     ) AS start_time,
     -- Last Stop (Where the truck is coming FROM on the current leg)
     last_stop_warehouse.id,
@@ -26,7 +26,11 @@ SELECT
 FROM transports
 JOIN warehouses source_warehouse ON transports.source_warehouse_id = source_warehouse.id
 JOIN warehouses target_warehouse ON transports.target_warehouse_id = target_warehouse.id
-JOIN transport_routes last_route ON transports.id = last_route.transport_id
-JOIN warehouses last_stop_warehouse ON last_route.source_warehouse_id = last_stop_warehouse.id
-JOIN warehouses next_stop_warehouse ON last_route.target_warehouse_id = next_stop_warehouse.id
-WHERE last_route.arrival_timestamp IS NULL;
\ No newline at end of file
+JOIN open_transport_legs last_route ON transports.id = last_route.transport_id
+JOIN connections last_connection ON last_route.connection_id = last_connection.id
+JOIN warehouses last_stop_warehouse ON last_stop_warehouse.id = IIF(
+    last_route.reverse, last_connection.target_warehouse_id, last_connection.source_warehouse_id
+)
+JOIN warehouses next_stop_warehouse ON next_stop_warehouse.id = IIF(
+    last_route.reverse, last_connection.source_warehouse_id, last_connection.target_warehouse_id
+);
\ No newline at end of file
@@ -0,0 +1,41 @@
+-- The legs in a convoy are found from the open convoys (CROSS JOIN keeps that order), not by scanning every leg
+WITH due_legs AS (
+    SELECT
+        transport_routes.id,
+        transport_routes.transport_id,
+        transport_routes.reverse,
+        connections.source_warehouse_id,
+        connections.target_warehouse_id
+    FROM transport_routes
+    JOIN connections ON transport_routes.connection_id = connections.id
+    WHERE transport_routes.arrival_timestamp IS NULL
+        AND transport_routes.convoy_id IS NULL
+        AND transport_routes.start_timestamp + connections.transportation_time_minutes <= :minute
+    UNION ALL
+    SELECT
+        members.id,
+        members.transport_id,
+        convoys.reverse,
+        connections.source_warehouse_id,
+        connections.target_warehouse_id
+    FROM convoys
+    CROSS JOIN transport_routes members ON convoys.id = members.convoy_id
+    JOIN connections ON convoys.connection_id = connections.id
+    WHERE convoys.arrival_timestamp IS NULL
+        AND members.arrival_timestamp IS NULL
+        AND convoys.start_timestamp + connections.transportation_time_minutes <= :minute
+)
+SELECT
+    due_legs.id,
+    due_legs.transport_id,
+    IIF(due_legs.reverse, due_legs.source_warehouse_id, due_legs.target_warehouse_id) AS stop_id,
+    transports.target_warehouse_id,
+    plans.next_step,
+    IIF(steps.reverse, -steps.connection_id, steps.connection_id) -- Negative for the way back, as in the graph
+FROM due_legs
+JOIN transports ON due_legs.transport_id = transports.id
+LEFT JOIN transport_route_plans plans ON due_legs.transport_id = plans.transport_id
+LEFT JOIN transport_route_plan_steps steps
+    ON plans.transport_id = steps.transport_id AND plans.next_step = steps.step
+WHERE :warehouse_ids IS NULL OR stop_id IN (SELECT value FROM json_each(:warehouse_ids))
+ORDER BY due_legs.id;
@@ -0,0 +1,66 @@
+-- Finished transports completed within [:completed_from, :completed_to), newest first.
+-- Keyset pagination: a page continues right after the (:before_completed, :before_id) key of the previous one,
+-- so every page is an index range scan on the hot and on the archive table, whatever the size of the history.
+SELECT
+    id,
+    source_id, source_name, source_location,
+    target_id, target_name, target_location,
+    stop_count,
+    start_time,
+    completed_time,
+    (completed_time - start_time)
+FROM (
+    SELECT * FROM (
+        SELECT
+            transports.id AS id,
+            source_warehouse.id AS source_id,
+            source_warehouse.name AS source_name,
+            source_warehouse.location AS source_location,
+            target_warehouse.id AS target_id,
+            target_warehouse.name AS target_name,
+            target_warehouse.location AS target_location,
+            (SELECT COUNT(*) FROM transport_routes WHERE transport_id = transports.id) AS stop_count,
+            (SELECT MIN(start_timestamp) FROM transport_routes WHERE transport_id = transports.id) AS start_time,
+            transports.completed_timestamp AS completed_time
+        FROM transports
+        JOIN warehouses source_warehouse ON transports.source_warehouse_id = source_warehouse.id
+        JOIN warehouses target_warehouse ON transports.target_warehouse_id = target_warehouse.id
+        WHERE transports.completed_timestamp >= :completed_from
+        AND transports.completed_timestamp < :completed_to
+        AND transports.completed_timestamp <= :before_completed
+        AND (transports.completed_timestamp, transports.id) < (:before_completed, :before_id)
+        ORDER BY transports.completed_timestamp DESC, transports.id DESC
+        LIMIT :limit
+    )
+
+    UNION ALL
+
+    -- Archived transports (see `logistics.pipeline_loops.archive_loop`)
+    SELECT * FROM (
+        SELECT
+            archived_transports.id,
+            source_warehouse.id,
+            source_warehouse.name,
+            source_warehouse.location,
+            target_warehouse.id,
+            target_warehouse.name,
+            target_warehouse.location,
+            (
+                SELECT COUNT(*) FROM archived_transport_routes
+                WHERE archived_transport_routes.transport_id = archived_transports.id
+            ),
+            archived_transports.start_timestamp,
+            archived_transports.arrival_timestamp
+        FROM archived_transports
+        JOIN warehouses source_warehouse ON archived_transports.source_warehouse_id = source_warehouse.id
+        JOIN warehouses target_warehouse ON archived_transports.target_warehouse_id = target_warehouse.id
+        WHERE archived_transports.arrival_timestamp >= :completed_from
+        AND archived_transports.arrival_timestamp < :completed_to
+        AND archived_transports.arrival_timestamp <= :before_completed
+        AND (archived_transports.arrival_timestamp, archived_transports.id) < (:before_completed, :before_id)
+        ORDER BY archived_transports.arrival_timestamp DESC, archived_transports.id DESC
+        LIMIT :limit
+    )
+)
+ORDER BY completed_time DESC, id DESC
+LIMIT :limit;
@@ -0,0 +1,16 @@
+-- The given warehouses without room for their stock and the cargo of the transports heading to them
+SELECT warehouses.id
+FROM warehouses
+WHERE warehouses.id IN (SELECT value FROM json_each(?))
+AND warehouses.capacity_volume_cm < (
+    SELECT TOTAL(stock.count * products.volume_cm)
+    FROM stock
+    JOIN products ON stock.product_id = products.id
+    WHERE stock.warehouse_id = warehouses.id
+) + (
+    SELECT TOTAL(transported_stock.count * products.volume_cm)
+    FROM transports
+    JOIN transported_stock ON transports.id = transported_stock.transport_id
+    JOIN products ON transported_stock.product_id = products.id
+    WHERE transports.target_warehouse_id = warehouses.id AND transports.completed_timestamp IS NULL
+);
@@ -0,0 +1,13 @@
+-- In-flight transports whose remaining route plan (steps from `next_step` on) uses the connection, either way
+SELECT DISTINCT
+    plans.transport_id,
+    open_leg.id,
+    plans.next_step,
+    IIF(open_leg.reverse, open_leg_connection.source_warehouse_id, open_leg_connection.target_warehouse_id),
+    transports.target_warehouse_id
+FROM transport_route_plan_steps used
+JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+JOIN transports ON plans.transport_id = transports.id
+JOIN open_transport_legs open_leg ON plans.transport_id = open_leg.transport_id
+JOIN connections open_leg_connection ON open_leg.connection_id = open_leg_connection.id
+WHERE used.connection_id = ? AND used.step >= plans.next_step;
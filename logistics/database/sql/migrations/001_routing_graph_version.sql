@@ -0,0 +1,24 @@
+CREATE TABLE routing_graph_version (
+    id INTEGER PRIMARY KEY CHECK ( id = 0 ),
+    version INTEGER NOT NULL
+) STRICT;
+
+INSERT INTO routing_graph_version (id, version) VALUES (0, 0);
+
+CREATE TRIGGER bump_routing_graph_version_insert
+AFTER INSERT ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_routing_graph_version_update
+AFTER UPDATE ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
+
+CREATE TRIGGER bump_routing_graph_version_delete
+AFTER DELETE ON connections
+BEGIN
+    UPDATE routing_graph_version SET version = version + 1;
+END;
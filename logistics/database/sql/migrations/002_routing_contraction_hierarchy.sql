@@ -0,0 +1,7 @@
+CREATE TABLE routing_contraction_hierarchy (
+    id INTEGER PRIMARY KEY CHECK ( id = 0 ),
+    graph_version INTEGER NOT NULL,
+    node_ids BLOB NOT NULL,
+    node_ranks BLOB NOT NULL,
+    edges BLOB NOT NULL
+) STRICT;
@@ -0,0 +1,57 @@
+CREATE TABLE transport_route_plans (
+    transport_id INTEGER PRIMARY KEY,
+    next_step INTEGER NOT NULL, -- Index of the step the transport takes at its next stop
+
+    FOREIGN KEY (transport_id) REFERENCES transports(id)
+) STRICT;
+
+CREATE TABLE transport_route_plan_steps (
+    transport_id INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    connection_id INTEGER NOT NULL, -- No FK, the plan is dropped by the triggers below when the connection goes
+
+    PRIMARY KEY (transport_id, step),
+    FOREIGN KEY (transport_id) REFERENCES transport_route_plans(transport_id)
+) STRICT, WITHOUT ROWID;
+
+CREATE INDEX transport_route_plan_steps_connection ON transport_route_plan_steps (connection_id, transport_id);
+
+CREATE TRIGGER invalidate_route_plans_connection_update
+AFTER UPDATE OF source_warehouse_id, target_warehouse_id, transportation_time_minutes ON connections
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+CREATE TRIGGER invalidate_route_plans_connection_delete
+AFTER DELETE ON connections
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+CREATE TRIGGER invalidate_route_plan_reroute
+AFTER UPDATE OF target_warehouse_id ON transports
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id = NEW.id
+    AND step >= (SELECT next_step FROM transport_route_plans WHERE transport_id = NEW.id);
+END;
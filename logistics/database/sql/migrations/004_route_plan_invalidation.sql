@@ -0,0 +1,24 @@
+-- A connection getting faster cannot make the shortest paths through it any longer, those plans are kept
+DROP TRIGGER invalidate_route_plans_connection_update;
+
+CREATE TRIGGER invalidate_route_plans_connection_update
+AFTER UPDATE OF source_warehouse_id, target_warehouse_id, transportation_time_minutes ON connections
+WHEN NEW.source_warehouse_id <> OLD.source_warehouse_id
+    OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+    OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+-- The leg each in-flight transport is currently on
+CREATE INDEX transport_routes_open_legs ON transport_routes (transport_id) WHERE arrival_timestamp IS NULL;
@@ -0,0 +1,39 @@
+CREATE TABLE archived_transports (
+    id INTEGER PRIMARY KEY, -- Same id as in `transports`, which never reuses ids (AUTOINCREMENT)
+    source_warehouse_id INTEGER NOT NULL,
+    target_warehouse_id INTEGER NOT NULL,
+    start_timestamp INTEGER NOT NULL,
+    arrival_timestamp INTEGER NOT NULL,
+
+    FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
+    FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id)
+) STRICT;
+
+CREATE TABLE archived_transport_routes (
+    id INTEGER PRIMARY KEY, -- Same id as in `transport_routes`
+    transport_id INTEGER NOT NULL,
+    connection_id INTEGER NOT NULL, -- No FK, archived legs must not prevent removing the connection
+    source_warehouse_id INTEGER NOT NULL,
+    target_warehouse_id INTEGER NOT NULL,
+    start_timestamp INTEGER NOT NULL,
+    arrival_timestamp INTEGER NOT NULL,
+
+    FOREIGN KEY (transport_id) REFERENCES archived_transports(id),
+    FOREIGN KEY (source_warehouse_id) REFERENCES warehouses(id),
+    FOREIGN KEY (target_warehouse_id) REFERENCES warehouses(id)
+) STRICT;
+
+CREATE INDEX archived_transport_routes_transport ON archived_transport_routes (transport_id);
+
+CREATE TABLE archived_transported_stock (
+    transport_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+
+    PRIMARY KEY (transport_id, product_id),
+    FOREIGN KEY (transport_id) REFERENCES archived_transports(id),
+    FOREIGN KEY (product_id) REFERENCES products(id)
+) STRICT;
+
+-- Every leg of a transport, for finding the finished ones (and for the transport details)
+CREATE INDEX transport_routes_transport ON transport_routes (transport_id);
@@ -0,0 +1,22 @@
+ALTER TABLE transports ADD COLUMN completed_timestamp INTEGER; -- Set when the cargo is unloaded at the target
+
+-- Transports finished before this migration: arrived at their target, nothing left on the road
+UPDATE transports
+SET completed_timestamp = (
+    SELECT MAX(arrival_timestamp) FROM transport_routes WHERE transport_id = transports.id
+)
+WHERE NOT EXISTS (SELECT 1 FROM transport_route_plans WHERE transport_id = transports.id)
+AND NOT EXISTS (
+    SELECT 1 FROM transport_routes WHERE transport_id = transports.id AND arrival_timestamp IS NULL
+)
+AND (
+    SELECT connections.target_warehouse_id
+    FROM transport_routes
+    JOIN connections ON transport_routes.connection_id = connections.id
+    WHERE transport_routes.transport_id = transports.id
+    ORDER BY transport_routes.id DESC
+    LIMIT 1
+) = target_warehouse_id;
+
+CREATE INDEX transports_completed ON transports (completed_timestamp, id) WHERE completed_timestamp IS NOT NULL;
+CREATE INDEX archived_transports_completed ON archived_transports (arrival_timestamp, id);
@@ -0,0 +1,9 @@
+CREATE TABLE stock_snapshots (
+    warehouse_id INTEGER NOT NULL, -- No FK, the history outlives removed warehouses
+    timestamp INTEGER NOT NULL,    -- Virtual epoch minutes
+    filled_volume INTEGER NOT NULL,
+    is_keyframe INTEGER NOT NULL,  -- 1: full product counts, 0: changes since the previous snapshot
+    product_counts BLOB NOT NULL,  -- See `logistics.database.stock_history.encode_counts`
+
+    PRIMARY KEY (warehouse_id, timestamp)
+) STRICT, WITHOUT ROWID;
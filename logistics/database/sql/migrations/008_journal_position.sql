@@ -0,0 +1,4 @@
+CREATE TABLE journal_position (
+    id INTEGER PRIMARY KEY CHECK (id = 0), -- Single row, only on snapshots and replayed databases
+    sequence INTEGER NOT NULL              -- Last event of the event journal contained in this database
+) STRICT;
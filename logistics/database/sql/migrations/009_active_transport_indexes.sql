@@ -0,0 +1,3 @@
+-- In-flight transports by their endpoints, for the warehouse details and the reserved capacity
+CREATE INDEX transports_active_source ON transports (source_warehouse_id) WHERE completed_timestamp IS NULL;
+CREATE INDEX transports_active_target ON transports (target_warehouse_id) WHERE completed_timestamp IS NULL;
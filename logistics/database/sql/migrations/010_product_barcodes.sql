@@ -0,0 +1,12 @@
+-- Stable EAN-13 barcodes derived from the product id (see `logistics.database.barcodes`), replacing the
+-- per-process randomized hash(name): '2', the id on 11 digits and the check digit, weighted 1, 3, 1, 3, ...
+UPDATE products SET barcode = (
+    SELECT CAST(digits || ((10 - (
+        substr(digits, 1, 1) + 3 * substr(digits, 2, 1) + substr(digits, 3, 1) + 3 * substr(digits, 4, 1)
+        + substr(digits, 5, 1) + 3 * substr(digits, 6, 1) + substr(digits, 7, 1) + 3 * substr(digits, 8, 1)
+        + substr(digits, 9, 1) + 3 * substr(digits, 10, 1) + substr(digits, 11, 1) + 3 * substr(digits, 12, 1)
+    ) % 10) % 10) AS INTEGER)
+    FROM (SELECT '2' || printf('%011d', products.id) AS digits)
+);
+
+CREATE UNIQUE INDEX products_barcode ON products (barcode);
@@ -0,0 +1,47 @@
+-- Full-text prefix search over the warehouse names and locations and the product names, for the console lookups.
+-- External content tables: only the index is stored, the triggers keep it in sync with the source tables.
+CREATE VIRTUAL TABLE warehouses_search USING fts5(
+    name, location, content = 'warehouses', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '1 2 3'
+);
+
+CREATE VIRTUAL TABLE products_search USING fts5(
+    name, content = 'products', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'
+);
+
+CREATE TRIGGER warehouses_search_insert AFTER INSERT ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (rowid, name, location) VALUES (NEW.id, NEW.name, NEW.location);
+END;
+
+CREATE TRIGGER warehouses_search_delete AFTER DELETE ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (warehouses_search, rowid, name, location)
+    VALUES ('delete', OLD.id, OLD.name, OLD.location);
+END;
+
+CREATE TRIGGER warehouses_search_update AFTER UPDATE OF name, location ON warehouses
+BEGIN
+    INSERT INTO warehouses_search (warehouses_search, rowid, name, location)
+    VALUES ('delete', OLD.id, OLD.name, OLD.location);
+    INSERT INTO warehouses_search (rowid, name, location) VALUES (NEW.id, NEW.name, NEW.location);
+END;
+
+CREATE TRIGGER products_search_insert AFTER INSERT ON products
+BEGIN
+    INSERT INTO products_search (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER products_search_delete AFTER DELETE ON products
+BEGIN
+    INSERT INTO products_search (products_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+END;
+
+CREATE TRIGGER products_search_update AFTER UPDATE OF name ON products
+BEGIN
+    INSERT INTO products_search (products_search, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO products_search (rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+INSERT INTO warehouses_search (warehouses_search) VALUES ('rebuild');
+INSERT INTO products_search (products_search) VALUES ('rebuild');
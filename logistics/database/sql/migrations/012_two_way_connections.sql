@@ -0,0 +1,80 @@
+-- Two-way connections as a single row, the routing graph gets both directions from it.
+-- Legs and plan steps on the way back (target to source) of a two-way connection are flagged `reverse`.
+ALTER TABLE connections ADD COLUMN two_way INTEGER NOT NULL DEFAULT 0 CHECK (two_way IN (0, 1));
+ALTER TABLE transport_routes ADD COLUMN reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1));
+ALTER TABLE transport_route_plan_steps ADD COLUMN reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1));
+
+-- Pairs of opposite connections with the same time become one two-way connection, the one with the lower id.
+-- Parallel duplicates are paired one to one, by their rank among the connections of the same direction and time.
+CREATE TEMP TABLE merged_connections (
+    kept_id INTEGER PRIMARY KEY,
+    dropped_id INTEGER NOT NULL UNIQUE
+);
+
+WITH ranked AS (
+    SELECT
+        id,
+        source_warehouse_id,
+        target_warehouse_id,
+        transportation_time_minutes,
+        ROW_NUMBER() OVER (
+            PARTITION BY source_warehouse_id, target_warehouse_id, transportation_time_minutes ORDER BY id
+        ) AS rank
+    FROM connections
+)
+INSERT INTO merged_connections (kept_id, dropped_id)
+SELECT forward.id, backward.id
+FROM ranked forward
+JOIN ranked backward
+    ON backward.source_warehouse_id = forward.target_warehouse_id
+    AND backward.target_warehouse_id = forward.source_warehouse_id
+    AND backward.transportation_time_minutes = forward.transportation_time_minutes
+    AND backward.rank = forward.rank
+WHERE forward.id < backward.id;
+
+UPDATE transport_routes
+SET connection_id = (SELECT kept_id FROM merged_connections WHERE dropped_id = transport_routes.connection_id),
+    reverse = 1
+WHERE connection_id IN (SELECT dropped_id FROM merged_connections);
+
+UPDATE transport_route_plan_steps
+SET connection_id = (
+        SELECT kept_id FROM merged_connections WHERE dropped_id = transport_route_plan_steps.connection_id
+    ),
+    reverse = 1
+WHERE connection_id IN (SELECT dropped_id FROM merged_connections);
+
+-- The archived legs keep their warehouses, only the connection they point to changes
+UPDATE archived_transport_routes
+SET connection_id = (
+        SELECT kept_id FROM merged_connections WHERE dropped_id = archived_transport_routes.connection_id
+    )
+WHERE connection_id IN (SELECT dropped_id FROM merged_connections);
+
+-- Plans on the way back of a connection that stops being two-way are dropped like those of a slower connection
+DROP TRIGGER invalidate_route_plans_connection_update;
+CREATE TRIGGER invalidate_route_plans_connection_update
+AFTER UPDATE OF source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way ON connections
+-- A connection getting faster (or two-way) cannot make the shortest paths through it any longer, those plans are kept
+WHEN NEW.source_warehouse_id <> OLD.source_warehouse_id
+    OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+    OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+    OR NEW.two_way < OLD.two_way
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
+
+UPDATE connections SET two_way = 1 WHERE id IN (SELECT kept_id FROM merged_connections);
+DELETE FROM connections WHERE id IN (SELECT dropped_id FROM merged_connections);
+
+DROP TABLE merged_connections;
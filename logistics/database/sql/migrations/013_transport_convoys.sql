@@ -0,0 +1,48 @@
+-- Optional convoys: the legs leaving on the same connection, in the same direction and minute share one row,
+-- whose arrival is written once for all of them (see `Database(convoys=True)`).
+-- A leg in a convoy keeps its own row (per-transport history), its arrival is the convoy's unless it has its own.
+CREATE TABLE convoys (
+    id INTEGER PRIMARY KEY,
+    connection_id INTEGER NOT NULL,
+    reverse INTEGER NOT NULL DEFAULT 0 CHECK (reverse IN (0, 1)),
+    start_timestamp INTEGER NOT NULL, -- Unix Epoch minutes
+    arrival_timestamp INTEGER,        -- Nullable if not arrived yet
+
+    FOREIGN KEY (connection_id) REFERENCES connections(id)
+) STRICT;
+
+-- The convoy a leg leaving now joins, and the convoys on the road
+CREATE UNIQUE INDEX convoys_open ON convoys (connection_id, reverse, start_timestamp) WHERE arrival_timestamp IS NULL;
+
+-- No FK, the archive deletes a convoy with its last leg (an FK would need an index on every leg)
+ALTER TABLE transport_routes ADD COLUMN convoy_id INTEGER;
+
+CREATE INDEX transport_routes_convoy ON transport_routes (convoy_id) WHERE convoy_id IS NOT NULL;
+
+-- The legs in a convoy stay without an arrival of their own, they are found through their convoy instead
+DROP INDEX transport_routes_open_legs;
+CREATE INDEX transport_routes_open_legs ON transport_routes (transport_id)
+WHERE arrival_timestamp IS NULL AND convoy_id IS NULL;
+
+-- Every leg with its arrival, the one of its convoy if it has none of its own
+CREATE VIEW transport_legs AS
+SELECT
+    transport_routes.id,
+    transport_routes.transport_id,
+    transport_routes.connection_id,
+    transport_routes.reverse,
+    transport_routes.start_timestamp,
+    COALESCE(transport_routes.arrival_timestamp, convoys.arrival_timestamp) AS arrival_timestamp
+FROM transport_routes
+LEFT JOIN convoys ON transport_routes.convoy_id = convoys.id;
+
+-- The legs on the road, each kind through its own index (by leg or by transport)
+CREATE VIEW open_transport_legs AS
+SELECT id, transport_id, connection_id, reverse, start_timestamp
+FROM transport_routes
+WHERE arrival_timestamp IS NULL AND convoy_id IS NULL
+UNION ALL
+SELECT members.id, members.transport_id, members.connection_id, members.reverse, members.start_timestamp
+FROM convoys
+JOIN transport_routes members ON convoys.id = members.convoy_id
+WHERE convoys.arrival_timestamp IS NULL AND members.arrival_timestamp IS NULL;
@@ -0,0 +1,29 @@
+-- A connection that stops being two-way only drops the plans on its way back, the forward ones stay valid
+DROP TRIGGER invalidate_route_plans_connection_update;
+CREATE TRIGGER invalidate_route_plans_connection_update
+AFTER UPDATE OF source_warehouse_id, target_warehouse_id, transportation_time_minutes, two_way ON connections
+-- A connection getting faster (or two-way) cannot make the shortest paths through it any longer, those plans are kept
+WHEN NEW.source_warehouse_id <> OLD.source_warehouse_id
+    OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+    OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+    OR NEW.two_way < OLD.two_way
+BEGIN
+    DELETE FROM transport_route_plan_steps
+    WHERE transport_id IN (
+        SELECT used.transport_id
+        FROM transport_route_plan_steps used
+        JOIN transport_route_plans plans ON used.transport_id = plans.transport_id
+        WHERE used.connection_id = OLD.id AND used.step >= plans.next_step
+        -- Only losing the way back leaves the plans in the forward direction valid
+        AND (
+            used.reverse = 1
+            OR NEW.source_warehouse_id <> OLD.source_warehouse_id
+            OR NEW.target_warehouse_id <> OLD.target_warehouse_id
+            OR NEW.transportation_time_minutes > OLD.transportation_time_minutes
+        )
+    )
+    AND step >= (
+        SELECT next_step FROM transport_route_plans
+        WHERE transport_route_plans.transport_id = transport_route_plan_steps.transport_id
+    );
+END;
@@ -11,12 +11,12 @@ SELECT
     -- Global Start Time
     (SELECT MIN(start_timestamp) FROM transport_routes WHERE transport_id = t.id),
     -- CURRENT LEG INFO
-    cur.source_warehouse_id,
-    cur.target_warehouse_id,
+    IIF(cur.reverse, cur_connection.target_warehouse_id, cur_connection.source_warehouse_id),
+    IIF(cur.reverse, cur_connection.source_warehouse_id, cur_connection.target_warehouse_id),
     cur.start_timestamp
 FROM transports t
 JOIN warehouses w_source ON t.source_warehouse_id = w_source.id
 JOIN warehouses w_target ON t.target_warehouse_id = w_target.id
-JOIN transport_routes cur ON t.id = cur.transport_id
-WHERE t.id = ?
-AND cur.arrival_timestamp IS NULL;
\ No newline at end of file
+JOIN open_transport_legs cur ON t.id = cur.transport_id
+JOIN connections cur_connection ON cur.connection_id = cur_connection.id
+WHERE t.id = ?;
\ No newline at end of file
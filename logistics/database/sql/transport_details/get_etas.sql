@@ -0,0 +1,35 @@
+-- Arrival at the next stop of the leg in progress, and at the target when the remaining route plan reaches it
+-- (without a plan the transport is routed again at its next stop, its final arrival is not known yet)
+WITH remaining_plans AS (
+    SELECT
+        plans.transport_id,
+        SUM(connections.transportation_time_minutes) AS minutes,
+        MAX(steps.step),
+        -- Bare column, taken from the row of the last step
+        IIF(steps.reverse, connections.source_warehouse_id, connections.target_warehouse_id) AS last_stop_id
+    FROM transport_route_plans plans
+    JOIN transport_route_plan_steps steps ON plans.transport_id = steps.transport_id
+    JOIN connections ON steps.connection_id = connections.id
+    WHERE steps.step >= plans.next_step AND (:transport_id IS NULL OR plans.transport_id = :transport_id)
+    GROUP BY plans.transport_id
+)
+SELECT
+    transports.id,
+    next_stop.id,
+    legs.start_timestamp + connections.transportation_time_minutes,
+    transports.target_warehouse_id,
+    CASE
+        WHEN next_stop.id = transports.target_warehouse_id
+            THEN legs.start_timestamp + connections.transportation_time_minutes
+        WHEN remaining_plans.last_stop_id = transports.target_warehouse_id
+            THEN legs.start_timestamp + connections.transportation_time_minutes + remaining_plans.minutes
+    END
+FROM open_transport_legs legs
+JOIN connections ON legs.connection_id = connections.id
+JOIN transports ON legs.transport_id = transports.id
+JOIN warehouses next_stop ON next_stop.id = IIF(
+    legs.reverse, connections.source_warehouse_id, connections.target_warehouse_id
+)
+LEFT JOIN remaining_plans ON transports.id = remaining_plans.transport_id
+WHERE :transport_id IS NULL OR legs.transport_id = :transport_id
+ORDER BY transports.id;
@@ -9,11 +9,11 @@ SELECT
     w_target.name,
     w_target.location,
     -- Times
-    MIN(tr.start_timestamp),
-    MAX(tr.arrival_timestamp)
+    MIN(legs.start_timestamp),
+    MAX(legs.arrival_timestamp)
 FROM transports t
 JOIN warehouses w_source ON t.source_warehouse_id = w_source.id
 JOIN warehouses w_target ON t.target_warehouse_id = w_target.id
-JOIN transport_routes ON t.id = transport_routes.transport_id
+JOIN transport_legs legs ON t.id = legs.transport_id
 WHERE t.id = ?
 GROUP BY t.id;
\ No newline at end of file
@@ -0,0 +1,15 @@
+-- Remaining steps of the route plan, the leg in progress is not included
+SELECT
+    steps.step,
+    w_source.id, w_source.name, w_source.location,
+    w_target.id, w_target.name, w_target.location,
+    connections.transportation_time_minutes
+FROM transport_route_plans plans
+JOIN transport_route_plan_steps steps ON plans.transport_id = steps.transport_id
+JOIN connections ON steps.connection_id = connections.id
+JOIN warehouses w_source
+    ON w_source.id = IIF(steps.reverse, connections.target_warehouse_id, connections.source_warehouse_id)
+JOIN warehouses w_target
+    ON w_target.id = IIF(steps.reverse, connections.source_warehouse_id, connections.target_warehouse_id)
+WHERE plans.transport_id = ? AND steps.step >= plans.next_step
+ORDER BY steps.step ASC;
@@ -1,11 +1,14 @@
 SELECT
-    transport_routes.id,
+    legs.id,
     w_source.id, w_source.name, w_source.location,
     w_target.id, w_target.name, w_target.location,
-    transport_routes.start_timestamp,
-    transport_routes.arrival_timestamp
-FROM transport_routes
-JOIN warehouses w_source ON transport_routes.source_warehouse_id = w_source.id
-JOIN warehouses w_target ON transport_routes.target_warehouse_id = w_target.id
-WHERE transport_routes.transport_id = ?
-ORDER BY transport_routes.start_timestamp ASC;
\ No newline at end of file
+    legs.start_timestamp,
+    legs.arrival_timestamp
+FROM transport_legs legs
+JOIN connections ON legs.connection_id = connections.id
+JOIN warehouses w_source
+    ON w_source.id = IIF(legs.reverse, connections.target_warehouse_id, connections.source_warehouse_id)
+JOIN warehouses w_target
+    ON w_target.id = IIF(legs.reverse, connections.source_warehouse_id, connections.target_warehouse_id)
+WHERE legs.transport_id = ?
+ORDER BY legs.start_timestamp ASC;
\ No newline at end of file
@@ -1,7 +1,9 @@
 SELECT
+    connections.id,
     source.id, source.name, source.location,
     target.id, target.name, target.location,
-    connections.transportation_time_minutes
+    connections.transportation_time_minutes,
+    connections.two_way
 FROM connections
 JOIN warehouses source ON connections.source_warehouse_id = source.id
 JOIN warehouses target ON connections.target_warehouse_id = target.id;
\ No newline at end of file
@@ -5,4 +5,5 @@ SELECT
     w.location AS target_warehouse_location
 FROM transports t
 JOIN warehouses w ON t.target_warehouse_id = w.id
-WHERE t.source_warehouse_id = ?; -- Input: {warehouse_id}
\ No newline at end of file
+WHERE t.source_warehouse_id = ? -- Input: {warehouse_id}
+AND t.completed_timestamp IS NULL;
@@ -16,6 +16,6 @@ SELECT
         FROM transported_stock ts
         JOIN products p ON ts.product_id = p.id
         JOIN transports t ON ts.transport_id = t.id
-        WHERE t.target_warehouse_id = w.id
+        WHERE t.target_warehouse_id = w.id AND t.completed_timestamp IS NULL
     ) AS reserved_capacity
 FROM warehouses w;
\ No newline at end of file
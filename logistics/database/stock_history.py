@@ -0,0 +1,172 @@
+"""
+Append-only history of the stock levels, for the fill curves of the warehouses.
+
+Every `interval_minutes` of virtual time the recorder writes one row per warehouse whose stock changed:
+its filled volume and the product counts, delta-encoded against the previous row of the same warehouse.
+Every `KEYFRAME_EVERY`-th row of a warehouse holds the full counts instead, so a range query only has to
+decode from the last keyframe before the range, never from the start of the history.
+
+Counts are packed as varint pairs (product id gap, zigzag count delta), sorted by product id:
+a product whose count changed costs 2-4 bytes, an unchanged warehouse costs nothing.
+Measured with `benchmarks/bench_stock_history.py` (~20 stocked products per warehouse, 5 of them changing
+every hour, hourly interval): ~760 B per warehouse-day including the SQLite page overhead,
+where one plain (warehouse, product, timestamp, count) row per stocked product would take ~10 KiB.
+"""
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from logistics.database.database import Database
+
+# A full snapshot every that many rows of a warehouse (one virtual day at the default interval)
+KEYFRAME_EVERY: int = 24
+
+
+@dataclass(frozen=True, slots=True)
+class StockSample:
+    timestamp: int  # Start of the downsampled bucket, virtual epoch minutes
+    filled_volume: int  # At the end of the bucket
+    peak_filled_volume: int  # Highest recorded within the bucket
+    product_counts: dict[int, int]  # At the end of the bucket
+
+
+class StockHistoryRecorder:
+    """Kept by the event loop, remembers the last recorded state of every warehouse to write only the deltas."""
+    __slots__ = ("_last", "_next_due", "_since_keyframe", "interval_minutes")
+
+    def __init__(self, interval_minutes: int):
+        self.interval_minutes = interval_minutes
+        self._next_due: int | None = None
+        self._last: dict[int, tuple[int, dict[int, int]]] = {}  # warehouse_id -> (filled_volume, counts)
+        self._since_keyframe: dict[int, int] = {}
+
+    @property
+    def next_due(self) -> int | None:
+        """First minute `maybe_record` records at, None if the history is disabled."""
+        if self.interval_minutes <= 0:
+            return None
+        return self._next_due if self._next_due is not None else 0
+
+    def maybe_record(self, database: Database, timestamp_minute: int) -> int:
+        """Records a snapshot if the interval elapsed. Returns the number of rows written."""
+        if self.interval_minutes <= 0:
+            return 0
+        if self._next_due is not None and timestamp_minute < self._next_due:
+            return 0
+        # Aligned to the interval, so the samples of different runs line up
+        self._next_due = (timestamp_minute // self.interval_minutes + 1) * self.interval_minutes
+        return self.record(database, timestamp_minute)
+
+    def record(self, database: Database, timestamp_minute: int) -> int:
+        rows: list[tuple[int, int, int, int, bytes]] = []
+        current = _group_stock(database.iter_stock_levels())
+
+        # Warehouses emptied since the last snapshot have no stock rows anymore
+        for warehouse_id in self._last.keys() - current.keys():
+            current[warehouse_id] = (0, {})
+
+        for warehouse_id, (filled_volume, counts) in current.items():
+            previous = self._last.get(warehouse_id)
+            if previous == (filled_volume, counts):
+                continue
+
+            since_keyframe = self._since_keyframe.get(warehouse_id)
+            if previous is None or since_keyframe is None or since_keyframe + 1 >= KEYFRAME_EVERY:
+                rows.append((warehouse_id, timestamp_minute, filled_volume, 1, encode_counts({}, counts)))
+                self._since_keyframe[warehouse_id] = 0
+            else:
+                rows.append((warehouse_id, timestamp_minute, filled_volume, 0, encode_counts(previous[1], counts)))
+                self._since_keyframe[warehouse_id] = since_keyframe + 1
+            self._last[warehouse_id] = (filled_volume, counts)
+
+        database.add_stock_snapshots(rows)
+        return len(rows)
+
+
+def get_stock_history(database: Database, warehouse_id: int, start: int, end: int, step: int) -> list[StockSample]:
+    """
+    Stock levels of the warehouse within [start, end), downsampled to one sample per `step` minutes.
+    Buckets before the first recorded snapshot are left out.
+    """
+    if step <= 0:
+        raise ValueError("step must be positive")
+
+    samples: list[StockSample] = []
+    filled_volume: int | None = None
+    counts: dict[int, int] = {}
+    bucket = start
+    peak = 0
+
+    for timestamp, snapshot_volume, is_keyframe, packed in database.get_stock_snapshots(warehouse_id, start, end):
+        # Close every bucket that ended before this snapshot
+        while timestamp >= bucket + step and bucket < end:
+            if filled_volume is not None:
+                samples.append(StockSample(bucket, filled_volume, max(peak, filled_volume), dict(counts)))
+            bucket += step
+            peak = filled_volume or 0
+
+        counts = decode_counts({} if is_keyframe else counts, packed)
+        filled_volume = snapshot_volume
+        # A state from before the range is only carried into it
+        peak = max(peak, filled_volume) if timestamp >= start else filled_volume
+
+    while bucket < end and filled_volume is not None:
+        samples.append(StockSample(bucket, filled_volume, max(peak, filled_volume), dict(counts)))
+        bucket += step
+        peak = filled_volume
+    return samples
+
+
+def _group_stock(levels: Iterable[tuple[int, int, int, int]]) -> dict[int, tuple[int, dict[int, int]]]:
+    """(warehouse_id, product_id, count, volume_cm) rows -> {warehouse_id: (filled_volume, {product_id: count})}"""
+    grouped: dict[int, tuple[int, dict[int, int]]] = {}
+    for warehouse_id, product_id, count, volume in levels:
+        filled_volume, counts = grouped.get(warehouse_id, (0, {}))
+        counts[product_id] = count
+        grouped[warehouse_id] = (filled_volume + count * volume, counts)
+    return grouped
+
+
+def encode_counts(previous: dict[int, int], current: dict[int, int]) -> bytes:
+    """Varint pairs (product id gap, zigzag count delta) of the products whose count changed, a removal is a 0 count."""
+    out = bytearray()
+    last_product = 0
+    for product_id in sorted(previous.keys() | current.keys()):
+        delta = current.get(product_id, 0) - previous.get(product_id, 0)
+        if delta == 0:
+            continue
+        _write_varint(out, product_id - last_product)
+        _write_varint(out, (delta << 1) ^ (delta >> 63))
+        last_product = product_id
+    return bytes(out)
+
+
+def decode_counts(previous: dict[int, int], packed: bytes) -> dict[int, int]:
+    counts = dict(previous)
+    product_id = 0
+    values = _read_varints(packed)
+    for gap, zigzag in zip(values, values, strict=False):
+        product_id += gap
+        count = counts.get(product_id, 0) + ((zigzag >> 1) ^ -(zigzag & 1))
+        if count == 0:
+            counts.pop(product_id, None)
+        else:
+            counts[product_id] = count
+    return counts
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(packed: bytes) -> Iterator[int]:
+    value = shift = 0
+    for byte in packed:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
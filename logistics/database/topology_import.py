@@ -0,0 +1,284 @@
+"""
+Bulk import of a warehouse network, from CSV or GeoJSON.
+
+CSV: a warehouses file with the columns `name, location, capacity` and a connections file with the columns
+`source, target, time, two_way` (warehouse names, minutes, true/false).
+GeoJSON: one FeatureCollection, Point features are warehouses and LineString features are connections,
+with the same columns as properties (the location of a Point defaults to its "latitude, longitude").
+
+The warehouses are added in transactions of `IMPORT_CHUNK_SIZE`, so the write lock is never held away from the
+event loop for long. The connections are resolved to warehouse ids first and added in one transaction:
+the routing graph changes once, and the routing caches of the loops rebuild once.
+Warehouses and connections already in the database (by name, by source and target) are skipped, so an import
+stopped by an invalid row can be run again once the row is fixed.
+"""
+import csv
+import json
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from logistics.database.database import Database
+from logistics.routing.graph import CSRGraph, strongly_connected_components
+
+# Warehouses added per transaction
+IMPORT_CHUNK_SIZE: int = 1000
+
+_TRUE_VALUES: frozenset[str] = frozenset({"1", "true", "yes", "y"})
+_FALSE_VALUES: frozenset[str] = frozenset({"", "0", "false", "no", "n"})
+
+
+class WarehouseRecord(NamedTuple):
+    name: str
+    location: str
+    capacity: int
+
+
+class ConnectionRecord(NamedTuple):
+    source: str  # Warehouse names
+    target: str
+    minutes: int
+    two_way: bool
+
+
+@dataclass(frozen=True, slots=True)
+class ImportReport:
+    warehouses_added: int
+    warehouses_skipped: int  # Already in the database, or twice in the input
+    connections_added: int  # Rows, a two-way connection is one
+    connections_skipped: int
+    components: list[list[int]]  # Strongly connected components of the whole network, the largest first
+
+    @property
+    def connected(self) -> bool:
+        """Whether every warehouse can reach every other one."""
+        return len(self.components) <= 1
+
+
+def _parse_int(value: object, field: str) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"'{field}' must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be an integer, not '{value}'") from None
+    if number < 0:
+        raise ValueError(f"'{field}' must not be negative")
+    return number
+
+
+def _parse_bool(value: object, field: str) -> bool:
+    if isinstance(value, bool) or value is None:
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"'{field}' must be true or false, not '{value}'")
+
+
+def _parse_text(value: object, field: str) -> str:
+    if value is None or str(value).strip() == "":
+        raise ValueError(f"'{field}' is missing")
+    return str(value).strip()
+
+
+def _warehouse(properties: dict[str, Any], default_location: str | None = None) -> WarehouseRecord:
+    location = properties.get("location")
+    if (location is None or str(location).strip() == "") and default_location is not None:
+        location = default_location
+    return WarehouseRecord(
+        _parse_text(properties.get("name"), "name"),
+        _parse_text(location, "location"),
+        _parse_int(properties.get("capacity"), "capacity"),
+    )
+
+
+def _connection(properties: dict[str, Any]) -> ConnectionRecord:
+    minutes = _parse_int(properties.get("time"), "time")
+    if minutes == 0:
+        raise ValueError("'time' must be at least one minute")
+    return ConnectionRecord(
+        _parse_text(properties.get("source"), "source"),
+        _parse_text(properties.get("target"), "target"),
+        minutes,
+        _parse_bool(properties.get("two_way"), "two_way"),
+    )
+
+
+def _read_csv[T](path: Path, parse: Callable[[dict[str, Any]], T]) -> Iterator[T]:
+    with path.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        for row in reader:
+            try:
+                yield parse(row)
+            except ValueError as e:
+                raise ValueError(f"{path}, line {reader.line_num}: {e}") from None
+
+
+def read_warehouses_csv(path: Path) -> Iterator[WarehouseRecord]:
+    """Streams the rows of a CSV file with the columns name, location, capacity."""
+    return _read_csv(path, _warehouse)
+
+
+def read_connections_csv(path: Path) -> Iterator[ConnectionRecord]:
+    """Streams the rows of a CSV file with the columns source, target, time, two_way."""
+    return _read_csv(path, _connection)
+
+
+def _read_features(path: Path) -> list[dict[str, Any]]:
+    with path.open(encoding="utf-8") as f:
+        collection = json.load(f)
+    if not isinstance(collection, dict) or collection.get("type") != "FeatureCollection":
+        raise ValueError(f"{path}: not a GeoJSON FeatureCollection")
+    features = collection.get("features", [])
+    if not isinstance(features, list) or not all(isinstance(feature, dict) for feature in features):
+        raise ValueError(f"{path}: the features must be a list of objects")
+    return features
+
+
+def _point_warehouse(properties: dict[str, Any], coordinates: object) -> WarehouseRecord:
+    # GeoJSON positions are (longitude, latitude)
+    if isinstance(coordinates, list) and len(coordinates) >= 2:
+        return _warehouse(properties, f"{coordinates[1]}, {coordinates[0]}")
+    return _warehouse(properties)
+
+
+def _read_geometries[T](
+        path: Path,
+        features: list[dict[str, Any]],
+        geometry_type: str,
+        parse: Callable[[dict[str, Any], object], T]
+) -> Iterator[T]:
+    for i, feature in enumerate(features):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != geometry_type:
+            continue
+        try:
+            yield parse(feature.get("properties") or {}, geometry.get("coordinates"))
+        except ValueError as e:
+            raise ValueError(f"{path}, feature {i}: {e}") from None
+
+
+def read_geojson(path: Path) -> tuple[Iterator[WarehouseRecord], Iterator[ConnectionRecord]]:
+    """
+    The warehouses (Point features) and connections (LineString features) of a GeoJSON FeatureCollection.
+    The file is parsed at once (there is no streaming JSON parser in the standard library), the records are not.
+    """
+    features = _read_features(path)
+    return (
+        _read_geometries(path, features, "Point", _point_warehouse),
+        _read_geometries(path, features, "LineString", lambda properties, _: _connection(properties)),
+    )
+
+
+def _warehouse_ids(database: Database) -> dict[str, int | None]:
+    # Lowercase name -> id of the warehouses in the database, None for a name used by several of them.
+    # Only the inserts lowercase the names, a renamed warehouse keeps the case it was given
+    ids: dict[str, int | None] = {}
+    for warehouse_id, name, *_ in database.iter_warehouses():
+        key = name.lower()
+        ids[key] = None if key in ids else warehouse_id
+    return ids
+
+
+def _add_warehouses(
+        database: Database,
+        warehouses: Iterable[WarehouseRecord],
+        ids: dict[str, int | None],
+        chunk_size: int
+) -> tuple[int, int]:
+    """
+    Adds the warehouses not in `ids` yet, one transaction per chunk, and puts their ids in it.
+    Returns: (added, skipped)
+    """
+    added = skipped = 0
+    chunk: list[WarehouseRecord] = []
+
+    def flush() -> None:
+        for record, warehouse_id in zip(chunk, database.add_warehouses(chunk), strict=True):
+            ids[record.name.lower()] = warehouse_id
+        chunk.clear()
+
+    pending: set[str] = set()
+    for record in warehouses:
+        name = record.name.lower()
+        if name in ids or name in pending:
+            skipped += 1
+            continue
+        pending.add(name)
+        chunk.append(record)
+        added += 1
+        if len(chunk) >= chunk_size:
+            flush()
+            pending.clear()
+    flush()
+    return added, skipped
+
+
+def _resolve(ids: dict[str, int | None], name: str) -> int:
+    if name.lower() not in ids:
+        raise ValueError(f"Unknown warehouse '{name}'")
+    warehouse_id = ids[name.lower()]
+    if warehouse_id is None:
+        raise ValueError(f"Several warehouses are named '{name}'")
+    return warehouse_id
+
+
+def _connection_rows(
+        database: Database,
+        connections: Iterable[ConnectionRecord],
+        ids: dict[str, int | None]
+) -> tuple[list[tuple[int, int, int, bool]], int]:
+    """
+    Resolves the connections to warehouse ids, without the directions already in the database.
+    Returns: (rows for `Database.add_transport_routes`, skipped)
+    """
+    existing = {(source, target) for _, source, target, _ in database.get_routing_graph()}
+    rows: list[tuple[int, int, int, bool]] = []
+    skipped = 0
+    for record in connections:
+        source, target = _resolve(ids, record.source), _resolve(ids, record.target)
+        if source == target:
+            raise ValueError(f"Connection from '{record.source}' to itself")
+        # Only the missing directions are added, a two-way record whose way back exists becomes one-way
+        forward, backward = (source, target) not in existing, record.two_way and (target, source) not in existing
+        if not forward and not backward:
+            skipped += 1
+            continue
+        existing.update(((source, target), (target, source)) if backward else ((source, target),))
+        if forward:
+            rows.append((source, target, record.minutes, backward))
+        else:
+            rows.append((target, source, record.minutes, False))
+    return rows, skipped
+
+
+def import_topology(
+        database: Database,
+        warehouses: Iterable[WarehouseRecord],
+        connections: Iterable[ConnectionRecord],
+        chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportReport:
+    """
+    Adds the warehouses, then the connections between them (see the module docstring).
+    Raises ValueError on the first invalid record, the warehouse chunks added before it stay.
+    """
+    # 1. The warehouses, one transaction per chunk
+    ids = _warehouse_ids(database)
+    added, skipped = _add_warehouses(database, warehouses, ids, chunk_size)
+
+    # 2. The connections, resolved before anything is written
+    rows, connections_skipped = _connection_rows(database, connections, ids)
+    if len(rows) > 0:
+        database.add_transport_routes(rows)
+
+    # 3. Connectivity of the whole network, warehouses without any connection are components of their own
+    components = strongly_connected_components(CSRGraph.from_connections(database.get_routing_graph()))
+    connected_ids = {warehouse_id for component in components for warehouse_id in component}
+    components.extend(
+        [warehouse_id] for warehouse_id, *_ in database.iter_warehouses() if warehouse_id not in connected_ids
+    )
+    return ImportReport(added, skipped, len(rows), connections_skipped, components)
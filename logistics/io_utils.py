@@ -1,4 +1,7 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from itertools import batched
 from typing import Any
 
 _RED = "\033[91m"
@@ -10,6 +13,10 @@ _ITALIC = "\033[3m"
 _RESET = "\033[0m"
 
 
+# Rows printed before `print_table_paged` asks whether to continue
+TABLE_PAGE_SIZE: int = 40
+_STOP_PAGING_VALUES = frozenset(('q', 'quit', 'n', 'no', 'nie', 'stop'))
+
 _FALSE_INPUT_VALUES = frozenset(('0', 'nie', 'no', 'n', 'false', 'f'))
 _TRUE_INPUT_VALUES = frozenset(('1', 'tak', 'yes', 'y', 'true', 't'))
 _BOOL_INPUT_VALUES = _FALSE_INPUT_VALUES.union(_TRUE_INPUT_VALUES)
@@ -30,8 +37,20 @@ def ask_for_string(question: str) -> str:
     return get_input()
 
 
+@dataclass(frozen=True, slots=True)
+class Lookup:
+    """Search offered by `ask_for_int` for a text instead of a number."""
+    search: Callable[[str], Sequence[Sequence[Any]]]  # Rows of the matches, the ID first
+    headers: tuple[str, ...]
+
+
 def ask_for_int(
-        question: str, *, minimum: int | None = 0, maximum: int | None = 2**63-1, allow_none: bool = False
+        question: str,
+        *,
+        minimum: int | None = 0,
+        maximum: int | None = 2**63-1,
+        allow_none: bool = False,
+        lookup: Lookup | None = None
 ) -> int | None:
     if minimum is not None and maximum is not None and minimum >= maximum:
         raise ValueError("minimum has to be smaller than maximum")
@@ -47,8 +66,11 @@ def ask_for_int(
     user_input = ""
     while not validate_input(user_input):
         print(question)
-        user_input = get_input().strip().replace(' ', '').replace(' ', '').replace('_', '')
-        if not user_input.isnumeric():
+        text = get_input(tip="or a name to search for" if lookup is not None else "")
+        user_input = text.replace(' ', '').replace(' ', '').replace('_', '')
+        if lookup is not None and len(user_input) > 0 and not user_input.isnumeric():
+            _print_lookup(lookup, text)
+        elif not user_input.isnumeric():
             invalid_input()
         elif maximum is not None and int(user_input) > maximum:
             error(f"Exceeded max INTEGER size limit of '{maximum}'")
@@ -61,6 +83,37 @@ def ask_for_int(
         return int(user_input)
 
 
+def _print_lookup(lookup: Lookup, text: str) -> None:
+    matches = lookup.search(text)
+    if len(matches) == 0:
+        warn(f"Nothing matches '{text}'")
+    else:
+        print_table(list(matches), lookup.headers)
+    print()
+
+
+def ask_for_date(question: str, *, allow_none: bool = False, end_of_day: bool = False) -> datetime | None:
+    """
+    Times without an offset are read as UTC, like every time shown.
+    With `end_of_day`, a date without a time is the start of the next day: an exclusive end that includes the date.
+    """
+    while True:
+        print(question)
+        user_input = get_input(tip="YYYY-MM-DD or YYYY-MM-DD HH:MM").strip()
+        if allow_none and user_input == "":
+            return None
+        try:
+            value = datetime.fromisoformat(user_input)
+        except ValueError:
+            invalid_input()
+            continue
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        if end_of_day and len(user_input) <= len("YYYY-MM-DD"):
+            value += timedelta(days=1)
+        return value
+
+
 def ask_for_float(question: str, *, minimum: float | None = 0, maximum: float | None = None) -> float:
     if minimum is not None and maximum is not None and minimum >= maximum:
         raise ValueError("minimum has to be smaller than maximum")
@@ -342,32 +395,72 @@ def error(msg: str) -> None:
 
 
 def print_table(values: list[Sequence[Any]], headers: tuple[str, ...] | None = None) -> None:
-    if len(values) == 0:
+    # Already materialized rows are rendered as a single, non-interactive page
+    print_table_paged(values, headers, page_size=max(len(values), 1), interactive=False)
+
+
+def print_table_paged(
+        rows: Iterable[Sequence[Any]],
+        headers: tuple[str, ...] | None = None,
+        *,
+        page_size: int = TABLE_PAGE_SIZE,
+        interactive: bool = True
+) -> int:
+    """
+    Prints the rows page by page, keeping at most two pages in memory.
+    Column widths are taken from the first page and only grow, reprinting the header, when a later page needs more room.
+    Returns the number of printed rows.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+
+    pages: Iterator[tuple[Sequence[Any], ...]] = batched(rows, page_size)
+    page = next(pages, None)
+    if page is None:
         _print_empty_table(headers)
-        return
+        return 0
 
-    if headers is not None and len(headers) != len(values[0]):
+    if headers is not None and len(headers) != len(page[0]):
         raise ValueError("The number of columns does not match the number of headers")
 
-    string_rows: list[list[str]] = []
-    for row in values:
-        string_row = []
-        for value in row:
-            string_row.append(str(value))
-        string_rows.append(string_row)
+    column_max_lengths: list[int] = []
+    printed_rows = 0
+    while page is not None:
+        string_rows = [[str(value) for value in row] for row in page]
 
-    column_max_lengths = _get_column_widths(string_rows, headers)
+        page_lengths = _get_column_widths(string_rows, headers)
+        merged_lengths = (
+            page_lengths if not column_max_lengths
+            else [max(old, new) for old, new in zip(column_max_lengths, page_lengths, strict=True)]
+        )
+        if merged_lengths != column_max_lengths:
+            column_max_lengths = merged_lengths
+            if headers is not None:
+                _print_table_header(headers, column_max_lengths)
 
-    rows: list[Sequence[str]] = []
+        for row in string_rows:
+            log(_get_table_row(row, column_max_lengths))
+        printed_rows += len(string_rows)
 
-    if headers is not None:
-        rows.append(headers)
-        rows.append(tuple(f"{_BOLD}{'-' * max_length}{_RESET}" for max_length in column_max_lengths))
+        # Look one page ahead, so the user is never asked to continue past the last row
+        page = next(pages, None)
+        if page is not None and interactive and not _ask_for_next_page(printed_rows):
+            break
+
+    return printed_rows
+
+
+def _ask_for_next_page(printed_rows: int) -> bool:
+    answer = get_input(message=f"-- {printed_rows} rows shown, Enter for more", tip="q to stop")
+    return answer.lower() not in _STOP_PAGING_VALUES
 
-    rows.extend(string_rows)
 
-    for row in rows:
-        log(_get_table_row(row, column_max_lengths))
+def _print_table_header(headers: Sequence[str], column_max_lengths: Sequence[int]) -> None:
+    log(_get_table_row(headers, column_max_lengths))
+    log(_get_table_row(
+        tuple(f"{_BOLD}{'-' * max_length}{_RESET}" for max_length in column_max_lengths),
+        column_max_lengths
+    ))
 
 
 def _get_column_widths(rows: list[Sequence[str]], headers: Sequence[str] | None) -> list[int]:
@@ -1,7 +1,7 @@
 import sys
 
-from config import check_for_database, get_config
-
+from logistics.config import check_for_database, get_config
+from logistics.database.setup import migrate_database
 from logistics.io_utils import warn
 from logistics.pipeline_loops.manager import start_pipeline_loops
 
@@ -15,8 +15,11 @@ def main() -> int:
     if not check_for_database(config):
         return 1
 
+    # Databases created by older versions of the app have to be upgraded first
+    migrate_database(config.database_path)
+
     # Start the pipeline loops
-    start_pipeline_loops(config.database_path)
+    start_pipeline_loops(config)
 
     return 0
 
@@ -0,0 +1,183 @@
+"""
+Metrics of the simulation core, exposed in the Prometheus text format.
+
+The metrics are module-level objects of the default `REGISTRY`, updated in place by the instrumented code
+(`Database`, the event loop and the arrivals). An update is a lock and an addition, nothing is formatted
+until the metrics are read: by `logistics.pipeline_loops.metrics_loop` or the debug menu.
+"""
+import bisect
+import math
+import threading
+from collections.abc import Callable, Sequence
+
+# Upper bounds of the histogram buckets, in seconds
+SQL_BUCKETS: tuple[float, ...] = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+TICK_BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    __slots__ = ("_lock", "_value", "help", "name")
+
+    def __init__(self, name: str, help: str):  # noqa: A002 - The Prometheus name
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._value = 0
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def expose(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self._value}"]
+
+
+class Gauge:
+    """Either set by the instrumented code, or read from a function whenever the metrics are read."""
+    __slots__ = ("_function", "_value", "help", "name")
+
+    def __init__(self, name: str, help: str):  # noqa: A002 - The Prometheus name
+        self.name = name
+        self.help = help
+        self._value: float = 0
+        self._function: Callable[[], float] | None = None
+
+    @property
+    def value(self) -> float:
+        return self._function() if self._function is not None else self._value
+
+    def set(self, value: float) -> None:
+        self._value = value  # A single store, no lock needed
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        self._function = function
+
+    def expose(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_format_value(self.value)}"
+        ]
+
+
+class Histogram:
+    """Cumulative buckets, optionally one set of them per value of a single label."""
+    __slots__ = ("_lock", "_series", "buckets", "help", "label", "name")
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], label: str | None = None):  # noqa: A002
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._lock = threading.Lock()
+        # Label value -> [count of every bucket (+Inf last), sum]
+        self._series: dict[str | None, list[float]] = {}
+
+    def observe(self, value: float, label_value: str | None = None) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self) -> dict[str | None, tuple[list[int], float]]:
+        """Label value -> (cumulative count of every bucket, +Inf last, sum)."""
+        with self._lock:
+            series = {label_value: list(counts) for label_value, counts in self._series.items()}
+        result = {}
+        for label_value, counts in series.items():
+            cumulative, total = [], 0
+            for count in counts[:-1]:
+                total += count
+                cumulative.append(total)
+            result[label_value] = (cumulative, counts[-1])
+        return result
+
+    def quantile(self, q: float, label_value: str | None = None) -> float | None:
+        """Upper bound of the bucket holding the quantile, None without observations."""
+        series = self.snapshot().get(label_value)
+        if series is None or series[0][-1] == 0:
+            return None
+        cumulative, _ = series
+        index = bisect.bisect_left(cumulative, q * cumulative[-1])
+        return self.buckets[index] if index < len(self.buckets) else math.inf
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_value, (cumulative, total) in sorted(self.snapshot().items(), key=lambda item: item[0] or ""):
+            labels = f'{self.label}="{label_value}",' if self.label is not None else ""
+            for bound, count in zip((*self.buckets, math.inf), cumulative, strict=True):
+                lines.append(f'{self.name}_bucket{{{labels}le="{_format_value(bound)}"}} {count}')
+            suffix = f"{{{labels.rstrip(',')}}}" if self.label is not None else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative[-1]}")
+        return lines
+
+
+type Metric = Counter | Gauge | Histogram
+
+
+class MetricsRegistry:
+    __slots__ = ("metrics",)
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register[M: Metric](self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        """All the metrics in the Prometheus text exposition format."""
+        return "".join(f"{line}\n" for metric in self.metrics for line in metric.expose())
+
+    def summary(self) -> list[tuple[str, str, str]]:
+        """
+        One row per metric (and per label value of the histograms), for the debug menu.
+        Format: (name, label, value)
+        """
+        rows = []
+        for metric in self.metrics:
+            if not isinstance(metric, Histogram):
+                rows.append((metric.name, "", _format_value(metric.value)))
+                continue
+            for label_value, (cumulative, total) in sorted(metric.snapshot().items(), key=lambda item: item[0] or ""):
+                count = cumulative[-1]
+                p99 = metric.quantile(0.99, label_value)
+                rows.append((
+                    metric.name,
+                    label_value or "",
+                    f"{count} observations, mean {total / count * 1000:.3f} ms, p99 <= {p99 * 1000:g} ms"
+                ))
+        return rows
+
+
+REGISTRY = MetricsRegistry()
+
+ARRIVALS = REGISTRY.register(Counter("logistics_arrivals_total", "Transport legs that reached their stop"))
+DISPATCHES = REGISTRY.register(Counter("logistics_dispatches_total", "Transports dispatched"))
+UNLOADS = REGISTRY.register(Counter("logistics_unloads_total", "Transports unloaded at their target"))
+ROUTING_FAILURES = REGISTRY.register(
+    Counter("logistics_routing_failures_total", "Arrivals without a path to their target")
+)
+TICK_SECONDS = REGISTRY.register(
+    Histogram("logistics_tick_seconds", "Processing time of an event loop tick", TICK_BUCKETS)
+)
+SQL_SECONDS = REGISTRY.register(
+    Histogram("logistics_sql_seconds", "Latency of the database operations", SQL_BUCKETS, label="operation")
+)
+IN_FLIGHT_TRANSPORTS = REGISTRY.register(Gauge("logistics_in_flight_transports", "Transports not completed yet"))
+LOOP_LAG_SECONDS = REGISTRY.register(
+    Gauge("logistics_event_loop_lag_seconds", "Virtual seconds the last tick started after its due time")
+)
+CLOCK_SCALE = REGISTRY.register(Gauge("logistics_clock_scale", "Virtual seconds per real second"))
@@ -0,0 +1,259 @@
+import json
+import re
+import secrets
+import threading
+from collections.abc import Callable
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from logistics.database.database import FETCH_BATCH_SIZE, Database
+from logistics.database.pool import ReadOnlyPool
+from logistics.database.read_cache import ReadCache
+from logistics.io_utils import error
+
+# Only reachable from this machine, the API has no authentication
+API_HOST: str = "127.0.0.1"
+
+# Encoded responses kept for the current version of the database
+API_CACHE_SIZE: int = 256
+
+# Largest page of finished transports a client may ask for
+MAX_PAGE_SIZE: int = 1000
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _time(db_minutes: int | None) -> str | None:
+    dt = Database.from_db_time(db_minutes)
+    return dt.isoformat() if dt is not None else None
+
+
+def _int_parameter(query: dict[str, list[str]], name: str, default: int | None = None) -> int | None:
+    values = query.get(name)
+    if values is None:
+        return default
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an integer") from None
+
+
+def _warehouse(row: tuple[int, str, str, int, int, int]) -> dict[str, object]:
+    warehouse_id, name, location, capacity, filled, reserved = row
+    return {
+        "id": warehouse_id, "name": name, "location": location,
+        "capacity": capacity, "filled_capacity": filled, "reserved_capacity": reserved,
+    }
+
+
+def _stop(warehouse_id: int, name: str, location: str) -> dict[str, object]:
+    return {"id": warehouse_id, "name": name, "location": location}
+
+
+def get_warehouses(database: Database, _: re.Match[str], __: dict[str, list[str]]) -> object:
+    return [_warehouse(row) for row in database.iter_warehouses()]
+
+
+def get_warehouse(database: Database, match: re.Match[str], _: dict[str, list[str]]) -> object:
+    warehouse, stock, incoming, outgoing, passing = database.get_warehouse_details(int(match["id"]))
+    if warehouse is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Warehouse '{match['id']}' does not exist")
+    return {
+        **_warehouse(warehouse),
+        "stock": [
+            {"product_id": product_id, "name": name, "barcode": barcode, "count": count, "volume": volume}
+            for product_id, name, barcode, count, volume in stock
+        ],
+        "incoming_transports": [
+            {"id": transport_id, "source": _stop(*source)} for transport_id, *source in incoming
+        ],
+        "outgoing_transports": [
+            {"id": transport_id, "target": _stop(*target)} for transport_id, *target in outgoing
+        ],
+        "passing_transports": [
+            {"id": row[0], "source": _stop(*row[1:4]), "target": _stop(*row[4:7])} for row in passing
+        ],
+    }
+
+
+def get_active_transports(database: Database, _: re.Match[str], __: dict[str, list[str]]) -> object:
+    return [
+        {
+            "id": row[0],
+            "source": _stop(*row[1:4]),
+            "target": _stop(*row[4:7]),
+            "start_time": _time(row[7]),
+            "last_stop": _stop(*row[8:11]),
+            "last_stop_time": _time(row[11]),
+            "next_stop": _stop(*row[12:15]),
+        }
+        for row in database.iter_active_transports()
+    ]
+
+
+def get_finished_transports(database: Database, _: re.Match[str], query: dict[str, list[str]]) -> object:
+    """
+    One page, newest first. `from` and `to` limit the completion time (epoch minutes),
+    the `next` cursor of a page is the `before` parameter of the following one.
+    """
+    limit = _int_parameter(query, "limit", FETCH_BATCH_SIZE)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+    before = None
+    if "before" in query:
+        cursor = re.fullmatch(r"(-?\d+)\.(\d+)", query["before"][-1])
+        if cursor is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'before' must be the 'next' cursor of a previous page")
+        before = (int(cursor[1]), int(cursor[2]))
+
+    page = database.get_finished_transports_page(
+        completed_from=_int_parameter(query, "from"),
+        completed_to=_int_parameter(query, "to"),
+        before=before,
+        limit=limit
+    )
+    return {
+        "transports": [
+            {
+                "id": row[0],
+                "source": _stop(*row[1:4]),
+                "target": _stop(*row[4:7]),
+                "stop_count": row[7],
+                "start_time": _time(row[8]),
+                "completion_time": _time(row[9]),
+                "total_minutes": row[10],
+            }
+            for row in page
+        ],
+        "next": f"{page[-1][9]}.{page[-1][0]}" if len(page) == limit else None,
+    }
+
+
+def get_product_distribution(database: Database, match: re.Match[str], _: dict[str, list[str]]) -> object:
+    stock, in_transit = database.get_product_distribution(int(match["id"]))
+    return {
+        "product_id": int(match["id"]),
+        "warehouses": [
+            {**_stop(warehouse_id, name, location), "count": count} for warehouse_id, name, location, count in stock
+        ],
+        "total_in_stock": sum(row[3] for row in stock),
+        "in_transit": in_transit,
+    }
+
+
+def get_etas(database: Database, match: re.Match[str], _: dict[str, list[str]]) -> object:
+    transport_id = int(match["id"]) if match["id"] is not None else None
+    etas = [
+        {
+            "transport_id": row_transport_id,
+            "next_stop_id": next_stop_id,
+            "next_stop_eta": _time(next_stop_eta),
+            "target_id": target_id,
+            "target_eta": _time(target_eta),
+        }
+        for row_transport_id, next_stop_id, next_stop_eta, target_id, target_eta in database.get_transport_etas(
+            transport_id
+        )
+    ]
+    if transport_id is None:
+        return etas
+    if len(etas) == 0:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Transport '{transport_id}' is not in flight")
+    return etas[0]
+
+
+type Endpoint = Callable[[Database, re.Match[str], dict[str, list[str]]], object]
+
+ENDPOINTS: list[tuple[re.Pattern[str], Endpoint]] = [
+    (re.compile(r"/warehouses"), get_warehouses),
+    (re.compile(r"/warehouses/(?P<id>\d+)"), get_warehouse),
+    (re.compile(r"/transports/active"), get_active_transports),
+    (re.compile(r"/transports/finished"), get_finished_transports),
+    (re.compile(r"/transports/(?:(?P<id>\d+)/)?etas?"), get_etas),
+    (re.compile(r"/products/(?P<id>\d+)/distribution"), get_product_distribution),
+]
+
+
+def _find_endpoint(path: str) -> tuple[Endpoint, re.Match[str]]:
+    for pattern, endpoint in ENDPOINTS:
+        match = pattern.fullmatch(path.rstrip("/"))
+        if match is not None:
+            return endpoint, match
+    raise ApiError(HTTPStatus.NOT_FOUND, f"No endpoint at '{path}'")
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    Serves the endpoints as JSON from a pool of read-only connections, one thread per request.
+    Every response carries the data version of the database as its ETag: a poll with a matching `If-None-Match`
+    is answered with 304 Not Modified, without a query. The encoded responses are cached until the next commit.
+    """
+    daemon_threads = True
+
+    def __init__(self, db_path: Path, port: int, connections: int):
+        self.pool = ReadOnlyPool(db_path, connections)
+        self.cache = ReadCache(API_CACHE_SIZE)
+        self.cache_lock = threading.Lock()
+        # Tells the versions of this server from those of a previous one, `PRAGMA data_version` starts over
+        self.instance = secrets.token_hex(4)
+        super().__init__((API_HOST, port), _ApiRequestHandler)
+
+    def respond(self, target: str, if_none_match: str | None) -> tuple[HTTPStatus, str, bytes]:
+        """Returns the status, the ETag and the body."""
+        # Read before the data, the response is at least as new as its tag
+        etag = f'"{self.instance}-{self.pool.data_version()}"'
+        if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return HTTPStatus.NOT_MODIFIED, etag, b""
+
+        with self.cache_lock:
+            cached = self.cache.get(target, etag)
+        if cached is not None:
+            return HTTPStatus.OK, etag, cached
+
+        url = urlsplit(target)
+        endpoint, match = _find_endpoint(url.path)
+        with self.pool.connection() as database:
+            body = json.dumps(endpoint(database, match, parse_qs(url.query)), separators=(",", ":")).encode()
+
+        with self.cache_lock:
+            self.cache.put(target, etag, body, 1)
+        return HTTPStatus.OK, etag, body
+
+
+class _ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, pollers reuse their connection
+    disable_nagle_algorithm = True  # Headers and body are separate writes, Nagle would hold the body for an ACK
+    server: ApiServer
+
+    def do_GET(self) -> None:
+        try:
+            status, etag, body = self.server.respond(self.path, self.headers.get("If-None-Match"))
+        except ApiError as e:
+            status, etag, body = e.status, None, json.dumps({"error": str(e)}).encode()
+        except Exception as e:
+            error(f"[API] {self.path}: {e!r}")
+            status, etag, body = HTTPStatus.INTERNAL_SERVER_ERROR, None, b'{"error":"Internal error"}'
+
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")  # Revalidate every time, the data changes any minute
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - Signature of the base class
+        pass  # Every request on the console would bury the menu
+
+
+def run_api_loop(db_path: Path, port: int, connections: int) -> None:
+    server = ApiServer(db_path, port, connections)
+    server.serve_forever()
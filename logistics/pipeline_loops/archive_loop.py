@@ -0,0 +1,41 @@
+import math
+import time
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.journal import EventJournal
+from logistics.io_utils import log
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+
+# Transports moved per transaction, small enough to never hold the write lock away from the event loop for long
+ARCHIVE_CHUNK_SIZE: int = 500
+
+# Real seconds between two archiving passes
+ARCHIVE_INTERVAL_SECONDS: float = 60
+
+
+def run_archive_loop(
+        db_path: Path, clock: VirtualClock, archive_after_minutes: int, journal: EventJournal | None = None
+) -> None:
+    database = Database(db_path, journal)
+    while True:
+        arrived_before = math.floor(clock.get_time() / 60) - archive_after_minutes
+        archived = archive_finished_transports(database, arrived_before)
+        if archived > 0:
+            log(f"[Archive] Archived {archived} finished transports")
+        time.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+def archive_finished_transports(database: Database, arrived_before: int, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+    """
+    Moves the transports finished before the given minute to the archive tables, one chunk per transaction.
+    Returns the number of archived transports.
+    """
+    total = 0
+    while True:
+        archived = database.archive_finished_transports(arrived_before, chunk_size)
+        total += archived
+        if archived < chunk_size:
+            return total
+        # Let the other loops in between the chunks
+        time.sleep(0)
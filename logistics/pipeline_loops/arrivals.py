@@ -0,0 +1,74 @@
+from collections.abc import Sequence
+
+from logistics import metrics
+from logistics.database.database import Database
+from logistics.io_utils import error
+from logistics.routing.parallel import RoutingPool
+from logistics.routing.router import Router
+
+# An arrival, as written by `Database.apply_arrivals`:
+# (transport_route_id, transport_id, stop_warehouse_id, target_warehouse_id, next_step, [connection_id, ...])
+type Arrival = tuple[int, int, int, int, int | None, list[int]]
+
+
+def collect_arrivals(
+        database: Database,
+        router: Router,
+        minute: int,
+        warehouse_ids: Sequence[int] | None = None,
+        routing_pool: RoutingPool | None = None
+) -> list[Arrival]:
+    """
+    The arrivals due by the minute (at the given warehouses only, if any), with their next leg: the next step of
+    the route plan, or a new route if there is none. The routes of the whole tick are computed as one batch,
+    on the routing pool if there is one. Only reads, the result goes to `write_arrivals`.
+    """
+    router.refresh(database)
+    rows = database.get_due_arrivals(minute, warehouse_ids)
+
+    # 1. Transports without a plan, away from their target
+    requests = [(stop_id, target_id) for _, _, stop_id, target_id, _, connection_id in rows
+                if stop_id != target_id and connection_id is None]
+    if routing_pool is not None:
+        paths = iter(routing_pool.find_paths(router, requests))
+    else:
+        paths = (router.find_path(stop_id, target_id) for stop_id, target_id in requests)
+
+    # 2. The next leg of every arrival, in transport route order
+    arrivals: list[Arrival] = []
+    for transport_route_id, transport_id, stop_id, target_id, next_step, connection_id in rows:
+        if stop_id == target_id:
+            connection_ids = []
+        elif connection_id is not None:
+            connection_ids = [connection_id]
+        else:
+            next_step = None
+            path = next(paths)
+            connection_ids = [] if path is None else path.connection_ids
+        arrivals.append((transport_route_id, transport_id, stop_id, target_id, next_step, connection_ids))
+    return arrivals
+
+
+def write_arrivals(database: Database, router: Router, minute: int, arrivals: list[Arrival]) -> list[Arrival]:
+    """
+    Writes the arrivals in one transaction. The transports whose plan changed since their arrival was collected
+    are routed again on their own, the transports without a path are reported.
+    Returns the arrivals as they were written.
+    """
+    stale = set(database.apply_arrivals(minute, arrivals))
+
+    written: list[Arrival] = []
+    for arrival in arrivals:
+        transport_route_id, transport_id, stop_id, target_id, _, connection_ids = arrival
+        if transport_id in stale:
+            path = router.find_path(stop_id, target_id)
+            connection_ids = [] if path is None else path.connection_ids
+            if len(connection_ids) > 0:
+                database.replan_transport_route(transport_id, connection_ids, minute)
+            arrival = (transport_route_id, transport_id, stop_id, target_id, None, connection_ids)
+        if stop_id != target_id and len(connection_ids) == 0:
+            # No path exists (Road deleted? Island warehouse?)
+            error(f"CRITICAL: No path found for Transport {transport_id} from {stop_id} to {target_id}")
+            metrics.ROUTING_FAILURES.inc()
+        written.append(arrival)
+    return written
@@ -1,42 +1,16 @@
+import importlib
 from collections.abc import Callable
 from enum import Enum, auto
 from pathlib import Path
 
 from logistics.database.database import Database
+from logistics.database.journal import EventJournal
 from logistics.io_utils import (
     ask_for_choice,
     error,
     get_input,
     log,
 )
-from logistics.pipeline_loops.console_tasks.data_manipulation_tasks import (
-    add_product_task,
-    add_stock_task,
-    add_warehouse_connection_task,
-    add_warehouses_task,
-    cancel_transport_task,
-    edit_product_task,
-    edit_warehouse_connection_task,
-    edit_warehouse_task,
-    initialize_transport_task,
-    remove_product_task,
-    remove_stock_task,
-    remove_transport_route_task,
-    remove_warehouse_task,
-)
-from logistics.pipeline_loops.console_tasks.data_retrival_tasks import (
-    show_active_transports_task,
-    show_finished_transports_task,
-    show_products_task,
-    show_transport_details_task,
-    show_warehouse_connections_task,
-    show_warehouse_details_task,
-    show_warehouses_task,
-)
-from logistics.pipeline_loops.console_tasks.debug_and_simulation_tasks import (
-    change_time_simulation_scale_task,
-    offset_simulation_time_task,
-)
 from logistics.pipeline_loops.virtual_clock import VirtualClock
 
 
@@ -62,9 +36,12 @@ class DataManipulationTasks(TaskEnum):
     ADD_WAREHOUSE = auto()
     ADD_PRODUCT = auto()
     ADD_STOCK = auto()
+    SCAN_STOCK_INTAKE = auto()
     ADD_WAREHOUSE_CONNECTION = auto()
+    IMPORT_TOPOLOGY = auto()
 
     INITIALIZE_TRANSPORT = auto()
+    PLAN_BULK_TRANSPORTS = auto()
     CANCEL_TRANSPORT = auto()
 
     REMOVE_WAREHOUSE = auto()
@@ -80,6 +57,9 @@ class DataManipulationTasks(TaskEnum):
 class DebugTasks(TaskEnum):
     CHANGE_TIME_SIMULATION_SCALE = auto()
     OFFSET_SIMULATION_TIME = auto()
+    CREATE_SNAPSHOT = auto()
+    SHOW_READ_CACHE_STATISTICS = auto()
+    SHOW_METRICS = auto()
 
 
 # Config tasks:
@@ -102,44 +82,53 @@ class ConfigTasks(TaskEnum):
     DELETE_DATABASE = auto()
 
 
-COMMAND_HANDLER_MAP: dict[TaskEnum, Callable[[Database, VirtualClock], None]] = {
+# Handlers as 'module.function' in `console_tasks`, the modules are only imported once one of their tasks is run
+COMMAND_HANDLER_MAP: dict[TaskEnum, str] = {
     # DataRetrivalTasks
-    DataRetrivalTasks.SHOW_WAREHOUSES: show_warehouses_task,
-    DataRetrivalTasks.SHOW_WAREHOUSE_DETAILS: show_warehouse_details_task,
-    DataRetrivalTasks.SHOW_WAREHOUSE_CONNECTIONS: show_warehouse_connections_task,
-    DataRetrivalTasks.SHOW_PRODUCTS: show_products_task,
-    DataRetrivalTasks.SHOW_ACTIVE_TRANSPORTS: show_active_transports_task,
-    DataRetrivalTasks.SHOW_FINISHED_TRANSPORTS: show_finished_transports_task,
-    DataRetrivalTasks.SHOW_TRANSPORT_DETAILS: show_transport_details_task,
+    DataRetrivalTasks.SHOW_WAREHOUSES: "data_retrival_tasks.show_warehouses_task",
+    DataRetrivalTasks.SHOW_WAREHOUSE_DETAILS: "data_retrival_tasks.show_warehouse_details_task",
+    DataRetrivalTasks.SHOW_WAREHOUSE_CONNECTIONS: "data_retrival_tasks.show_warehouse_connections_task",
+    DataRetrivalTasks.SHOW_PRODUCTS: "data_retrival_tasks.show_products_task",
+    DataRetrivalTasks.SHOW_ACTIVE_TRANSPORTS: "data_retrival_tasks.show_active_transports_task",
+    DataRetrivalTasks.SHOW_FINISHED_TRANSPORTS: "data_retrival_tasks.show_finished_transports_task",
+    DataRetrivalTasks.SHOW_TRANSPORT_DETAILS: "data_retrival_tasks.show_transport_details_task",
 
     # DataManipulationTasks
-    DataManipulationTasks.ADD_WAREHOUSE: add_warehouses_task,
-    DataManipulationTasks.ADD_PRODUCT: add_product_task,
-    DataManipulationTasks.ADD_STOCK: add_stock_task,
-    DataManipulationTasks.ADD_WAREHOUSE_CONNECTION: add_warehouse_connection_task,
-
-    DataManipulationTasks.INITIALIZE_TRANSPORT: initialize_transport_task,
-
-    DataManipulationTasks.REMOVE_WAREHOUSE: remove_warehouse_task,
-    DataManipulationTasks.REMOVE_PRODUCT: remove_product_task,
-    DataManipulationTasks.REMOVE_WAREHOUSE_CONNECTION: remove_transport_route_task,
-    DataManipulationTasks.REMOVE_STOCK: remove_stock_task,
-
-    DataManipulationTasks.EDIT_WAREHOUSE: edit_warehouse_task,
-    DataManipulationTasks.EDIT_PRODUCT: edit_product_task,
-    DataManipulationTasks.EDIT_WAREHOUSE_CONNECTION: edit_warehouse_connection_task,
-    DataManipulationTasks.CANCEL_TRANSPORT: cancel_transport_task,
+    DataManipulationTasks.ADD_WAREHOUSE: "data_manipulation_tasks.add_warehouses_task",
+    DataManipulationTasks.ADD_PRODUCT: "data_manipulation_tasks.add_product_task",
+    DataManipulationTasks.ADD_STOCK: "data_manipulation_tasks.add_stock_task",
+    DataManipulationTasks.SCAN_STOCK_INTAKE: "data_manipulation_tasks.scan_stock_intake_task",
+    DataManipulationTasks.ADD_WAREHOUSE_CONNECTION: "data_manipulation_tasks.add_warehouse_connection_task",
+    DataManipulationTasks.IMPORT_TOPOLOGY: "data_manipulation_tasks.import_topology_task",
+
+    DataManipulationTasks.INITIALIZE_TRANSPORT: "data_manipulation_tasks.initialize_transport_task",
+    DataManipulationTasks.PLAN_BULK_TRANSPORTS: "data_manipulation_tasks.plan_bulk_transports_task",
+
+    DataManipulationTasks.REMOVE_WAREHOUSE: "data_manipulation_tasks.remove_warehouse_task",
+    DataManipulationTasks.REMOVE_PRODUCT: "data_manipulation_tasks.remove_product_task",
+    DataManipulationTasks.REMOVE_WAREHOUSE_CONNECTION: "data_manipulation_tasks.remove_transport_route_task",
+    DataManipulationTasks.REMOVE_STOCK: "data_manipulation_tasks.remove_stock_task",
+
+    DataManipulationTasks.EDIT_WAREHOUSE: "data_manipulation_tasks.edit_warehouse_task",
+    DataManipulationTasks.EDIT_PRODUCT: "data_manipulation_tasks.edit_product_task",
+    DataManipulationTasks.EDIT_WAREHOUSE_CONNECTION: "data_manipulation_tasks.edit_warehouse_connection_task",
+    DataManipulationTasks.CANCEL_TRANSPORT: "data_manipulation_tasks.cancel_transport_task",
 
     # DebugTasks
-    DebugTasks.CHANGE_TIME_SIMULATION_SCALE: change_time_simulation_scale_task,
-    DebugTasks.OFFSET_SIMULATION_TIME: offset_simulation_time_task,
+    DebugTasks.CHANGE_TIME_SIMULATION_SCALE: "debug_and_simulation_tasks.change_time_simulation_scale_task",
+    DebugTasks.OFFSET_SIMULATION_TIME: "debug_and_simulation_tasks.offset_simulation_time_task",
+    DebugTasks.CREATE_SNAPSHOT: "debug_and_simulation_tasks.create_snapshot_task",
+    DebugTasks.SHOW_READ_CACHE_STATISTICS: "debug_and_simulation_tasks.show_read_cache_statistics_task",
+    DebugTasks.SHOW_METRICS: "debug_and_simulation_tasks.show_metrics_task",
 
     # ConfigTasks
 }
 
 
-def run_console_loop(db_path: Path, clock: VirtualClock) -> None:
-    database = Database(db_path)
+def run_console_loop(
+        db_path: Path, clock: VirtualClock, journal: EventJournal | None = None, convoys: bool = False
+) -> None:
+    database = Database(db_path, journal, convoys=convoys)
     user_choices: list[list[str]] = [
         ["data_retrival_tasks", *parse_options(DataRetrivalTasks)],
         ["data_manipulation_tasks", *parse_options(DataManipulationTasks)],
@@ -158,9 +147,12 @@ def run_console_loop(db_path: Path, clock: VirtualClock) -> None:
         if user_choice < len(enum_indexer):
             task = enum_indexer[user_choice]
             log(f"\nExecuting '{task.name}' task...\n")
-            handler = COMMAND_HANDLER_MAP.get(task)
+            handler = get_task_handler(task)
             if handler is not None:
                 handler(database, clock)
+                if isinstance(task, DataManipulationTasks):
+                    # New dispatches or changed connections may be due before what the event loop waits for
+                    clock.notify()
                 get_input(message="\nPress Enter to continue...", end="")
             else:
                 error("SELECTED TASK IS NOT YET IMPLEMENTED")
@@ -168,6 +160,14 @@ def run_console_loop(db_path: Path, clock: VirtualClock) -> None:
     log("\nClosing the app...")
 
 
+def get_task_handler(task: TaskEnum) -> Callable[[Database, VirtualClock], None] | None:
+    handler = COMMAND_HANDLER_MAP.get(task)
+    if handler is None:
+        return None
+    module, function = handler.rsplit(".", 1)
+    return getattr(importlib.import_module(f"logistics.pipeline_loops.console_tasks.{module}"), function)
+
+
 def parse_options(enum: type[TaskEnum]) -> list[str]:
     return [e.name.replace('_', ' ').capitalize() for e in enum]
 
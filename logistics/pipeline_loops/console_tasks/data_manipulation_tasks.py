@@ -1,17 +1,37 @@
 import math
-
-from pipeline_loops.virtual_clock import VirtualClock
-
-from logistics.database.database import Database
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+from logistics.database.barcodes import is_valid_ean13
+from logistics.database.database import Database, StaleGraphError
+from logistics.database.topology_import import (
+    import_topology,
+    read_connections_csv,
+    read_geojson,
+    read_warehouses_csv,
+)
 from logistics.io_utils import (
     ask_for_bool,
     ask_for_choice,
     ask_for_int,
     ask_for_string,
     ask_for_time,
+    error,
+    get_input,
+    log,
     print_table,
     warn,
 )
+from logistics.pipeline_loops.console_tasks.lookups import product_lookup, warehouse_lookup
+from logistics.pipeline_loops.dispatch import dispatch_transports
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.planner import Demand, plan_transports
+from logistics.routing.rerouting import reroute_after_connection_change
+from logistics.routing.router import Router
+
+# Routing cache of the console's dispatches, the graph is only reloaded when the connections change
+_router = Router()
 
 
 def add_warehouses_task(database: Database, _: VirtualClock) -> None:
@@ -44,8 +64,8 @@ def add_product_task(database: Database, _: VirtualClock) -> None:
 
 
 def add_stock_task(database: Database, _: VirtualClock) -> None:
-    warehouse_id = ask_for_int("Provide the warehouse ID")
-    product_id = ask_for_int("Provide the product ID")
+    warehouse_id = ask_for_int("Provide the warehouse ID", lookup=warehouse_lookup(database))
+    product_id = ask_for_int("Provide the product ID", lookup=product_lookup(database))
     count = ask_for_int("Provide the number of stock")
     confirm = ask_for_bool(
         f"Confirm the addition of stock '{product_id}' to warehouse '{warehouse_id}' in count '{count}'"
@@ -56,9 +76,36 @@ def add_stock_task(database: Database, _: VirtualClock) -> None:
         warn("Cancelling the addition of the stock")
 
 
+def scan_stock_intake_task(database: Database, _: VirtualClock) -> None:
+    warehouse_id = ask_for_int("Provide the warehouse ID", lookup=warehouse_lookup(database))
+    print()
+    log("Scan the items, one barcode per line, an empty line ends the intake")
+    barcodes: list[int] = []
+    while len(scanned := get_input(message="Barcode", end="> ")) > 0:
+        if scanned.isdecimal() and is_valid_ean13(int(scanned)):
+            barcodes.append(int(scanned))
+        else:
+            warn(f"'{scanned}' is not a valid EAN-13 barcode, skipped")
+    if len(barcodes) == 0:
+        warn("Nothing was scanned")
+        return
+
+    confirm = ask_for_bool(f"Confirm the intake of {len(barcodes)} scanned items into warehouse '{warehouse_id}'")
+    if confirm:
+        try:
+            unknown = database.add_scanned_stock(warehouse_id, barcodes)
+        except sqlite3.IntegrityError as e:
+            error(f"Nothing was added: {e}")
+            return
+        for barcode in unknown:
+            warn(f"No product has the barcode '{barcode}', its items were skipped")
+    else:
+        warn("Cancelling the stock intake")
+
+
 def add_warehouse_connection_task(database: Database, _: VirtualClock) -> None:
-    source_warehouse_id = ask_for_int("Provide the source warehouse ID")
-    target_warehouse_id = ask_for_int("Provide the target warehouse ID")
+    source_warehouse_id = ask_for_int("Provide the source warehouse ID", lookup=warehouse_lookup(database))
+    target_warehouse_id = ask_for_int("Provide the target warehouse ID", lookup=warehouse_lookup(database))
     weeks, days, hours, minutes, seconds = ask_for_time("Provide the average travel time")
     is_two_way = ask_for_bool("Is the route two way?")
     minutes = math.ceil(float((((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds) / 60.0)
@@ -68,21 +115,59 @@ def add_warehouse_connection_task(database: Database, _: VirtualClock) -> None:
         f"{"and" if is_two_way else "to"} warehouse '{target_warehouse_id}' taking '{minutes}' minutes"
     )
     if confirm:
-        database.add_transport_route(source_warehouse_id, target_warehouse_id, minutes)
-        if is_two_way:
-            database.add_transport_route(target_warehouse_id, source_warehouse_id, minutes)
+        database.add_transport_route(source_warehouse_id, target_warehouse_id, minutes, is_two_way)
     else:
         warn("Cancelling the addition of the transport route/warehouse connection")
 
 
-def initialize_transport_task(database: Database, _: VirtualClock) -> None:
-    source_warehouse_id = ask_for_int("Provide the source warehouse ID")
-    target_warehouse_id = ask_for_int("Provide the target warehouse ID")
+def import_topology_task(database: Database, _: VirtualClock) -> None:
+    file_format = ask_for_choice(["CSV", "GeoJSON"], "Which format is the network in?")
+    print()
+    if file_format == 0:
+        warehouses_path = Path(ask_for_string("Provide the path of the warehouses file (name, location, capacity)"))
+        connections_path = Path(
+            ask_for_string("Provide the path of the connections file (source, target, time, two_way)")
+        )
+        paths = f"'{warehouses_path}' and '{connections_path}'"
+    else:
+        geojson_path = Path(ask_for_string("Provide the path of the GeoJSON file"))
+        paths = f"'{geojson_path}'"
+    print()
+    if not ask_for_bool(f"Confirm the import of the network from {paths}"):
+        warn("Cancelling the import of the network")
+        return
+
+    try:
+        if file_format == 0:
+            warehouses, connections = read_warehouses_csv(warehouses_path), read_connections_csv(connections_path)
+        else:
+            warehouses, connections = read_geojson(geojson_path)
+        report = import_topology(database, warehouses, connections)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        error(f"The import stopped: {e}")
+        warn("The warehouses added before the error were kept, fix the file and import it again to continue")
+        return
+
+    log(f"Added '{report.warehouses_added}' warehouses ('{report.warehouses_skipped}' already existed)")
+    log(f"Added '{report.connections_added}' connections ('{report.connections_skipped}' already existed)")
+    if not report.connected:
+        outside = sum(len(component) for component in report.components[1:])
+        warn(
+            f"The network is not strongly connected: '{len(report.components)}' components, "
+            f"'{outside}' warehouses cannot reach or be reached from the largest one"
+        )
+
+
+def initialize_transport_task(database: Database, clock: VirtualClock) -> None:
+    source_warehouse_id = ask_for_int("Provide the source warehouse ID", lookup=warehouse_lookup(database))
+    target_warehouse_id = ask_for_int("Provide the target warehouse ID", lookup=warehouse_lookup(database))
 
     transport_stock: dict[int, int] = {}
     product_id: int | None = -1
     while product_id is not None:
-        product_id = ask_for_int("Provide the product ID (leave empty to stop)", allow_none=True)
+        product_id = ask_for_int(
+            "Provide the product ID (leave empty to stop)", allow_none=True, lookup=product_lookup(database)
+        )
         if product_id is not None:
             count = ask_for_int("Provide the amount of product to transfer", minimum=1)
             confirm = ask_for_bool(f"Confirm the addition of product '{product_id}' in count '{count}' to teh transfer")
@@ -90,21 +175,76 @@ def initialize_transport_task(database: Database, _: VirtualClock) -> None:
                 transport_stock[product_id] = count
 
     msg = [
-        "Confirm the initialization of the transport from warehouse '{source_warehouse_id}' "
-        "to warehouse '{target_warehouse_id}' "
+        f"Confirm the initialization of the transport from warehouse '{source_warehouse_id}' "
+        f"to warehouse '{target_warehouse_id}' "
         "with stock:"
     ]
     for key, value in transport_stock.items():
         msg.append(f"- {key}: {value}x")
     confirm = ask_for_bool('\n'.join(msg))
     if confirm:
-        database.initialize_transport(source_warehouse_id, target_warehouse_id, transport_stock)
+        _dispatch(database, clock, source_warehouse_id, target_warehouse_id, transport_stock)
     else:
         warn("Cancelling the initialization of the transport")
 
 
-def remove_warehouse_task(database: Database, _: VirtualClock) -> None:
-    warehouse_id = ask_for_int("Provide the warehouse ID")
+def _dispatch(
+        database: Database, clock: VirtualClock, source_warehouse_id: int, target_warehouse_id: int,
+        transport_stock: dict[int, int]
+) -> None:
+    try:
+        transport_id = dispatch_transports(
+            database, _router, clock, [(source_warehouse_id, target_warehouse_id, transport_stock)]
+        )[0]
+    except (ValueError, StaleGraphError, sqlite3.Error) as e:
+        error(f"The transport was not dispatched: {e}")
+        return
+    log(f"Dispatched transport '{transport_id}'")
+
+
+def plan_bulk_transports_task(database: Database, clock: VirtualClock) -> None:
+    demands: list[Demand] = []
+    product_id: int | None = -1
+    while product_id is not None:
+        product_id = ask_for_int(
+            "Provide the product ID (leave empty to stop)", allow_none=True, lookup=product_lookup(database)
+        )
+        if product_id is not None:
+            count = ask_for_int("Provide the demanded amount of the product", minimum=1)
+            target_warehouse_id = ask_for_int("Provide the destination warehouse ID", lookup=warehouse_lookup(database))
+            demands.append(Demand(product_id, count, target_warehouse_id))
+        print()
+
+    if len(demands) == 0:
+        warn("No demands were provided")
+        return
+
+    confirm = ask_for_bool(f"Confirm the planning of transports for '{len(demands)}' demands")
+    if not confirm:
+        warn("Cancelling the planning of the transports")
+        return
+
+    try:
+        report = plan_transports(database, demands, math.floor(clock.get_time() / 60))
+    except (ValueError, StaleGraphError, sqlite3.Error) as e:
+        error(f"The transports were not dispatched: {e}")
+        return
+    log(
+        f"Created '{len(report.transport_ids)}' transports carrying '{report.shipped_units}' units "
+        f"with total transit time of '{report.total_transit_minutes}' minutes"
+    )
+    log(f"Planning took {report.planning_seconds:.3f}s, writing took {report.writing_seconds:.3f}s")
+    if len(report.unfulfilled) > 0:
+        print()
+        warn("Not enough reachable stock for:")
+        print_table(
+            [(d.product_id, d.destination_warehouse_id, d.quantity) for d in report.unfulfilled],
+            ("PRODUCT ID", "DESTINATION WAREHOUSE ID", "MISSING COUNT")
+        )
+
+
+def remove_warehouse_task(database: Database, clock: VirtualClock) -> None:
+    warehouse_id = ask_for_int("Provide the warehouse ID", lookup=warehouse_lookup(database))
     confirm = ask_for_bool(f"Confirm the removal of the warehouse with id '{warehouse_id}'")
     if confirm:
         # TODO: Move the handling to separate functions
@@ -124,7 +264,9 @@ def remove_warehouse_task(database: Database, _: VirtualClock) -> None:
                         for entry in stock:
                             database.remove_stock(warehouse_id, entry[0], None)
                 else:  # choice == 1
-                    target_warehouse_id = ask_for_int("Provide the target warehouse ID")
+                    target_warehouse_id = ask_for_int(
+                        "Provide the target warehouse ID", lookup=warehouse_lookup(database)
+                    )
                     confirm = ask_for_bool(
                         f"Confirm the transport of all stock from warehouse '{warehouse_id}' "
                         f"to warehouse '{target_warehouse_id}'"
@@ -133,7 +275,7 @@ def remove_warehouse_task(database: Database, _: VirtualClock) -> None:
                         transport_stock = {}
                         for entry in stock:
                             transport_stock[entry[0]] = entry[1]
-                        database.initialize_transport(warehouse_id, target_warehouse_id, transport_stock)
+                        _dispatch(database, clock, warehouse_id, target_warehouse_id, transport_stock)
         # Handle incoming transports
         incoming_transports = database.get_incoming_transports(warehouse_id)
         if len(incoming_transports) > 0:
@@ -144,14 +286,16 @@ def remove_warehouse_task(database: Database, _: VirtualClock) -> None:
                     f"What do you want to do with transport '{transport_id}' '"
                 )
                 if choice == 1:
-                    target_warehouse_id = ask_for_int("Provide the new target warehouse ID")
+                    target_warehouse_id = ask_for_int(
+                        "Provide the new target warehouse ID", lookup=warehouse_lookup(database)
+                    )
                 database.reroute_transport(transport_id, target_warehouse_id)
 
         database.remove_warehouse(warehouse_id)
 
 
 def remove_product_task(database: Database, _: VirtualClock) -> None:
-    product_id = ask_for_int("Provide the product ID")
+    product_id = ask_for_int("Provide the product ID", lookup=product_lookup(database))
     confirm = ask_for_bool(f"Confirm the removal of the product '{product_id}'")
     if confirm:
         stock = database.get_product_stock(product_id)
@@ -167,15 +311,19 @@ def remove_product_task(database: Database, _: VirtualClock) -> None:
 
 
 def remove_transport_route_task(database: Database, _: VirtualClock) -> None:
-    source_warehouse_id = ask_for_int("Provide the source warehouse ID")
-    target_warehouse_id = ask_for_int("Provide the target warehouse ID")
-    is_two_way = ask_for_bool("Is the route a two-way route?")
-    database.remove_warehouse_connection(source_warehouse_id, target_warehouse_id, is_two_way)
+    connection_id = ask_for_int("Provide the connection ID")
+    confirm = ask_for_bool(f"Confirm the removal of the transport route/warehouse connection '{connection_id}'")
+    if confirm:
+        _reroute_after_connection_change(
+            database, connection_id, lambda: database.remove_warehouse_connection(connection_id)
+        )
+    else:
+        warn("Cancelling the removal of the transport route/warehouse connection")
 
 
 def remove_stock_task(database: Database, _: VirtualClock) -> None:
-    warehouse_id = ask_for_int("Provide the warehouse ID")
-    product_id = ask_for_int("Provide the product ID")
+    warehouse_id = ask_for_int("Provide the warehouse ID", lookup=warehouse_lookup(database))
+    product_id = ask_for_int("Provide the product ID", lookup=product_lookup(database))
     count = ask_for_int("Provide the number of stock", allow_none=True)
     confirm = ask_for_bool(
         f"Confirm the removal of stock '{product_id}' "
@@ -189,7 +337,7 @@ def remove_stock_task(database: Database, _: VirtualClock) -> None:
 
 
 def edit_warehouse_task(database: Database, _: VirtualClock) -> None:
-    warehouse_id = ask_for_int("Provide the warehouse ID")
+    warehouse_id = ask_for_int("Provide the warehouse ID", lookup=warehouse_lookup(database))
     choice = -1
     while choice < 3:
         choice = ask_for_choice(["Name", "Location", "Capacity", "Exit"], "What do you want to change?")
@@ -233,7 +381,7 @@ def _change_warehouse_capacity(database: Database, warehouse_id: int) -> None:
 
 
 def edit_product_task(database: Database, _: VirtualClock) -> None:
-    product_id = ask_for_int("Provide the product ID")
+    product_id = ask_for_int("Provide the product ID", lookup=product_lookup(database))
     choice = -1
     while choice < 2:
         choice = ask_for_choice(["Name", "Volume", "Exit"], "What do you want to change?")
@@ -270,7 +418,7 @@ def edit_warehouse_connection_task(database: Database, _: VirtualClock) -> None:
     choice = -1
     while choice < 4:
         choice = ask_for_choice(
-            ["Source warehouse ID", "Target Warehouse ID", "Transportation time", "Exit"],
+            ["Source warehouse ID", "Target Warehouse ID", "Transportation time", "Two way", "Exit"],
             "What do you want to change?"
         )
         if choice == 0:
@@ -279,18 +427,24 @@ def edit_warehouse_connection_task(database: Database, _: VirtualClock) -> None:
             _change_warehouse_connection_target(database, connection_id)
         elif choice == 2:
             _change_warehouse_connection_transportation_time(database, connection_id)
+        elif choice == 3:
+            _change_warehouse_connection_two_way(database, connection_id)
 
 
 def _change_warehouse_connection_source(
         database: Database, connection_id: int
 ) -> None:
-    new_source_warehouse_id = ask_for_int("Provide the new source warehouse ID")
+    new_source_warehouse_id = ask_for_int("Provide the new source warehouse ID", lookup=warehouse_lookup(database))
     old_source_warehouse_if = database.get_warehouse_connection_source_warehouse_id(connection_id)
     confirm = ask_for_bool(
         f"Confirm the change of the source warehouse ID from '{old_source_warehouse_if}' to '{new_source_warehouse_id}'"
     )
     if confirm:
-        database.change_warehouse_connection_source(connection_id, new_source_warehouse_id)
+        _reroute_after_connection_change(
+            database,
+            connection_id,
+            lambda: database.change_warehouse_connection_source(connection_id, new_source_warehouse_id)
+        )
     else:
         warn("Cancelling the change of the source warehouse ID")
 
@@ -298,13 +452,17 @@ def _change_warehouse_connection_source(
 def _change_warehouse_connection_target(
         database: Database, connection_id: int
 ) -> None:
-    new_target_warehouse_id = ask_for_int("Provide the new target warehouse ID")
+    new_target_warehouse_id = ask_for_int("Provide the new target warehouse ID", lookup=warehouse_lookup(database))
     old_target_warehouse_id = database.get_warehouse_connection_target_warehouse_id(connection_id)
     confirm = ask_for_bool(
         f"Confirm the change of the target warehouse ID from '{old_target_warehouse_id}' to '{new_target_warehouse_id}'"
     )
     if confirm:
-        database.change_warehouse_connection_target(connection_id, new_target_warehouse_id)
+        _reroute_after_connection_change(
+            database,
+            connection_id,
+            lambda: database.change_warehouse_connection_target(connection_id, new_target_warehouse_id)
+        )
     else:
         warn("Cancelling the change of the target warehouse ID")
 
@@ -321,11 +479,40 @@ def _change_warehouse_connection_transportation_time(
         f"to '{new_transportation_time} min'"
     )
     if confirm:
-        database.change_warehouse_connection_transportation_target(connection_id, new_transportation_time)
+        _reroute_after_connection_change(
+            database,
+            connection_id,
+            lambda: database.change_warehouse_connection_transportation_target(connection_id, new_transportation_time)
+        )
     else:
         warn("Cancelling the change of the transportation time")
 
 
+def _change_warehouse_connection_two_way(database: Database, connection_id: int) -> None:
+    two_way = ask_for_bool("Should the route be two way?")
+    confirm = ask_for_bool(f"Confirm making the connection '{connection_id}' {"two way" if two_way else "one way"}")
+    if confirm:
+        _reroute_after_connection_change(
+            database,
+            connection_id,
+            lambda: database.change_warehouse_connection_two_way(connection_id, two_way)
+        )
+    else:
+        warn("Cancelling the change of the connection direction")
+
+
+def _reroute_after_connection_change(
+        database: Database, connection_id: int, apply_change: Callable[[], None]
+) -> None:
+    report = reroute_after_connection_change(database, connection_id, apply_change)
+    log(
+        f"Rerouted '{report.rerouted}' of '{report.affected}' transports planned through connection "
+        f"'{connection_id}' in {report.seconds:.3f}s"
+    )
+    if len(report.unreachable) > 0:
+        warn(f"No route left to the destination of transports: {', '.join(map(str, report.unreachable))}")
+
+
 def cancel_transport_task(database: Database) -> None:
     transport_id = ask_for_int("Provide the transport ID to cancel")
     confirm = ask_for_bool(f"Confirm the cancellation of transport '{transport_id}'")
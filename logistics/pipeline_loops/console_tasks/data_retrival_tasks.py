@@ -1,19 +1,28 @@
+from itertools import islice
+
 from logistics.database.database import Database
-from logistics.io_utils import ask_for_int, log, print_table
+from logistics.io_utils import ask_for_choice, ask_for_date, ask_for_int, log, print_table, print_table_paged, warn
+from logistics.pipeline_loops.console_tasks.lookups import warehouse_lookup
 from logistics.pipeline_loops.virtual_clock import VirtualClock
 
 
 def show_warehouses_task(database: Database, _: VirtualClock) -> None:
-    warehouses = database.get_warehouses()
-    print_table(warehouses, ("ID", "NAME", "LOCATION", "CAPACITY", "FILLED_CAPACITY", "RESERVED_CAPACITY"))
+    print_table_paged(
+        database.iter_warehouses(),
+        ("ID", "NAME", "LOCATION", "CAPACITY", "FILLED_CAPACITY", "RESERVED_CAPACITY")
+    )
 
 
 def show_warehouse_details_task(database: Database, _: VirtualClock) -> None:
-    warehouse_id = ask_for_int("Provide warehouse ID: ")
+    warehouse_id = ask_for_int("Provide warehouse ID: ", lookup=warehouse_lookup(database))
     print()
     warehouse_data, stock, incoming_transports, outgoing_transports, passing_transports = (
         database.get_warehouse_details(warehouse_id)
     )
+    if warehouse_data is None:
+        warn(f"Warehouse '{warehouse_id}' does not exist")
+        return
+
     log("WAREHOUSE METADATA:")
     print_table([warehouse_data], ("ID", "NAME", "LOCATION", "CAPACITY", "FILLED_CAPACITY", "RESERVED_CAPACITY"))
     print()
@@ -54,27 +63,24 @@ def show_warehouse_details_task(database: Database, _: VirtualClock) -> None:
 
 
 def show_warehouse_connections_task(database: Database, _: VirtualClock) -> None:
-    connections = database.get_warehouse_connections()
-    print_table(
-        connections,
+    print_table_paged(
+        database.iter_warehouse_connections(),
         (
             "ID",
             "SOURCE WAREHOUSE ID", "SOURCE WAREHOUSE NAME", "SOURCE WAREHOUSE LOCATION",
             "TARGET WAREHOUSE ID", "TARGET WAREHOUSE NAME", "TARGET WAREHOUSE LOCATION",
-            "TRANSPORTATION TIME"
+            "TRANSPORTATION TIME", "TWO WAY"
         )
     )
 
 
 def show_products_task(database: Database, _: VirtualClock) -> None:
-    products = database.get_products()
-    print_table(products, ("ID", "NAME", "BARCODE", "VOLUME (cm^3)"))
+    print_table_paged(database.iter_products(), ("ID", "NAME", "BARCODE", "VOLUME (cm^3)"))
 
 
 def show_active_transports_task(database: Database, _: VirtualClock) -> None:
-    active_transports = database.get_active_transports()
-    print_table(
-        active_transports,
+    print_table_paged(
+        database.iter_active_transports(),
         (
             "ID",
             "SOURCE WAREHOUSE ID", "SOURCE WAREHOUSE NAME", "SOURCE WAREHOUSE LOCATION",
@@ -87,9 +93,25 @@ def show_active_transports_task(database: Database, _: VirtualClock) -> None:
 
 
 def show_finished_transports_task(database: Database, _: VirtualClock) -> None:
-    finished_transports = database.get_finished_transports()
-    print_table(
-        finished_transports,
+    choice = ask_for_choice(["All", "Last N", "Date range"], "Which finished transports do you want to see?")
+    if choice == 0:
+        rows = database.iter_finished_transports()
+    elif choice == 1:
+        count = ask_for_int("Provide the number of transports", minimum=1)
+        rows = islice(database.iter_finished_transports(), count)
+    else:
+        completed_from = ask_for_date("Provide the start of the range (leave empty for no limit)", allow_none=True)
+        completed_to = ask_for_date(
+            "Provide the end of the range, a date includes that whole day (leave empty for no limit)",
+            allow_none=True,
+            end_of_day=True
+        )
+        rows = database.iter_finished_transports(
+            completed_from=Database.to_db_time(completed_from), completed_to=Database.to_db_time(completed_to)
+        )
+
+    print_table_paged(
+        rows,
         (
             "ID",
             "SOURCE WAREHOUSE ID", "SOURCE WAREHOUSE NAME", "SOURCE WAREHOUSE LOCATION",
@@ -107,8 +129,8 @@ def show_transport_details_task(database: Database, _: VirtualClock) -> None:
 
     if is_active:
         transport_details, stops, cargo = database.get_active_transport_details(transport_id)
-        eta = None
-        # TODO: eta!
+        etas = database.get_transport_etas(transport_id)
+        eta = Database.from_db_time(etas[0][4]) if len(etas) > 0 else None
         print_table(
             [(*transport_details[:-3], eta)],
             (
@@ -141,6 +163,17 @@ def show_transport_details_task(database: Database, _: VirtualClock) -> None:
             "START TIME", "END TIME"
         )
     )
+    if is_active:
+        log("PREDICTED STOPS:")
+        print_table(
+            database.get_planned_stops(transport_id),
+            (
+                "STEP",
+                "SOURCE WAREHOUSE ID", "SOURCE WAREHOUSE NAME", "SOURCE WAREHOUSE LOCATION",
+                "TARGET WAREHOUSE ID", "TARGET WAREHOUSE NAME", "TARGET WAREHOUSE LOCATION",
+                "TRANSPORTATION TIME"
+            )
+        )
     print_table(
         cargo,
         (
@@ -1,5 +1,8 @@
+from pathlib import Path
+
+from logistics import metrics
 from logistics.database.database import Database
-from logistics.io_utils import ask_for_bool, ask_for_float, ask_for_time, warn
+from logistics.io_utils import ask_for_bool, ask_for_float, ask_for_string, ask_for_time, log, print_table, warn
 from logistics.pipeline_loops.virtual_clock import VirtualClock
 
 
@@ -15,13 +18,37 @@ def change_time_simulation_scale_task(_: Database, clock: VirtualClock) -> None:
 
 def offset_simulation_time_task(_: Database, clock: VirtualClock) -> None:
     weeks, days, hours, minutes, seconds = ask_for_time("Provide the offset of the time simulation")
+    offset = (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
     confirm = ask_for_bool(
         "Confirm the offset of the time simulation by "
         f"{weeks:01}:{days:02}:{hours:02}:{minutes:02}:{seconds:02} "
-        f"({(((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds} seconds)"
+        f"({offset} seconds)"
     )
     if confirm:
-        clock.jump((hours * 60 + minutes) * 60 + seconds)
+        clock.jump(offset)
     else:
         print()
         warn("Cancelling the offset of the time simulation")
+
+
+def create_snapshot_task(database: Database, _: VirtualClock) -> None:
+    snapshot_path = Path(ask_for_string("Provide the path of the snapshot file").strip())
+    if snapshot_path.exists():
+        warn(f"'{snapshot_path}' already exists, cancelling the snapshot")
+        return
+    sequence = database.create_snapshot(snapshot_path)
+    log(f"Snapshot saved to '{snapshot_path}' at journal position {sequence}")
+
+
+def show_read_cache_statistics_task(database: Database, _: VirtualClock) -> None:
+    stats = database.get_read_cache_stats()
+    lookups = stats.hits + stats.misses
+    hit_rate = f"{stats.hits / lookups:.1%}" if lookups > 0 else "-"
+    print_table(
+        [(stats.hits, stats.misses, hit_rate, stats.evictions, stats.entries, stats.rows)],
+        ("HITS", "MISSES", "HIT RATE", "EVICTIONS", "CACHED RESULTS", "CACHED ROWS")
+    )
+
+
+def show_metrics_task(_: Database, __: VirtualClock) -> None:
+    print_table(metrics.REGISTRY.summary(), ("METRIC", "LABEL", "VALUE"))
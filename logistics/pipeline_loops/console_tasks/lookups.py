@@ -0,0 +1,10 @@
+from logistics.database.database import Database
+from logistics.io_utils import Lookup
+
+
+def warehouse_lookup(database: Database) -> Lookup:
+    return Lookup(database.search_warehouses, ("ID", "NAME", "LOCATION"))
+
+
+def product_lookup(database: Database) -> Lookup:
+    return Lookup(database.search_products, ("ID", "NAME", "BARCODE"))
@@ -0,0 +1,44 @@
+import math
+from collections.abc import Sequence
+
+from logistics.database.database import Database, StaleGraphError
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.router import Router
+
+# Route computations per dispatch before giving up on connections that keep changing
+DISPATCH_ATTEMPTS: int = 3
+
+
+def dispatch_transports(
+        database: Database, router: Router, clock: VirtualClock, requests: Sequence[tuple[int, int, dict[int, int]]]
+) -> list[int]:
+    """
+    Dispatches the transports now, all or none of them.
+    Format: (source_warehouse_id, target_warehouse_id, {product_id: count})
+    The routes come from the cached graph of the router (reloaded only if the connections changed), the stock,
+    cargo, destination capacity, route plan and first leg are written in one transaction
+    (see `Database.dispatch_transports`), and the event loop is woken up to schedule the first arrivals.
+    Raises ValueError if a transport has no route, not enough stock at its source or no room at its destination.
+    """
+    for _ in range(DISPATCH_ATTEMPTS):
+        router.refresh(database)
+        transports: list[tuple[int, int, list[int], dict[int, int]]] = []
+        for source_warehouse_id, target_warehouse_id, transport_stock in requests:
+            if source_warehouse_id == target_warehouse_id:
+                raise ValueError(f"Transport from warehouse '{source_warehouse_id}' to itself")
+            path = router.find_path(source_warehouse_id, target_warehouse_id)
+            if path is None:
+                raise ValueError(
+                    f"No route from warehouse '{source_warehouse_id}' to warehouse '{target_warehouse_id}'"
+                )
+            transports.append((source_warehouse_id, target_warehouse_id, path.connection_ids, transport_stock))
+
+        try:
+            transport_ids = database.dispatch_transports(
+                transports, math.floor(clock.get_time() / 60), router.graph_version
+            )
+        except StaleGraphError:
+            continue  # A connection changed while routing, route again on the new graph
+        clock.notify()
+        return transport_ids
+    raise StaleGraphError(f"The connections changed during {DISPATCH_ATTEMPTS} attempts to route the transports")
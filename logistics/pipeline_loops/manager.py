@@ -1,19 +1,83 @@
+import functools
 import threading
-from pathlib import Path
 
+from logistics import metrics
+from logistics.config import Config
+from logistics.database.journal import EventJournal
+from logistics.database.pool import ReadOnlyPool
+from logistics.database.stock_history import StockHistoryRecorder
 from logistics.io_utils import log
-from logistics.pipeline_loops import console_loop, event_loop
+from logistics.pipeline_loops import archive_loop, console_loop, event_loop
+from logistics.pipeline_loops.sharding import ShardedArrivalProcessor, ShardingMethod
 from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.parallel import RoutingPool
+from logistics.routing.router import Router, RoutingAlgorithm
 
 
-def start_pipeline_loops(db_path: Path) -> None:
+def start_pipeline_loops(config: Config) -> None:
+    db_path = config.database_path
     clock = VirtualClock()
+    router = Router(RoutingAlgorithm(config.routing_algorithm))
+    stock_history = StockHistoryRecorder(config.stock_history_interval_minutes)
+    # One journal shared by the connections of all the loops
+    journal = EventJournal(config.journal_path, clock.get_time) if config.event_journal else None
+    sharding = None
+    if config.event_shards > 1:
+        log(f"Starting {config.event_shards} event workers")
+        sharding = ShardedArrivalProcessor(
+            db_path, config.event_shards, ShardingMethod(config.shard_by), router.algorithm
+        )
+    routing_pool = None
+    if config.routing_workers > 0 and sharding is None:
+        routing_pool = RoutingPool(config.routing_workers)
+
+    # Read whenever the metrics are, on a connection of their own
+    metrics.CLOCK_SCALE.set_function(clock.get_scale)
+    metrics.IN_FLIGHT_TRANSPORTS.set_function(
+        functools.partial(_count_in_flight_transports, ReadOnlyPool(db_path, 1))
+    )
 
     log("Starting event loop")
-    event_thread = threading.Thread(target=lambda: event_loop.run_event_loop(db_path, clock), daemon=True)
+    event_thread = threading.Thread(
+        target=lambda: event_loop.run_event_loop(
+            db_path, clock, router, stock_history, journal, sharding, routing_pool, config.transport_convoys
+        ),
+        daemon=True
+    )
     event_thread.start()
 
+    log("Starting archive loop")
+    archive_thread = threading.Thread(
+        target=lambda: archive_loop.run_archive_loop(db_path, clock, config.archive_after_minutes, journal),
+        daemon=True
+    )
+    archive_thread.start()
+
+    if config.api_port > 0:
+        from logistics.pipeline_loops import api_loop  # `http.server` is a noticeable part of the startup time
+
+        log(f"Starting read API on http://{api_loop.API_HOST}:{config.api_port}")
+        api_thread = threading.Thread(
+            target=lambda: api_loop.run_api_loop(db_path, config.api_port, config.api_connections),
+            daemon=True
+        )
+        api_thread.start()
+
+    if config.metrics_port > 0:
+        from logistics.pipeline_loops import metrics_loop  # `http.server` is a noticeable part of the startup time
+
+        log(f"Starting metrics on http://{metrics_loop.METRICS_HOST}:{config.metrics_port}/metrics")
+        metrics_thread = threading.Thread(
+            target=lambda: metrics_loop.run_metrics_loop(config.metrics_port), daemon=True
+        )
+        metrics_thread.start()
+
     log("Starting terminal loop")
-    console_loop.run_console_loop(db_path, clock)
+    console_loop.run_console_loop(db_path, clock, journal, config.transport_convoys)
 
     # TODO: Pass the DB path to both loops
+
+
+def _count_in_flight_transports(pool: ReadOnlyPool) -> int:
+    with pool.connection() as database:
+        return database.count_in_flight_transports()
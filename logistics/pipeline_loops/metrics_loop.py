@@ -0,0 +1,41 @@
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit
+
+from logistics.metrics import REGISTRY, MetricsRegistry
+
+# Only reachable from this machine
+METRICS_HOST: str = "127.0.0.1"
+
+# Prometheus text exposition format
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer(HTTPServer):
+    """Serves the registry at `/metrics`, one scrape at a time."""
+
+    def __init__(self, port: int, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        super().__init__((METRICS_HOST, port), _MetricsRequestHandler)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    server: MetricsServer
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.server.registry.expose().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - Signature of the base class
+        pass  # Every scrape on the console would bury the menu
+
+
+def run_metrics_loop(port: int) -> None:
+    MetricsServer(port).serve_forever()
@@ -0,0 +1,235 @@
+import heapq
+import math
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.pipeline_loops.arrivals import Arrival, collect_arrivals, write_arrivals
+from logistics.routing.router import Router, RoutingAlgorithm
+
+# Rounds of label propagation at most, it usually settles in a handful
+CLUSTERING_ROUNDS: int = 20
+
+# The region of a warehouse is the part of its location before the first separator, e.g. "north/depot 3" -> "north"
+LOCATION_SEPARATOR: str = "/"
+
+
+class ShardingMethod(StrEnum):
+    CLUSTERING = "clustering"  # Label propagation over the connections, faster connections pull harder
+    LOCATION = "location"  # Warehouses sharing the location prefix, see `LOCATION_SEPARATOR`
+
+
+def partition_warehouses(
+        warehouses: Sequence[tuple[int, str]],
+        connections: Sequence[tuple[int, int, int, int]],
+        shard_count: int,
+        method: ShardingMethod = ShardingMethod.CLUSTERING
+) -> list[list[int]]:
+    """
+    Splits the warehouses (id, location) into `shard_count` shards, returns the warehouse ids of every shard.
+    Regions (location prefixes or clusters of the connections (id, source, target, time)) are kept whole,
+    and every shard grows from region to neighbouring region, so few legs cross between the shards.
+    The same input always gives the same shards.
+    """
+    neighbours = _neighbours([warehouse_id for warehouse_id, _ in warehouses], connections)
+    if method == ShardingMethod.LOCATION:
+        regions = _group_by_location(warehouses)
+    else:
+        regions = _cluster(neighbours, math.ceil(len(neighbours) / shard_count))
+    return _grow_shards(regions, neighbours, shard_count)
+
+
+def _neighbours(
+        warehouse_ids: Sequence[int], connections: Sequence[tuple[int, int, int, int]]
+) -> dict[int, dict[int, float]]:
+    """Connected warehouses in both directions, weighted by the speed of the connections."""
+    neighbours: dict[int, dict[int, float]] = {warehouse_id: {} for warehouse_id in warehouse_ids}
+    for _, source, target, minutes in connections:
+        if source == target:
+            continue
+        weight = 1 / max(minutes, 1)
+        for node, other in ((source, target), (target, source)):
+            links = neighbours.setdefault(node, {})
+            links[other] = links.get(other, 0) + weight
+    return neighbours
+
+
+def _group_by_location(warehouses: Sequence[tuple[int, str]]) -> list[list[int]]:
+    regions: dict[str, list[int]] = {}
+    for warehouse_id, location in sorted(warehouses):
+        regions.setdefault(location.split(LOCATION_SEPARATOR, 1)[0].strip(), []).append(warehouse_id)
+    return list(regions.values())
+
+
+def _cluster(neighbours: dict[int, dict[int, float]], max_size: int) -> list[list[int]]:
+    """
+    Label propagation: every warehouse takes the label with the most weight among its neighbours.
+    A label may not grow past `max_size` warehouses, or everything would end up in one cluster.
+    """
+    label = {node: node for node in neighbours}
+    sizes = dict.fromkeys(neighbours, 1)
+    nodes = sorted(neighbours)
+    for _ in range(CLUSTERING_ROUNDS):
+        changed = False
+        for node in nodes:
+            weights: dict[int, float] = {}
+            for other, weight in neighbours[node].items():
+                weights[label[other]] = weights.get(label[other], 0) + weight
+            candidates = [
+                candidate for candidate in weights if candidate == label[node] or sizes[candidate] < max_size
+            ]
+            if len(candidates) == 0:
+                continue
+            best = min(candidates, key=lambda candidate: (-weights[candidate], candidate))
+            if best != label[node]:
+                sizes[label[node]] -= 1
+                sizes[best] += 1
+                label[node] = best
+                changed = True
+        if not changed:
+            break
+
+    clusters: dict[int, list[int]] = {}
+    for node in nodes:
+        clusters.setdefault(label[node], []).append(node)
+    return list(clusters.values())
+
+
+def _grow_shards(
+        regions: list[list[int]], neighbours: dict[int, dict[int, float]], shard_count: int
+) -> list[list[int]]:
+    """
+    Fills the shards one after the other up to an even share of the remaining warehouses, every time with the
+    region most connected to the shard (the largest one when none is), the last shard takes the rest.
+    """
+    region_of = {node: i for i, region in enumerate(regions) for node in region}
+    links: list[dict[int, float]] = [{} for _ in regions]
+    for node, others in neighbours.items():
+        for other, weight in others.items():
+            a, b = region_of.get(node), region_of.get(other)
+            if a is not None and b is not None and a != b:
+                links[a][b] = links[a].get(b, 0) + weight
+
+    unplaced = set(range(len(regions)))
+    remaining = len(region_of)
+    shards: list[list[int]] = []
+    for i in range(shard_count):
+        shard: list[int] = []
+        target = remaining / (shard_count - i)
+        gain: dict[int, float] = {}
+        while len(unplaced) > 0 and (len(shard) < target or i == shard_count - 1):
+            best = max(unplaced, key=lambda region: (gain.get(region, 0), len(regions[region]), -regions[region][0]))
+            unplaced.remove(best)
+            shard.extend(regions[best])
+            for other, weight in links[best].items():
+                gain[other] = gain.get(other, 0) + weight
+        remaining -= len(shard)
+        shards.append(sorted(shard))
+    return shards
+
+
+@dataclass(slots=True)
+class ShardingStats:
+    ticks: int = 0
+    arrivals: int = 0
+    handoffs: int = 0  # Legs started towards a warehouse of another shard
+    stale_plans: int = 0  # Plans changed between the read of a worker and the write, routed again by the coordinator
+
+
+class ShardedArrivalProcessor:
+    """
+    Processes the arrivals of a tick on a pool of worker processes, one task per shard of warehouses.
+    The workers only read: each collects the arrivals at the warehouses of its shard and routes the transports
+    without a plan, through its own connection and router. The coordinator (the event loop) then writes the
+    arrivals of all the shards in one transaction, in transport route order like the single-threaded loop,
+    so both end up with the same database. That write is also the handoff of the legs leaving the shard:
+    the shard of their next stop picks them up when they arrive.
+    The shards are recomputed whenever the connections change.
+    """
+    __slots__ = ("_connection_targets", "_executor", "_graph_version", "_shard_of", "_shards", "method", "stats")
+
+    def __init__(
+            self,
+            db_path: Path,
+            shard_count: int,
+            method: ShardingMethod = ShardingMethod.CLUSTERING,
+            algorithm: RoutingAlgorithm = RoutingAlgorithm.DIJKSTRA
+    ):
+        if shard_count < 1:
+            raise ValueError("There must be at least one shard")
+
+        self.method = method
+        self.stats = ShardingStats()
+        # Spawned, forking the multithreaded app is unsafe
+        self._executor = ProcessPoolExecutor(
+            shard_count,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(db_path, algorithm),
+        )
+        self._graph_version: int | None = None
+        self._shards: list[list[int]] = [[] for _ in range(shard_count)]
+        self._shard_of: dict[int, int] = {}
+        self._connection_targets: dict[int, int] = {}
+
+    @property
+    def shards(self) -> list[list[int]]:
+        return self._shards
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def process(self, database: Database, router: Router, minute: int) -> int:
+        """Processes the arrivals due by the minute, returns their number."""
+        self._refresh_shards(database)
+
+        # 1. Every shard reads and routes in parallel, each result is in transport route order
+        futures = [self._executor.submit(_collect_shard, shard, minute) for shard in self._shards if len(shard) > 0]
+        arrivals = list(heapq.merge(*(future.result() for future in futures)))
+
+        # 2. One write for all of them
+        written = write_arrivals(database, router, minute, arrivals)
+
+        self.stats.ticks += 1
+        self.stats.arrivals += len(arrivals)
+        self.stats.stale_plans += sum(
+            arrival != written_arrival for arrival, written_arrival in zip(arrivals, written, strict=True)
+        )
+        for _, _, stop_id, _, _, connection_ids in written:
+            if len(connection_ids) > 0 and (
+                self._shard_of.get(self._connection_targets.get(connection_ids[0])) != self._shard_of.get(stop_id)
+            ):
+                self.stats.handoffs += 1
+        return len(arrivals)
+
+    def _refresh_shards(self, database: Database) -> None:
+        version = database.get_routing_graph_version()
+        if version == self._graph_version:
+            return
+
+        connections = database.get_routing_graph()
+        warehouses = [(warehouse[0], warehouse[2]) for warehouse in database.iter_warehouses()]
+        self._shards = partition_warehouses(warehouses, connections, len(self._shards), self.method)
+        self._shard_of = {warehouse_id: i for i, shard in enumerate(self._shards) for warehouse_id in shard}
+        self._connection_targets = {connection_id: target for connection_id, _, target, _ in connections}
+        self._graph_version = version
+
+
+# State of a worker process, set up once by `_init_worker`
+_worker_database: Database | None = None
+_worker_router: Router | None = None
+
+
+def _init_worker(db_path: Path, algorithm: RoutingAlgorithm) -> None:
+    global _worker_database, _worker_router  # One connection and router per worker process
+    _worker_database = Database(db_path)
+    # The router of the event loop builds and saves the contraction hierarchy, the workers only load it
+    _worker_router = Router(algorithm, build_hierarchy=False)
+
+
+def _collect_shard(warehouse_ids: list[int], minute: int) -> list[Arrival]:
+    return collect_arrivals(_worker_database, _worker_router, minute, warehouse_ids)
@@ -1,4 +1,3 @@
-# --- Atomic "Accumulator" Clock ---
 import threading
 import time
 
@@ -6,46 +5,92 @@ from logistics.io_utils import log
 
 
 class VirtualClock:
-    __slots__ = ("_last_real_time", "_lock", "_scale", "_virtual_time")
+    """
+    Simulation time, in epoch seconds. It starts at the wall-clock time and then advances by the monotonic clock
+    times the scale, so NTP adjustments and wall-clock changes do not move it.
+    The time is computed from the last anchor (set at every scale change and jump), it accumulates no rounding.
+
+    `wait_until` lets the event loop sleep exactly until its next due event:
+    `set_scale`, `jump` and `notify` (called after new dispatches) wake it up right away.
+    """
+    __slots__ = ("_anchor_monotonic", "_anchor_virtual", "_changed", "_generation", "_lock", "_scale")
 
     def __init__(self):
         self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._generation = 0  # Bumped by every notification
         self._scale = 1.0
-        self._last_real_time = time.time()
-        self._virtual_time = self._last_real_time
+        self._anchor_monotonic = time.monotonic()
+        self._anchor_virtual = time.time()
+
+    def _now(self) -> float:
+        """Caller holds the lock."""
+        return self._anchor_virtual + (time.monotonic() - self._anchor_monotonic) * self._scale
+
+    def _reanchor(self) -> None:
+        """Caller holds the lock. Moves the anchor to now, so a new scale only applies from now on."""
+        now_monotonic = time.monotonic()
+        self._anchor_virtual += (now_monotonic - self._anchor_monotonic) * self._scale
+        self._anchor_monotonic = now_monotonic
+
+    def _notify_locked(self) -> None:
+        self._generation += 1
+        self._changed.notify_all()
 
     def get_time(self) -> float:
         """
-        Updates and returns the current virtual time.
+        Returns the current virtual time.
         """
         with self._lock:
-            now_real = time.time()
-            delta_real = now_real - self._last_real_time
-
-            # Add the progress since last check, scaled
-            self._virtual_time += delta_real * self._scale
-
-            # Update the marker for next time
-            self._last_real_time = now_real
-
-            return self._virtual_time
+            return self._now()
 
     def set_scale(self, new_scale: float) -> None:
         if new_scale < 0:
             raise ValueError("Time scale must be positive")
 
-        # IMPORTANT: Force an update before changing scale,
-        # so the time passed SO FAR is calculated with the OLD scale.
-        self.get_time()  # This updates virtual_time using the current scale
-
         with self._lock:
+            # The time passed SO FAR is calculated with the OLD scale
+            self._reanchor()
             self._scale = new_scale
-            log(f"[Clock] Scale changed to {self._scale}x")
+            self._notify_locked()
+        log(f"[Clock] Scale changed to {new_scale}x")
 
     def get_scale(self) -> float:
         return self._scale
 
     def jump(self, seconds: int) -> None:
         with self._lock:
-            self._virtual_time += seconds
-            log(f"[Clock] Jumped {seconds}s")
+            self._anchor_virtual += seconds
+            self._notify_locked()
+        log(f"[Clock] Jumped {seconds}s")
+
+    def notify(self) -> None:
+        """Wakes up the waiters, e.g. after a dispatch that may be due before what they are waiting for."""
+        with self._lock:
+            self._notify_locked()
+
+    def generation(self) -> int:
+        """Bumped by every notification. Read it before deciding what to wait for, and pass it to `wait_until`."""
+        with self._lock:
+            return self._generation
+
+    def wait_until(self, virtual_time: float | None, generation: int | None = None) -> bool:
+        """
+        Blocks until the virtual time reaches `virtual_time` (None: nothing to wait for, only a notification
+        ends the wait), or until the clock is notified. Returns whether the time was reached.
+        Notifications since `generation` (see `generation()`) end the wait right away, those sent while the caller
+        was still computing `virtual_time` are not lost. Without it, only the notifications from now on count.
+        No periodic wake-ups: with a stopped clock (scale 0) or nothing due, it sleeps until notified.
+        """
+        with self._lock:
+            if generation is None:
+                generation = self._generation
+            while True:
+                now = self._now()
+                if virtual_time is not None and now >= virtual_time:
+                    return True
+                if self._generation != generation:
+                    return False
+
+                stopped = virtual_time is None or self._scale == 0
+                self._changed.wait(None if stopped else (virtual_time - now) / self._scale)
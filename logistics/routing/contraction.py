@@ -0,0 +1,246 @@
+import heapq
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from logistics.routing.graph import PathResult
+
+# Nodes settled by a single witness search before giving up (and adding a possibly redundant shortcut)
+WITNESS_SETTLE_LIMIT: int = 64
+
+# (source_id, target_id, cost, connection_id, child_edge_a, child_edge_b)
+# Original connections have no children (-1), shortcuts have no connection (-1).
+# Tell them apart by the children: -1 is also a valid connection id, the way back of the two-way connection 1.
+type HierarchyEdge = tuple[int, int, int, int, int, int]
+_EDGE_FIELDS: int = 6
+
+
+@dataclass(frozen=True, slots=True)
+class ContractionHierarchy:
+    """
+    Warehouses ranked by "importance" plus the shortcut edges that preserve distances once the less important ones
+    are removed. Queries only ever go upward in rank, which makes them settle a tiny part of the network.
+    Valid only for the routing graph version it was built from.
+    """
+    graph_version: int
+    rank: dict[int, int]
+    edges: list[HierarchyEdge]
+    # node -> [(cost, higher_ranked_node, edge_index)], edges leaving the node
+    upward: dict[int, list[tuple[int, int, int]]] = field(default_factory=dict)
+    # node -> [(cost, higher_ranked_node, edge_index)], edges entering the node (searched from the target)
+    downward: dict[int, list[tuple[int, int, int]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for index, (source, target, cost, _, _, _) in enumerate(self.edges):
+            if self.rank[target] > self.rank[source]:
+                self.upward.setdefault(source, []).append((cost, target, index))
+            else:
+                self.downward.setdefault(target, []).append((cost, source, index))
+
+    def to_blobs(self) -> tuple[bytes, bytes, bytes]:
+        """Compact (node_ids, node_ranks, edges) int64 buffers, for storing in the DB."""
+        nodes = array('q', self.rank.keys())
+        ranks = array('q', self.rank.values())
+        edges = array('q', (value for edge in self.edges for value in edge))
+        return nodes.tobytes(), ranks.tobytes(), edges.tobytes()
+
+    @classmethod
+    def from_blobs(cls, graph_version: int, nodes: bytes, ranks: bytes, edges: bytes) -> "ContractionHierarchy":
+        node_array, rank_array, edge_array = array('q'), array('q'), array('q')
+        node_array.frombytes(nodes)
+        rank_array.frombytes(ranks)
+        edge_array.frombytes(edges)
+        return cls(
+            graph_version,
+            dict(zip(node_array, rank_array, strict=True)),
+            [tuple(edge_array[i:i + _EDGE_FIELDS]) for i in range(0, len(edge_array), _EDGE_FIELDS)],
+        )
+
+
+def build_contraction_hierarchy(
+        connections: Iterable[tuple[int, int, int, int]], graph_version: int
+) -> ContractionHierarchy:
+    """
+    Contracts the warehouses one by one, least important first (edge difference + contracted neighbours),
+    with lazily updated priorities. A shortcut u -> w replaces the path u -> v -> w
+    unless a bounded witness search finds another path that is at least as short.
+    """
+    builder = _HierarchyBuilder(connections)
+    rank = builder.contract_all()
+    return ContractionHierarchy(graph_version, rank, builder.edges)
+
+
+class _HierarchyBuilder:
+    __slots__ = ("contracted", "contracted_neighbours", "edges", "in_edges", "out_edges")
+
+    def __init__(self, connections: Iterable[tuple[int, int, int, int]]):
+        self.edges: list[HierarchyEdge] = []
+        # Cheapest edge between every pair of nodes: {u: {w: edge_index}}
+        self.out_edges: dict[int, dict[int, int]] = {}
+        self.in_edges: dict[int, dict[int, int]] = {}
+        for conn_id, src, tgt, cost in connections:
+            if src != tgt:
+                self._add_edge(src, tgt, cost, conn_id, -1, -1)
+
+        self.contracted: set[int] = set()
+        self.contracted_neighbours: dict[int, int] = dict.fromkeys(self.out_edges.keys() | self.in_edges.keys(), 0)
+
+    def _add_edge(self, source: int, target: int, cost: int, conn_id: int, child_a: int, child_b: int) -> None:
+        existing = self.out_edges.get(source, {}).get(target)
+        if existing is not None and self.edges[existing][2] <= cost:
+            return
+        self.edges.append((source, target, cost, conn_id, child_a, child_b))
+        self.out_edges.setdefault(source, {})[target] = len(self.edges) - 1
+        self.in_edges.setdefault(target, {})[source] = len(self.edges) - 1
+
+    def contract_all(self) -> dict[int, int]:
+        rank: dict[int, int] = {}
+        pq = [(self._priority(node)[0], node) for node in self.contracted_neighbours]
+        heapq.heapify(pq)
+
+        while pq:
+            _, node = heapq.heappop(pq)
+            priority, shortcuts = self._priority(node)
+            # Lazy update: the stored priority might be outdated, contract only if the node is still the best pick
+            if pq and priority > pq[0][0]:
+                heapq.heappush(pq, (priority, node))
+                continue
+
+            for source, target, cost, edge_a, edge_b in shortcuts:
+                self._add_edge(source, target, cost, -1, edge_a, edge_b)
+            rank[node] = len(rank)
+            self.contracted.add(node)
+            for neighbour in self._neighbours(node):
+                self.contracted_neighbours[neighbour] += 1
+
+        return rank
+
+    def _neighbours(self, node: int) -> set[int]:
+        neighbours = self.out_edges.get(node, {}).keys() | self.in_edges.get(node, {}).keys()
+        return neighbours - self.contracted
+
+    def _priority(self, node: int) -> tuple[int, list[tuple[int, int, int, int, int]]]:
+        shortcuts = self._shortcuts(node)
+        degree = len(self._neighbours(node))
+        return len(shortcuts) - degree + self.contracted_neighbours[node], shortcuts
+
+    def _shortcuts(self, node: int) -> list[tuple[int, int, int, int, int]]:
+        """Returns the shortcuts (source, target, cost, edge_a, edge_b) needed to contract the node."""
+        incoming = [(u, i) for u, i in self.in_edges.get(node, {}).items() if u not in self.contracted]
+        outgoing = [(w, i) for w, i in self.out_edges.get(node, {}).items() if w not in self.contracted]
+        if not incoming or not outgoing:
+            return []
+
+        max_out_cost = max(self.edges[i][2] for _, i in outgoing)
+        shortcuts = []
+        for u, in_index in incoming:
+            in_cost = self.edges[in_index][2]
+            witness_costs = self._witness_search(u, node, in_cost + max_out_cost)
+            for w, out_index in outgoing:
+                via_cost = in_cost + self.edges[out_index][2]
+                if w != u and witness_costs.get(w, float('inf')) > via_cost:
+                    shortcuts.append((u, w, via_cost, in_index, out_index))
+        return shortcuts
+
+    def _witness_search(self, source: int, excluded: int, max_cost: int) -> dict[int, int]:
+        """Bounded Dijkstra over the not yet contracted nodes, avoiding the node being contracted."""
+        pq = [(0, source)]
+        min_costs = {source: 0}
+        settled = 0
+        while pq and settled < WITNESS_SETTLE_LIMIT:
+            cost, u = heapq.heappop(pq)
+            if cost > max_cost:
+                break
+            if cost > min_costs[u]:
+                continue
+            settled += 1
+            for v, index in self.out_edges.get(u, {}).items():
+                if v == excluded or v in self.contracted:
+                    continue
+                new_cost = cost + self.edges[index][2]
+                if new_cost < min_costs.get(v, float('inf')):
+                    min_costs[v] = new_cost
+                    heapq.heappush(pq, (new_cost, v))
+        return min_costs
+
+
+def find_path_ch(hierarchy: ContractionHierarchy, source: int, target: int) -> PathResult | None:
+    """
+    Bidirectional Dijkstra restricted to upward edges on both sides.
+    The searches meet at the highest ranked node of the shortest path, shortcuts are unpacked afterward.
+    Returns None if the target is unreachable.
+    """
+    if source == target:
+        return PathResult(0, [], 0)
+
+    # Index 0: forward search from the source, index 1: backward search from the target
+    graphs = (hierarchy.upward, hierarchy.downward)
+    min_costs: tuple[dict[int, int], dict[int, int]] = ({source: 0}, {target: 0})
+    predecessors: tuple[dict[int, int], dict[int, int]] = ({}, {})  # node -> edge_index
+    pqs = ([(0, source)], [(0, target)])
+
+    best_cost = float('inf')
+    meeting_node: int | None = None
+    nodes_expanded = 0
+
+    while True:
+        # Continue with the direction having the smaller minimum, stop once neither can improve the best path
+        side = 0 if pqs[0] and (not pqs[1] or pqs[0][0][0] <= pqs[1][0][0]) else 1
+        if not pqs[side] or pqs[side][0][0] >= best_cost:
+            break
+
+        cost, u = heapq.heappop(pqs[side])
+        if cost > min_costs[side][u]:
+            continue
+        nodes_expanded += 1
+
+        other_cost = min_costs[1 - side].get(u)
+        if other_cost is not None and cost + other_cost < best_cost:
+            best_cost = cost + other_cost
+            meeting_node = u
+
+        for edge_cost, v, index in graphs[side].get(u, ()):
+            new_cost = cost + edge_cost
+            if new_cost < min_costs[side].get(v, float('inf')):
+                min_costs[side][v] = new_cost
+                predecessors[side][v] = index
+                heapq.heappush(pqs[side], (new_cost, v))
+
+    if meeting_node is None:
+        return None
+
+    return PathResult(int(best_cost), _unpack_path(hierarchy, predecessors, meeting_node), nodes_expanded)
+
+
+def _unpack_path(
+        hierarchy: ContractionHierarchy, predecessors: tuple[dict[int, int], dict[int, int]], meeting_node: int
+) -> list[int]:
+    edges = hierarchy.edges
+
+    # Source -> meeting node, traced back from the meeting node
+    hierarchy_path: list[int] = []
+    node = meeting_node
+    while node in predecessors[0]:
+        index = predecessors[0][node]
+        hierarchy_path.append(index)
+        node = edges[index][0]
+    hierarchy_path.reverse()
+
+    # Meeting node -> target, the backward predecessors already point towards the target
+    node = meeting_node
+    while node in predecessors[1]:
+        index = predecessors[1][node]
+        hierarchy_path.append(index)
+        node = edges[index][1]
+
+    # Replace every shortcut with the two edges it skips over
+    connection_ids: list[int] = []
+    stack = list(reversed(hierarchy_path))
+    while stack:
+        _, _, _, conn_id, child_a, child_b = edges[stack.pop()]
+        if child_a < 0:
+            connection_ids.append(conn_id)
+        else:
+            stack.append(child_b)
+            stack.append(child_a)
+    return connection_ids
@@ -0,0 +1,277 @@
+import heapq
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+class PathResult(NamedTuple):
+    cost: int
+    connection_ids: list[int]
+    nodes_expanded: int  # Nodes settled by the search, the usual measure of routing effort
+
+
+class CSRGraph:
+    """
+    Compressed sparse row routing graph.
+    Warehouses are mapped to dense indexes 0..n-1 (in ascending id order), and the edges leaving the node `i` are
+    `targets[k]`, `costs[k]` and `connection_ids[k]` for every `k` in `range(offsets[i], offsets[i + 1])`.
+    Four flat int64 buffers instead of a list of tuples per warehouse, i.e. no Python objects per edge.
+    """
+    __slots__ = ("connection_ids", "costs", "index_of", "node_ids", "offsets", "targets")
+
+    def __init__(
+            self, node_ids: array, offsets: array, targets: array, costs: array, connection_ids: array
+    ):
+        self.node_ids = memoryview(node_ids)
+        self.offsets = memoryview(offsets)
+        self.targets = memoryview(targets)
+        self.costs = memoryview(costs)
+        self.connection_ids = memoryview(connection_ids)
+        self.index_of: dict[int, int] = {node_id: index for index, node_id in enumerate(node_ids)}
+
+    @classmethod
+    def from_connections(
+            cls, connections: Iterable[tuple[int, int, int, int]], *, reverse: bool = False
+    ) -> "CSRGraph":
+        """
+        Builds the graph from DB rows (id, source, target, time), sorted by the (dense) source index.
+        With `reverse` every connection is flipped. The forward and reverse graphs of the same rows
+        share the dense indexes, so per-node arrays computed on one are valid for the other.
+        """
+        rows = list(connections)
+        node_ids = array('q', sorted({src for _, src, _, _ in rows} | {tgt for _, _, tgt, _ in rows}))
+        index_of = {node_id: index for index, node_id in enumerate(node_ids)}
+
+        # 1. (source_index, target_index, cost, connection_id) in source order, the sort is stable
+        if reverse:
+            edges = [(index_of[tgt], index_of[src], cost, conn_id) for conn_id, src, tgt, cost in rows]
+        else:
+            edges = [(index_of[src], index_of[tgt], cost, conn_id) for conn_id, src, tgt, cost in rows]
+        edges.sort(key=lambda edge: edge[0])
+
+        # 2. Count the edges leaving every node, prefix sums give the offsets
+        counts = [0] * (len(node_ids) + 1)
+        for source, _, _, _ in edges:
+            counts[source + 1] += 1
+        for i in range(len(node_ids)):
+            counts[i + 1] += counts[i]
+
+        return cls(
+            node_ids,
+            array('q', counts),
+            array('q', [edge[1] for edge in edges]),
+            array('q', [edge[2] for edge in edges]),
+            array('q', [edge[3] for edge in edges]),
+        )
+
+    def __reduce__(self) -> tuple:
+        """Pickled as its five buffers, e.g. for worker processes, without the id -> index dict."""
+        return CSRGraph, tuple(buffer.obj for buffer in (
+            self.node_ids, self.offsets, self.targets, self.costs, self.connection_ids
+        ))
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the edge and node buffers, without the id -> index dict."""
+        return sum(buffer.nbytes for buffer in (
+            self.node_ids, self.offsets, self.targets, self.costs, self.connection_ids
+        ))
+
+    def edge_source(self, edge: int) -> int:
+        """Dense index of the node the edge leaves, O(log n) lookup in the offsets."""
+        return bisect_right(self.offsets, edge) - 1
+
+
+def find_path(graph: CSRGraph, source: int, target: int) -> PathResult | None:
+    """
+    Dijkstra's algorithm stopping as soon as the target is settled, run directly on the CSR buffers.
+    Takes and returns warehouse/connection ids. Returns None if the target is unreachable.
+    """
+    s, t = graph.index_of.get(source), graph.index_of.get(target)
+    if s is None or t is None:
+        return PathResult(0, [], 0) if source == target else None
+
+    offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+
+    # Priority Queue: (accumulated_cost, current_node_index)
+    pq = [(0, s)]
+
+    # Track minimum cost to reach a node
+    min_costs = {s: 0}
+
+    # Track the path: predecessor[node] = edge used to reach it
+    predecessors: dict[int, int] = {}
+    nodes_expanded = 0
+
+    heappop, heappush, get_cost = heapq.heappop, heapq.heappush, min_costs.get
+    inf = float('inf')
+
+    while pq:
+        cost, u = heappop(pq)
+
+        if u == t:
+            return PathResult(cost, backtrack(graph, predecessors, s, t), nodes_expanded)
+
+        if cost > min_costs[u]:
+            continue
+        nodes_expanded += 1
+
+        for edge in range(offsets[u], offsets[u + 1]):
+            v = targets[edge]
+            new_cost = cost + costs[edge]
+            if new_cost < get_cost(v, inf):
+                min_costs[v] = new_cost
+                predecessors[v] = edge
+                heappush(pq, (new_cost, v))
+
+    # No path exists (Road deleted? Island warehouse?)
+    return None
+
+
+def shortest_path_tree_indexes(
+        graph: CSRGraph, root: int, settle: Iterable[int] | None = None
+) -> tuple[dict[int, int], dict[int, int]]:
+    """
+    Dijkstra from the root (dense index), settling every reachable node,
+    or only until all the `settle` nodes are settled (their costs and tree paths are final by then).
+    Returns: ({node_index: cost}, {node_index: edge used to reach it})
+    """
+    offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+    pq = [(0, root)]
+    min_costs = {root: 0}
+    predecessors: dict[int, int] = {}
+    pending = None if settle is None else set(settle) - {root}
+
+    # Local aliases, this loop runs once per edge of the whole graph
+    heappop, heappush, get_cost = heapq.heappop, heapq.heappush, min_costs.get
+    inf = float('inf')
+
+    while pq:
+        if pending is not None and not pending:
+            break
+        cost, u = heappop(pq)
+        if cost > min_costs[u]:
+            continue
+        if pending is not None:
+            pending.discard(u)
+        for edge in range(offsets[u], offsets[u + 1]):
+            v = targets[edge]
+            new_cost = cost + costs[edge]
+            if new_cost < get_cost(v, inf):
+                min_costs[v] = new_cost
+                predecessors[v] = edge
+                heappush(pq, (new_cost, v))
+
+    return min_costs, predecessors
+
+
+def shortest_path_tree(graph: CSRGraph, root: int) -> tuple[dict[int, int], dict[int, tuple[int, int]]]:
+    """
+    Full Dijkstra from the root warehouse, settling every reachable warehouse.
+    Run on a reversed graph, the tree holds the distance of every warehouse TO the root,
+    and predecessor[warehouse] is the next hop (next_warehouse, connection_id) on its shortest path towards the root.
+    Returns: (min_costs, predecessors), keyed by warehouse ids
+    """
+    root_index = graph.index_of.get(root)
+    if root_index is None:
+        return {root: 0}, {}
+
+    costs, edges = shortest_path_tree_indexes(graph, root_index)
+    node_ids, connection_ids = graph.node_ids, graph.connection_ids
+    return (
+        {node_ids[node]: cost for node, cost in costs.items()},
+        {
+            node_ids[node]: (node_ids[graph.edge_source(edge)], connection_ids[edge])
+            for node, edge in edges.items()
+        },
+    )
+
+
+def backtrack(graph: CSRGraph, predecessors: dict[int, int], source: int, target: int) -> list[int]:
+    # Since 'predecessors' maps Target -> Edge, we trace back from the target and reverse
+    path = []
+    curr = target
+    while curr != source:
+        edge = predecessors[curr]
+        path.append(graph.connection_ids[edge])
+        curr = graph.edge_source(edge)
+    path.reverse()
+    return path
+
+
+class _Tarjan:
+    """The state of `strongly_connected_components`, shared by its steps."""
+
+    __slots__ = ("components", "graph", "low", "on_stack", "order", "stack", "visited")
+
+    def __init__(self, graph: CSRGraph) -> None:
+        self.graph = graph
+        self.order = [-1] * len(graph)  # Discovery order, -1 while unvisited
+        self.low = [0] * len(graph)
+        self.on_stack = [False] * len(graph)
+        self.stack: list[int] = []
+        self.components: list[list[int]] = []
+        self.visited = 0
+
+    def discover(self, node: int) -> None:
+        self.order[node] = self.low[node] = self.visited
+        self.visited += 1
+        self.stack.append(node)
+        self.on_stack[node] = True
+
+    def search(self, root: int) -> None:
+        offsets, targets, order, low = self.graph.offsets, self.graph.targets, self.order, self.low
+        self.discover(root)
+        work = [(root, offsets[root])]  # (node, next edge to follow)
+        while work:
+            node, edge = work[-1]
+            if edge < offsets[node + 1]:
+                work[-1] = (node, edge + 1)
+                target = targets[edge]
+                if order[target] == -1:
+                    self.discover(target)
+                    work.append((target, offsets[target]))
+                elif self.on_stack[target]:
+                    low[node] = min(low[node], order[target])
+                continue
+
+            work.pop()
+            if len(work) > 0:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == order[node]:
+                self.pop_component(node)
+
+    def pop_component(self, root: int) -> None:
+        component = []
+        while True:
+            member = self.stack.pop()
+            self.on_stack[member] = False
+            component.append(self.graph.node_ids[member])
+            if member == root:
+                break
+        self.components.append(sorted(component))
+
+
+def strongly_connected_components(graph: CSRGraph) -> list[list[int]]:
+    """
+    Tarjan's algorithm, iterative (a recursion per node would overflow the stack on long chains).
+    Every warehouse of a component can reach every other one of it.
+    Returns the warehouse ids of every component, the largest first.
+    """
+    tarjan = _Tarjan(graph)
+    for root in range(len(graph)):
+        if tarjan.order[root] == -1:
+            tarjan.search(root)
+
+    components = tarjan.components
+    components.sort(key=lambda component: (-len(component), component[0]))
+    return components
@@ -0,0 +1,143 @@
+import heapq
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from logistics.routing.graph import CSRGraph, PathResult, backtrack, shortest_path_tree_indexes
+
+DEFAULT_LANDMARK_COUNT: int = 8
+
+# Stored in place of the distance when a node and a landmark are not connected
+UNREACHABLE: int = -1
+
+
+@dataclass(frozen=True, slots=True)
+class LandmarkIndex:
+    """
+    Precomputed distances between every warehouse and a handful of landmark warehouses,
+    as one int64 array per landmark indexed by the dense node indexes of the `CSRGraph`.
+    Valid only for the routing graph version it was built from.
+    """
+    graph_version: int
+    landmarks: tuple[int, ...]  # Dense node indexes
+    from_landmark: tuple[array, ...]  # d(landmark, node)
+    to_landmark: tuple[array, ...]  # d(node, landmark)
+
+
+def build_landmark_index(
+        graph: CSRGraph,
+        reverse_graph: CSRGraph,
+        graph_version: int,
+        count: int = DEFAULT_LANDMARK_COUNT
+) -> LandmarkIndex:
+    """
+    Picks the landmarks with the farthest-point heuristic:
+    every next landmark is the warehouse farthest away from all the already picked ones,
+    which spreads them along the edges of the network, where their bounds are the tightest.
+    Both graphs have to be built from the same connections, so they share the node indexes.
+    """
+    node_count = len(graph)
+    if node_count == 0:
+        return LandmarkIndex(graph_version, (), (), ())
+
+    landmarks: list[int] = []
+    from_landmark: list[array] = []
+    to_landmark: list[array] = []
+
+    # The first landmark is the farthest node from an arbitrary (but deterministic) start
+    start_costs, _ = shortest_path_tree_indexes(graph, 0)
+    candidate = max(start_costs, key=lambda node: (start_costs[node], -node))
+    closest: list[float] = [float('inf')] * node_count
+
+    while len(landmarks) < min(count, node_count):
+        landmarks.append(candidate)
+        from_costs, _ = shortest_path_tree_indexes(graph, candidate)
+        to_costs, _ = shortest_path_tree_indexes(reverse_graph, candidate)
+        from_landmark.append(_to_array(from_costs, node_count))
+        to_landmark.append(_to_array(to_costs, node_count))
+
+        for node in range(node_count):
+            # Round-trip distance, so the spread works on directed networks too
+            distance = from_costs.get(node, float('inf')) + to_costs.get(node, float('inf'))
+            if distance < closest[node]:
+                closest[node] = distance
+
+        # Unreachable nodes (inf) are ignored, they would only produce useless landmarks
+        reachable = [
+            node for node in range(node_count) if node not in landmarks and closest[node] != float('inf')
+        ]
+        if not reachable:
+            break
+        candidate = max(reachable, key=lambda node: (closest[node], -node))
+
+    return LandmarkIndex(graph_version, tuple(landmarks), tuple(from_landmark), tuple(to_landmark))
+
+
+def _to_array(costs: dict[int, int], node_count: int) -> array:
+    result = array('q', [UNREACHABLE]) * node_count
+    for node, cost in costs.items():
+        result[node] = cost
+    return result
+
+
+def find_path_alt(graph: CSRGraph, index: LandmarkIndex, source: int, target: int) -> PathResult | None:
+    """
+    A* search with ALT (A*, Landmarks, Triangle inequality) lower bounds:
+    d(v, t) >= d(v, L) - d(t, L)  and  d(v, t) >= d(L, t) - d(L, v)  for every landmark L.
+    The bound is consistent, so the first time the target is popped its path is the shortest one.
+    Takes and returns warehouse/connection ids. Returns None if the target is unreachable.
+    """
+    s, t = graph.index_of.get(source), graph.index_of.get(target)
+    if s is None or t is None:
+        return PathResult(0, [], 0) if source == target else None
+
+    offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+    heuristic = _landmark_heuristic(index, t)
+
+    # Priority Queue: (estimated_total_cost, accumulated_cost, current_node_index)
+    pq = [(heuristic(s), 0, s)]
+    min_costs = {s: 0}
+    predecessors: dict[int, int] = {}
+    settled: set[int] = set()
+
+    while pq:
+        _, cost, u = heapq.heappop(pq)
+
+        if u == t:
+            return PathResult(cost, backtrack(graph, predecessors, s, t), len(settled))
+
+        if u in settled:
+            continue
+        settled.add(u)
+
+        for edge in range(offsets[u], offsets[u + 1]):
+            v = targets[edge]
+            new_cost = cost + costs[edge]
+            if new_cost < min_costs.get(v, float('inf')):
+                min_costs[v] = new_cost
+                predecessors[v] = edge
+                heapq.heappush(pq, (new_cost + heuristic(v), new_cost, v))
+
+    return None
+
+
+def _landmark_heuristic(index: LandmarkIndex, target: int) -> Callable[[int], int]:
+    # Only landmarks with a known distance to/from the target can bound anything
+    to_bounds = [(to_costs, to_costs[target]) for to_costs in index.to_landmark if to_costs[target] != UNREACHABLE]
+    from_bounds = [
+        (from_costs, from_costs[target]) for from_costs in index.from_landmark if from_costs[target] != UNREACHABLE
+    ]
+
+    def heuristic(node: int) -> int:
+        bound = 0
+        for to_costs, target_cost in to_bounds:
+            node_cost = to_costs[node]
+            if node_cost != UNREACHABLE and node_cost - target_cost > bound:
+                bound = node_cost - target_cost
+        for from_costs, target_cost in from_bounds:
+            node_cost = from_costs[node]
+            if node_cost != UNREACHABLE and target_cost - node_cost > bound:
+                bound = target_cost - node_cost
+        return bound
+
+    return heuristic
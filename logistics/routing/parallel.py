@@ -0,0 +1,80 @@
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from logistics.routing.graph import CSRGraph, PathResult, find_path
+from logistics.routing.router import Router, RoutingAlgorithm
+
+# Requests of a batch below which they are answered in-process, shipping them to the workers costs more
+PARALLEL_ROUTING_MIN_BATCH: int = 64
+
+# Chunks per worker, so a slow chunk (long paths) does not leave the other workers idle
+CHUNKS_PER_WORKER: int = 4
+
+
+class RoutingPool:
+    """
+    Answers large batches of routing requests (e.g. all the next hops of an arrival wave) on worker processes.
+    The workers get the routing graph of the router once per graph version, as a pickled CSR in their initializer:
+    the pool is restarted by the first large batch after the connections changed.
+    The workers run plain Dijkstra, so small batches, and every batch while the ALT or CH preprocessing
+    of the router is ready, are answered in-process.
+    """
+    __slots__ = ("_executor", "_graph_version", "min_batch", "parallel_batches", "parallel_requests", "workers")
+
+    def __init__(self, workers: int, min_batch: int = PARALLEL_ROUTING_MIN_BATCH):
+        if workers < 1:
+            raise ValueError("The routing pool needs at least one worker")
+
+        self.workers = workers
+        self.min_batch = min_batch
+        self._executor: ProcessPoolExecutor | None = None
+        self._graph_version: int | None = None
+
+        # Statistics, for benchmarking and debugging
+        self.parallel_batches = 0
+        self.parallel_requests = 0
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def find_paths(self, router: Router, requests: Sequence[tuple[int, int]]) -> list[PathResult | None]:
+        """The paths of the (source, target) requests, in the same order, None for the unreachable ones."""
+        accelerated = router.algorithm != RoutingAlgorithm.DIJKSTRA and router.preprocessing_ready
+        if len(requests) < self.min_batch or accelerated:
+            return [router.find_path(source, target) for source, target in requests]
+
+        executor = self._get_executor(router)
+        chunk_size = -(-len(requests) // (self.workers * CHUNKS_PER_WORKER))
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        self.parallel_batches += 1
+        self.parallel_requests += len(requests)
+        return [path for paths in executor.map(_find_paths, chunks) for path in paths]
+
+    def _get_executor(self, router: Router) -> ProcessPoolExecutor:
+        if self._executor is None or self._graph_version != router.graph_version:
+            self.close()
+            # Spawned, forking the multithreaded app is unsafe
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(router.graph,),
+            )
+            self._graph_version = router.graph_version
+        return self._executor
+
+
+# Graph of a worker process, set once by `_init_worker`
+_worker_graph: CSRGraph | None = None
+
+
+def _init_worker(graph: CSRGraph) -> None:
+    global _worker_graph  # One graph per worker process, replaced by restarting the pool
+    _worker_graph = graph
+
+
+def _find_paths(requests: Sequence[tuple[int, int]]) -> list[PathResult | None]:
+    return [find_path(_worker_graph, source, target) for source, target in requests]
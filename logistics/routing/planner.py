@@ -0,0 +1,154 @@
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from logistics.database.database import Database
+from logistics.routing.graph import CSRGraph, shortest_path_tree
+
+
+@dataclass(frozen=True, slots=True)
+class Demand:
+    product_id: int
+    quantity: int
+    destination_warehouse_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class PlanReport:
+    transport_ids: list[int]
+    shipped_units: int
+    unfulfilled: list[Demand]  # Only the missing quantity of each demand
+    total_transit_minutes: int
+    planning_seconds: float
+    writing_seconds: float
+
+
+class _DistanceOracle:
+    """
+    Lazily computed shortest-path trees shared by all the demands.
+    Trees are rooted at whichever side (destinations or sources) has fewer distinct warehouses,
+    so a batch of N demands costs at most min(destinations, sources) Dijkstra runs.
+    """
+    __slots__ = ("_by_destination", "_graph", "_trees")
+
+    def __init__(self, connections: list[tuple[int, int, int, int]], by_destination: bool):
+        self._by_destination = by_destination
+        self._graph = CSRGraph.from_connections(connections, reverse=by_destination)
+        self._trees: dict[int, tuple[dict[int, int], dict[int, tuple[int, int]]]] = {}
+
+    def _tree(self, root: int) -> tuple[dict[int, int], dict[int, tuple[int, int]]]:
+        tree = self._trees.get(root)
+        if tree is None:
+            tree = self._trees[root] = shortest_path_tree(self._graph, root)
+        return tree
+
+    def nearest_sources(self, sources: Iterable[int], destination: int) -> list[tuple[int, int]]:
+        """Returns (distance, source) of the sources able to reach the destination, nearest first."""
+        if self._by_destination:
+            costs = self._tree(destination)[0]
+            candidates = [(costs[source], source) for source in sources if source in costs]
+        else:
+            candidates = []
+            for source in sources:
+                distance = self._tree(source)[0].get(destination)
+                if distance is not None:
+                    candidates.append((distance, source))
+        candidates.sort()
+        return candidates
+
+    def distance(self, source: int, destination: int) -> int | None:
+        if self._by_destination:
+            return self._tree(destination)[0].get(source)
+        return self._tree(source)[0].get(destination)
+
+    def path(self, source: int, destination: int) -> list[int]:
+        """Connection ids of the shortest path, the destination has to be reachable."""
+        if self._by_destination:
+            # In a reversed tree the predecessor of a node is its next hop towards the root
+            next_hops = self._tree(destination)[1]
+            path = []
+            curr = source
+            while curr != destination:
+                curr, connection_id = next_hops[curr]
+                path.append(connection_id)
+            return path
+
+        predecessors = self._tree(source)[1]
+        path = []
+        curr = destination
+        while curr != source:
+            curr, connection_id = predecessors[curr]
+            path.append(connection_id)
+        path.reverse()
+        return path
+
+
+def plan_transports(database: Database, demands: list[Demand], start_time: int) -> PlanReport:
+    """
+    Fulfills the demands from the nearest warehouses holding the product,
+    consolidating everything going between the same two warehouses into a single transport.
+    All the transports are dispatched in a single transaction (see `Database.dispatch_transports`):
+    nothing is written if a destination has no room for its cargo, or if the stock or the connections
+    changed since they were read (ValueError, StaleGraphError).
+    """
+    planning_start = time.perf_counter()
+
+    # 1. Merge demands for the same product and destination, keeping the input order
+    requested: Counter[tuple[int, int]] = Counter()
+    for demand in demands:
+        if demand.quantity <= 0:
+            raise ValueError("Demand quantity must be positive")
+        requested[(demand.destination_warehouse_id, demand.product_id)] += demand.quantity
+
+    # 2. Snapshot of the available stock: {product_id: {warehouse_id: count}}
+    available: dict[int, dict[int, int]] = {}
+    for warehouse_id, product_id, count in database.get_stock_of_products({p for _, p in requested}):
+        available.setdefault(product_id, {})[warehouse_id] = count
+
+    destinations = {d for d, _ in requested}
+    sources = {w for stock in available.values() for w in stock}
+    # Read before the graph, a change in between is caught by the dispatch
+    graph_version = database.get_routing_graph_version()
+    oracle = _DistanceOracle(database.get_routing_graph(), by_destination=len(destinations) <= len(sources))
+
+    # 3. Greedy allocation from the nearest source
+    shipments: dict[tuple[int, int], dict[int, int]] = {}
+    unfulfilled: list[Demand] = []
+    shipped_units = 0
+    for (destination, product_id), quantity in requested.items():
+        stock = available.get(product_id, {})
+        holders = (w for w, count in stock.items() if count > 0 and w != destination)
+
+        for _, warehouse_id in oracle.nearest_sources(holders, destination):
+            if quantity == 0:
+                break
+            taken = min(quantity, stock[warehouse_id])
+            stock[warehouse_id] -= taken
+            quantity -= taken
+            shipped_units += taken
+            cargo = shipments.setdefault((warehouse_id, destination), {})
+            cargo[product_id] = cargo.get(product_id, 0) + taken
+
+        if quantity > 0:
+            unfulfilled.append(Demand(product_id, quantity, destination))
+
+    # 4. Route every consolidated shipment
+    transports: list[tuple[int, int, list[int], dict[int, int]]] = []
+    total_transit_minutes = 0
+    for (source, destination), cargo in shipments.items():
+        total_transit_minutes += oracle.distance(source, destination)
+        transports.append((source, destination, oracle.path(source, destination), cargo))
+
+    writing_start = time.perf_counter()
+    transport_ids = database.dispatch_transports(transports, start_time, graph_version)
+    writing_end = time.perf_counter()
+
+    return PlanReport(
+        transport_ids=transport_ids,
+        shipped_units=shipped_units,
+        unfulfilled=unfulfilled,
+        total_transit_minutes=total_transit_minutes,
+        planning_seconds=writing_start - planning_start,
+        writing_seconds=writing_end - writing_start,
+    )
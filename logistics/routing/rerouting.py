@@ -0,0 +1,105 @@
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from logistics.database.database import Database
+from logistics.routing.graph import CSRGraph, shortest_path_tree_indexes
+
+
+@dataclass(frozen=True, slots=True)
+class RerouteReport:
+    affected: int  # In-flight transports whose remaining plan used the connection
+    rerouted: int
+    unreachable: list[int]  # Transport ids, left without a plan (the event loop reports them at their next stop)
+    seconds: float
+
+
+def reroute_after_connection_change(
+        database: Database, connection_id: int, apply_change: Callable[[], None]
+) -> RerouteReport:
+    """
+    Change hook for edits and removals of a connection.
+    The transports planned through the connection are looked up before the change (the triggers drop their
+    remaining steps), and only those are replanned: one shortest-path search per distinct destination
+    (or next stop, whichever is fewer) that stops as soon as all of its transports are settled.
+    The new plans are written in one transaction.
+    """
+    start = time.perf_counter()
+
+    # 1. Transports using the connection, the plans surviving the change (it got faster) stay as they are
+    affected = database.get_route_plans_through(connection_id)
+    apply_change()
+    kept = set(database.get_route_plans_through(connection_id))
+    invalidated = [plan for plan in affected if plan not in kept]
+    if len(invalidated) == 0:
+        return RerouteReport(len(affected), 0, [], time.perf_counter() - start)
+
+    # 2. New paths, keyed by (next_stop, destination)
+    paths = _shortest_paths(database.get_routing_graph(), [(plan[3], plan[4]) for plan in invalidated])
+
+    new_plans: list[tuple[int, int, int, list[int]]] = []
+    unreachable: list[int] = []
+    for transport_id, transport_route_id, next_step, next_stop, destination in invalidated:
+        path = paths.get((next_stop, destination))
+        if path is None:
+            unreachable.append(transport_id)
+        elif len(path) > 0:
+            new_plans.append((transport_id, transport_route_id, next_step, path))
+        # An empty path means the transport is already on its last leg, it needs no further steps
+
+    # 3. One write transaction for all of them
+    rerouted = database.replace_route_plans(new_plans)
+    return RerouteReport(len(affected), rerouted, unreachable, time.perf_counter() - start)
+
+
+def _shortest_paths(
+        connections: list[tuple[int, int, int, int]], pairs: list[tuple[int, int]]
+) -> dict[tuple[int, int], list[int]]:
+    """One tree per distinct destination, or per distinct origin if there are fewer of those."""
+    by_destination: dict[int, set[int]] = {}
+    by_origin: dict[int, set[int]] = {}
+    for origin, destination in pairs:
+        by_destination.setdefault(destination, set()).add(origin)
+        by_origin.setdefault(origin, set()).add(destination)
+
+    paths: dict[tuple[int, int], list[int]] = {}
+    if len(by_destination) <= len(by_origin):
+        graph = CSRGraph.from_connections(connections, reverse=True)
+        for destination, origins in by_destination.items():
+            for origin, path in _tree_paths(graph, destination, origins).items():
+                paths[(origin, destination)] = path
+    else:
+        graph = CSRGraph.from_connections(connections)
+        for origin, destinations in by_origin.items():
+            for destination, path in _tree_paths(graph, origin, destinations).items():
+                path.reverse()
+                paths[(origin, destination)] = path
+    return paths
+
+
+def _tree_paths(graph: CSRGraph, root_id: int, leaf_ids: set[int]) -> dict[int, list[int]]:
+    """
+    Tree paths (connection ids) between the root and the leaves, searched only until all the leaves are settled.
+    On a reversed graph these are the paths from the leaves to the root, otherwise they come in reverse order.
+    Unreachable leaves are left out.
+    """
+    root = graph.index_of.get(root_id)
+    if root is None:
+        return {root_id: []} if root_id in leaf_ids else {}
+
+    index_of, node_ids, connection_ids = graph.index_of, graph.node_ids, graph.connection_ids
+    leaves = {index_of[leaf] for leaf in leaf_ids if leaf in index_of}
+    costs, edges = shortest_path_tree_indexes(graph, root, settle=leaves)
+
+    paths: dict[int, list[int]] = {}
+    for leaf in leaves:
+        if leaf not in costs:
+            continue
+        path = []
+        curr = leaf
+        while curr != root:
+            edge = edges[curr]
+            path.append(connection_ids[edge])
+            curr = graph.edge_source(edge)
+        paths[node_ids[leaf]] = path
+    return paths
@@ -0,0 +1,152 @@
+import threading
+from collections.abc import Callable
+from enum import StrEnum
+
+from logistics.database.database import Database
+from logistics.io_utils import log
+from logistics.routing.contraction import ContractionHierarchy, build_contraction_hierarchy, find_path_ch
+from logistics.routing.graph import CSRGraph, PathResult, find_path
+from logistics.routing.landmarks import LandmarkIndex, build_landmark_index, find_path_alt
+
+
+class RoutingAlgorithm(StrEnum):
+    DIJKSTRA = "dijkstra"
+    ALT = "alt"  # A* with landmark bounds, falls back to Dijkstra while the landmarks are being rebuilt
+    CH = "ch"  # Contraction hierarchy stored in the DB, falls back to Dijkstra while it is being rebuilt
+
+
+class Router:
+    """
+    Keeps the routing graph in memory for as long as the connections do not change.
+    Preprocessing of every new graph version (ALT landmarks, contraction hierarchy) runs on a background thread,
+    plain Dijkstra answers the queries in the meantime.
+    With `build_hierarchy=False` the contraction hierarchy is never built nor saved, only the one stored by another
+    router is loaded once it matches the graph (e.g. in the worker processes, next to the router of the event loop).
+    """
+    __slots__ = (
+        "_algorithm", "_build_hierarchy", "_graph", "_hierarchy", "_landmarks", "_lock", "_unsaved_hierarchy",
+        "_version", "accelerated_queries", "nodes_expanded", "queries",
+    )
+
+    def __init__(self, algorithm: RoutingAlgorithm = RoutingAlgorithm.DIJKSTRA, *, build_hierarchy: bool = True):
+        self._algorithm = algorithm
+        self._build_hierarchy = build_hierarchy
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._graph: CSRGraph = CSRGraph.from_connections(())
+        self._landmarks: LandmarkIndex | None = None
+        self._hierarchy: ContractionHierarchy | None = None
+        # Built on the background thread, saved by the next `refresh` (the DB connection belongs to the loop thread)
+        self._unsaved_hierarchy: ContractionHierarchy | None = None
+
+        # Statistics, for benchmarking and debugging
+        self.queries = 0
+        self.accelerated_queries = 0  # Answered with ALT or CH instead of the Dijkstra fallback
+        self.nodes_expanded = 0
+
+    @property
+    def algorithm(self) -> RoutingAlgorithm:
+        return self._algorithm
+
+    @property
+    def graph(self) -> CSRGraph:
+        return self._graph
+
+    @property
+    def graph_version(self) -> int | None:
+        """Version of the connections the graph was loaded from, None before the first refresh."""
+        return self._version
+
+    @property
+    def preprocessing_ready(self) -> bool:
+        if self._algorithm == RoutingAlgorithm.ALT:
+            return self._landmarks is not None and self._landmarks.graph_version == self._version
+        if self._algorithm == RoutingAlgorithm.CH:
+            return self._hierarchy is not None and self._hierarchy.graph_version == self._version
+        return True
+
+    def refresh(self, database: Database) -> bool:
+        """
+        Reloads the graph if the connections changed since the last refresh.
+        Returns True if the graph was reloaded.
+        """
+        self._save_hierarchy(database)
+
+        version = database.get_routing_graph_version()
+        if version == self._version:
+            if self._algorithm == RoutingAlgorithm.CH and not self._build_hierarchy and not self.preprocessing_ready:
+                self._load_hierarchy(database)
+            return False
+
+        connections = database.get_routing_graph()
+        self._graph = CSRGraph.from_connections(connections)
+        self._version = version
+
+        if self._algorithm == RoutingAlgorithm.ALT:
+            reverse_graph = CSRGraph.from_connections(connections, reverse=True)
+            self._start_preprocessing(self._build_landmarks, self._graph, reverse_graph, version)
+        elif self._algorithm == RoutingAlgorithm.CH and not self._load_hierarchy(database) and self._build_hierarchy:
+            self._start_preprocessing(self._build_contraction_hierarchy, connections, version)
+        return True
+
+    def _load_hierarchy(self, database: Database) -> bool:
+        # Restarts reuse the stored preprocessing, the version is checked first to not read the blobs for nothing
+        if database.get_contraction_hierarchy_version() != self._version:
+            return False
+        stored = database.get_contraction_hierarchy()
+        if stored is None or stored[0] != self._version:
+            return False
+        self._hierarchy = ContractionHierarchy.from_blobs(*stored)
+        return True
+
+    @staticmethod
+    def _start_preprocessing(target: Callable[..., None], *args: object) -> None:
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    def _build_landmarks(self, graph: CSRGraph, reverse_graph: CSRGraph, version: int) -> None:
+        landmarks = build_landmark_index(graph, reverse_graph, version)
+        with self._lock:
+            # A newer graph version might have been loaded in the meantime, its own build will take over
+            if version == self._version:
+                self._landmarks = landmarks
+                log(f"[Router] Landmarks ready for graph version {version}")
+
+    def _build_contraction_hierarchy(self, connections: list[tuple[int, int, int, int]], version: int) -> None:
+        hierarchy = build_contraction_hierarchy(connections, version)
+        with self._lock:
+            if version == self._version:
+                self._hierarchy = hierarchy
+                self._unsaved_hierarchy = hierarchy
+                log(f"[Router] Contraction hierarchy ready for graph version {version}")
+
+    def _save_hierarchy(self, database: Database) -> None:
+        with self._lock:
+            hierarchy, self._unsaved_hierarchy = self._unsaved_hierarchy, None
+        # Skip it if the connections changed in the meantime, it would never be loaded anyway
+        if hierarchy is not None and hierarchy.graph_version == database.get_routing_graph_version():
+            database.save_contraction_hierarchy(hierarchy.graph_version, *hierarchy.to_blobs())
+
+    def find_path(self, source: int, target: int) -> PathResult | None:
+        landmarks, hierarchy = self._landmarks, self._hierarchy
+        if (
+            self._algorithm == RoutingAlgorithm.CH
+            and hierarchy is not None
+            and hierarchy.graph_version == self._version
+        ):
+            result = find_path_ch(hierarchy, source, target)
+            self.accelerated_queries += 1
+        elif (
+            self._algorithm == RoutingAlgorithm.ALT
+            and landmarks is not None
+            and landmarks.graph_version == self._version
+        ):
+            result = find_path_alt(self._graph, landmarks, source, target)
+            self.accelerated_queries += 1
+        else:
+            # Stale (or no) preprocessing, plain Dijkstra is always correct
+            result = find_path(self._graph, source, target)
+
+        self.queries += 1
+        if result is not None:
+            self.nodes_expanded += result.nodes_expanded
+        return result
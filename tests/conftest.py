@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Database:
+    db_path = tmp_path / "test.sqlite"
+    setup_new_database(db_path)
+    return Database(db_path)
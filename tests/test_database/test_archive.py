@@ -0,0 +1,42 @@
+from logistics.database.database import Database
+from logistics.pipeline_loops.archive_loop import archive_finished_transports
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+
+def _create_transports(database: Database) -> tuple[int, int]:
+    # 1 -> 2 -> 3, a finished transport 1 -> 3 and one still on its way 1 -> 2
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 10)
+    finished_id = database.create_transports([(1, 3, [1, 2], {1: 4})], start_time=0)[0]
+    router = Router()
+    for minute in range(1, 21):
+        _run_update(database, router, minute)
+    active_id = database.create_transports([(1, 2, [1], {1: 6})], start_time=20)[0]
+    return finished_id, active_id
+
+
+def test_only_finished_transports_are_archived(database: Database):
+    _, active_id = _create_transports(database)
+
+    assert archive_finished_transports(database, arrived_before=15, chunk_size=1) == 0
+    assert archive_finished_transports(database, arrived_before=100, chunk_size=1) == 1
+
+    assert database.is_transport_active(active_id)
+    assert [row[0] for row in database.get_active_transports()] == [active_id]
+
+
+def test_finished_transports_read_across_archive(database: Database):
+    finished_id, _ = _create_transports(database)
+    before = database.get_finished_transport_details(finished_id)
+
+    archive_finished_transports(database, arrived_before=100)
+
+    assert [row[0] for row in database.get_finished_transports()] == [finished_id]
+    assert database.get_finished_transport_details(finished_id) == before
+    # Archived legs no longer prevent removing the connections
+    database.remove_warehouse_connection(2)
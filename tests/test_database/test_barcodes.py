@@ -0,0 +1,60 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from logistics.database.barcodes import ean13_check_digit, is_valid_ean13, product_barcode
+from logistics.database.database import Database
+from logistics.database.setup import migrate_database
+
+
+def test_ean13_barcodes():
+    assert ean13_check_digit("400638133393") == 1
+    assert is_valid_ean13(4006381333931)
+    assert not is_valid_ean13(4006381333932)
+    assert product_barcode(42) == 2000000000428
+    assert all(is_valid_ean13(product_barcode(product_id)) for product_id in range(1, 1000))
+    with pytest.raises(ValueError, match="EAN-13"):
+        product_barcode(10**11)
+
+
+def test_barcodes_are_stable_and_indexed(database: Database):
+    database.add_product("box", 2)
+    database.add_product("crate", 5)
+    database.remove_product(2)
+    database.add_product("pallet", 100)  # Ids, so barcodes, are never reused
+
+    assert database.get_product_by_barcode(product_barcode(3)) == (3, "pallet", product_barcode(3), 100)
+    assert database.get_product_by_barcode(product_barcode(2)) is None
+    database.change_product_name(1, "small box")
+    assert database.get_product_by_barcode(product_barcode(1))[1] == "small box"
+
+    plan = database._cursor.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM products WHERE barcode = ?", (product_barcode(1),)
+    ).fetchall()
+    assert "products_barcode" in plan[0][3]
+
+
+def test_scanned_stock_intake(database: Database):
+    database.add_warehouse("w1", "test", 10**6)
+    database.add_product("box", 2)
+    database.add_product("crate", 5)
+    database.add_stock(1, 2, 1)
+
+    box, crate, unknown = product_barcode(1), product_barcode(2), product_barcode(99)
+    assert database.add_scanned_stock(1, [box, crate, unknown, box, unknown]) == [unknown]
+    assert sorted(database.get_stock(1)) == [(1, 2), (2, 2)]
+
+
+def test_migration_replaces_hashed_barcodes(tmp_path: Path):
+    db_path = tmp_path / "old.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript((Path(__file__).parent / "data" / "schema_v0.sql").read_text(encoding="utf-8"))
+        conn.executemany(
+            "INSERT INTO products (id, name, barcode, volume_cm) VALUES (?, ?, ?, 1)",
+            [(1, "box", -5), (7, "crate", -5), (123456, "pallet", 8)]  # Even colliding hashes
+        )
+    migrate_database(db_path)
+
+    products = Database(db_path).get_products()
+    assert [barcode for _, _, barcode, _ in products] == [product_barcode(i) for i in (1, 7, 123456)]
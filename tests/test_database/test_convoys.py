@@ -0,0 +1,105 @@
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+
+def _create_hub(db_path: Path, convoys: bool) -> Database:
+    # 1 -> 2 -> 3 and 4 -> 2, the warehouse 2 is the hub every transport goes through
+    setup_new_database(db_path)
+    database = Database(db_path, convoys=convoys)
+    for i in range(1, 5):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 20, two_way=True)
+    database.add_transport_route(4, 2, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 30)
+    database.add_stock(4, 1, 10)
+    return database
+
+
+def _run_until_idle(database: Database) -> None:
+    router = Router()
+    while (minute := database.get_next_arrival_minute()) is not None:
+        _run_update(database, router, minute)
+
+
+def _convoys(database: Database) -> list[tuple]:
+    return database._cursor.execute(
+        "SELECT connection_id, reverse, start_timestamp, arrival_timestamp, "
+        "(SELECT COUNT(*) FROM transport_routes WHERE convoy_id = convoys.id) FROM convoys ORDER BY id"
+    ).fetchall()
+
+
+def test_legs_leaving_together_travel_as_one_convoy(tmp_path: Path):
+    database = _create_hub(tmp_path / "test.sqlite", convoys=True)
+    transport_ids = database.create_transports(
+        [(1, 3, [1, 2], {1: 10}), (1, 3, [1, 2], {1: 10}), (1, 3, [1, 2], {1: 10}), (4, 3, [3, 2], {1: 10})],
+        start_time=0
+    )
+    assert _convoys(database) == [(1, 0, 0, None, 3), (3, 0, 0, None, 1)]
+    assert database.get_transport_etas(transport_ids[0]) == [(transport_ids[0], 2, 10, 3, 30)]
+    assert database.get_next_arrival_minute() == 10
+
+    # The four meet at the hub and leave it together
+    _run_update(database, Router(), 10)
+    assert _convoys(database) == [(1, 0, 0, 10, 3), (3, 0, 0, 10, 1), (2, 0, 10, None, 4)]
+    # Only the convoys got an arrival written, the legs read it from them
+    assert database._cursor.execute(
+        "SELECT COUNT(*) FROM transport_routes WHERE arrival_timestamp IS NOT NULL"
+    ).fetchone()[0] == 0
+    assert [row[0] for row in database.get_active_transports()] == transport_ids
+
+    _run_until_idle(database)
+    assert database.get_stock(3) == [(1, 40)]
+    _, stops, _ = database.get_finished_transport_details(transport_ids[3])
+    assert [(stop[1], stop[4], stop[7], stop[8]) for stop in stops] == [(4, 2, 0, 10), (2, 3, 10, 30)]
+
+    # The convoys are archived away with their last leg, the archived legs keep the arrivals
+    assert database.archive_finished_transports(arrived_before=100, limit=3) == 3
+    assert _convoys(database) == [(3, 0, 0, 10, 1), (2, 0, 10, 30, 1)]  # Still with the leg of the 4th one
+    assert database.archive_finished_transports(arrived_before=100, limit=3) == 1
+    assert _convoys(database) == []
+    _, stops, _ = database.get_finished_transport_details(transport_ids[3])
+    assert [(stop[1], stop[4], stop[7], stop[8]) for stop in stops] == [(4, 2, 0, 10), (2, 3, 10, 30)]
+
+
+def test_convoys_give_the_same_history(tmp_path: Path):
+    # Staggered departures, some legs share a convoy and some travel alone, some in the reverse direction
+    requests = [
+        (0, [(1, 3, [1, 2], {1: 5}), (4, 3, [3, 2], {1: 5})]),
+        (5, [(1, 3, [1, 2], {1: 5}), (4, 2, [3], {1: 5})]),
+        (35, [(3, 2, [-2], {1: 1})]),
+    ]
+    results = []
+    for convoys in (False, True):
+        database = _create_hub(tmp_path / f"convoys_{convoys}.sqlite", convoys=convoys)
+        router = Router()
+        transport_ids = []
+        for minute, transports in requests:
+            while (due := database.get_next_arrival_minute()) is not None and due <= minute:
+                _run_update(database, router, due)
+            transport_ids += database.create_transports(transports, start_time=minute)
+        _run_until_idle(database)
+        results.append((
+            [database.get_finished_transport_details(transport_id)[:2] for transport_id in transport_ids],
+            [database.get_stock(i) for i in range(1, 5)],
+        ))
+    assert results[0] == results[1]
+
+
+def test_leg_of_a_convoy_can_have_its_own_arrival(tmp_path: Path):
+    database = _create_hub(tmp_path / "test.sqlite", convoys=True)
+    first, second = database.create_transports([(1, 3, [1, 2], {1: 5}), (1, 3, [1, 2], {1: 5})], start_time=0)
+    first_leg = database.get_due_arrivals(10)[0][0]
+    database.change_transport_route_arrival(first_leg, 7)
+
+    # The first transport left the convoy, the other one still arrives with it
+    assert not database.is_transport_active(first)
+    assert [arrival[1] for arrival in database.get_due_arrivals(10)] == [second]
+    _run_update(database, Router(), 10)
+    assert [(stop[7], stop[8]) for stop in database.get_finished_transport_details(first)[1]] == [(0, 7)]
+    assert [(stop[7], stop[8]) for stop in database.get_finished_transport_details(second)[1]] == [(0, 10), (10, None)]
@@ -0,0 +1,39 @@
+from logistics.database.database import Database
+from logistics.pipeline_loops.archive_loop import archive_finished_transports
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+
+def _create_finished_transports(database: Database) -> list[int]:
+    # One transport 1 -> 2 dispatched every minute, each takes 10 minutes
+    database.add_warehouse("w1", "test", 10**6)
+    database.add_warehouse("w2", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 100)
+    router = Router()
+    transport_ids = []
+    for minute in range(1, 21):
+        if minute <= 5:
+            transport_ids += database.create_transports([(1, 2, [1], {1: 1})], start_time=minute)
+        _run_update(database, router, minute)
+    return transport_ids
+
+
+def test_completion_time_range(database: Database):
+    transport_ids = _create_finished_transports(database)
+
+    rows = list(database.iter_finished_transports(completed_from=12, completed_to=14))
+
+    # Completed at minutes 11..15, newest first
+    assert [(row[0], row[9]) for row in rows] == [(transport_ids[2], 13), (transport_ids[1], 12)]
+
+
+def test_keyset_pages_span_hot_and_archived_transports(database: Database):
+    transport_ids = _create_finished_transports(database)
+    archive_finished_transports(database, arrived_before=13)
+
+    first_page = database.get_finished_transports_page(limit=3)
+    second_page = database.get_finished_transports_page(before=(first_page[-1][9], first_page[-1][0]), limit=3)
+
+    assert [row[0] for row in first_page + second_page] == transport_ids[::-1]
@@ -0,0 +1,106 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from logistics.database.database import Database
+from logistics.database.journal import EventJournal, iter_journal
+from logistics.database.replay import replay_journal
+from logistics.database.setup import TableName, setup_new_database
+from logistics.pipeline_loops.archive_loop import archive_finished_transports
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.rerouting import reroute_after_connection_change
+from logistics.routing.router import Router
+
+# Not journaled: derived data, or the journal bookkeeping itself
+_NOT_REPLAYED = {TableName.STOCK_SNAPSHOTS, TableName.ROUTING_CONTRACTION_HIERARCHY, TableName.JOURNAL_POSITION}
+
+
+def _dump(db_path: Path) -> dict[str, list[tuple]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall())  # noqa: S608
+            for table in TableName if table not in _NOT_REPLAYED
+        }
+    finally:
+        conn.close()
+
+
+def _run(database: Database, router: Router, minutes: range) -> None:
+    for minute in minutes:
+        _run_update(database, router, minute)
+
+
+@pytest.fixture
+def journaled(tmp_path: Path) -> tuple[Database, Path, Path]:
+    db_path, journal_path = tmp_path / "live.sqlite", tmp_path / "live.journal.sqlite"
+    setup_new_database(db_path)
+    return Database(db_path, EventJournal(journal_path, clock=lambda: 0.0)), db_path, journal_path
+
+
+def _build_network(database: Database) -> None:
+    # 1 -> 2 -> 3 and a slower 1 -> 3
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 10)
+    database.add_transport_route(1, 3, 50)
+    database.add_product("box", 2)
+    database.add_stock(1, 1, 100)
+
+
+def test_replay_rebuilds_the_same_tables(journaled: tuple[Database, Path, Path], tmp_path: Path):
+    database, db_path, journal_path = journaled
+    router = Router()
+    _build_network(database)
+    database.create_transports([(1, 3, [1, 2], {1: 10}), (1, 2, [1], {1: 5})], start_time=0)
+    _run(database, router, range(1, 6))
+    reroute_after_connection_change(
+        database, 2, lambda: database.change_warehouse_connection_transportation_target(2, 100)
+    )
+    with pytest.raises(ValueError, match="more"):
+        database.remove_stock(1, 1, 1000)  # Rolled back, never journaled
+    _run(database, router, range(6, 130))
+    database.remove_stock(3, 1, 3)
+    archive_finished_transports(database, arrived_before=100)
+    database.flush_journal()
+
+    report = replay_journal(journal_path, tmp_path / "replayed.sqlite")
+
+    assert report.events == sum(1 for _ in iter_journal(journal_path))
+    assert _dump(tmp_path / "replayed.sqlite") == _dump(db_path)
+    assert "remove_stock" in {event[2] for event in iter_journal(journal_path)}
+
+
+def test_replay_continues_from_a_snapshot(journaled: tuple[Database, Path, Path], tmp_path: Path):
+    database, db_path, journal_path = journaled
+    router = Router()
+    _build_network(database)
+    database.create_transports([(1, 3, [1, 2], {1: 10})], start_time=0)
+    _run(database, router, range(1, 8))
+
+    position = database.create_snapshot(tmp_path / "snapshot.sqlite")
+    database.create_transports([(1, 3, [3], {1: 20})], start_time=8)
+    _run(database, router, range(8, 70))
+    database.flush_journal()
+
+    report = replay_journal(journal_path, tmp_path / "replayed.sqlite", snapshot_path=tmp_path / "snapshot.sqlite")
+
+    assert position > 0
+    assert report.events == report.last_sequence - position
+    assert _dump(tmp_path / "replayed.sqlite") == _dump(db_path)
+    assert Database(tmp_path / "replayed.sqlite").get_journal_position() == report.last_sequence
+
+
+def test_replay_until_an_event(journaled: tuple[Database, Path, Path], tmp_path: Path):
+    database, _, journal_path = journaled
+    _build_network(database)
+    database.flush_journal()
+
+    report = replay_journal(journal_path, tmp_path / "replayed.sqlite", until=3)
+
+    assert report.events == 3
+    replayed = Database(tmp_path / "replayed.sqlite")
+    assert [row[0] for row in replayed.get_warehouses()] == [1, 2, 3]
+    assert replayed.get_routing_graph() == []
@@ -0,0 +1,40 @@
+from itertools import islice
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.read_cache import ReadCache
+
+
+def test_read_cache_bounds_and_versions():
+    cache = ReadCache(maxsize=2, max_rows=5)
+    cache.put("a", 1, [1, 2], 2)
+    cache.put("b", 1, [3], 1)
+    assert cache.get("a", 1) == [1, 2]  # "b" is the least recently used now
+
+    cache.put("c", 1, [4], 1)
+    assert cache.get("b", 1) is None
+    cache.put("d", 1, [5, 6, 7], 3)  # 2 + 1 + 3 rows, over the row budget
+    assert cache.get("a", 1) is None
+    cache.put("e", 1, list(range(6)), 6)  # Larger than the whole budget, never cached
+    assert cache.get("e", 1) is None
+
+    assert cache.get("d", 2) is None  # A new version empties the cache
+    assert cache.stats().entries == 0
+    assert (cache.stats().evictions, cache.stats().hits) == (2, 1)
+
+
+def test_listings_are_cached_until_any_connection_commits(database: Database, tmp_path: Path):
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 100)
+
+    assert len(list(islice(database.iter_warehouses(), 1))) == 1  # Not exhausted, not cached
+    assert database.get_read_cache_stats().entries == 0
+    first = list(database.iter_warehouses())
+    assert list(database.iter_warehouses()) == first
+    assert database.get_warehouses() == first  # Same query, same entry
+    assert database.get_read_cache_stats().hits == 2
+
+    Database(tmp_path / "test.sqlite").add_warehouse("w4", "test", 100)
+    assert len(list(database.iter_warehouses())) == 4
+    database.remove_warehouse(4)
+    assert len(database.get_warehouses()) == 3
@@ -0,0 +1,33 @@
+from logistics.database.database import Database
+
+
+def _create_dispatched_transport(database: Database) -> int:
+    # 1 -> 2 -> 3 (connections 1, 2) and a slower direct connection 1 -> 3 (connection 3)
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 10)
+    database.add_transport_route(1, 3, 30)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 5)
+    return database.create_transports([(1, 3, [1, 2], {1: 5})], start_time=0)[0]
+
+
+def test_hops_follow_the_stored_plan(database: Database):
+    transport_id = _create_dispatched_transport(database)
+
+    assert [stop[0] for stop in database.get_planned_stops(transport_id)] == [1]
+    assert database.start_next_planned_leg(transport_id, 10)
+    assert database.get_planned_stops(transport_id) == []
+    assert not database.start_next_planned_leg(transport_id, 20)
+
+
+def test_only_plans_using_a_changed_connection_are_invalidated(database: Database):
+    transport_id = _create_dispatched_transport(database)
+
+    database.change_warehouse_connection_transportation_target(3, 5)
+    assert len(database.get_planned_stops(transport_id)) == 1
+
+    database.change_warehouse_connection_transportation_target(2, 50)
+    assert database.get_planned_stops(transport_id) == []
+    assert not database.start_next_planned_leg(transport_id, 10)
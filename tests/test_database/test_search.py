@@ -0,0 +1,38 @@
+import sqlite3
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.setup import migrate_database
+
+
+def test_search_follows_the_tables(database: Database):
+    database.add_warehouse("Central depot", "north/Zürich", 10**6)
+    database.add_warehouse("Harbour", "south/Genova", 10**6)
+    database.add_product("cardboard box", 2)
+    database.add_product("crate", 5)
+
+    assert database.search_warehouses("dep") == [(1, "central depot", "north/zürich")]
+    assert database.search_warehouses("zur") == [(1, "central depot", "north/zürich")]  # Diacritics ignored
+    assert database.search_warehouses("south harb") == [(2, "harbour", "south/genova")]  # Every word must match
+    assert database.search_warehouses("south dep") == []
+    assert [name for _, name, _ in database.search_products("b")] == ["cardboard box"]
+
+    database.change_product_name(1, "pallet")
+    database.remove_product(2)
+    assert database.search_products("box") == []
+    assert database.search_products("crate") == []
+    assert [name for _, name, _ in database.search_products("pal")] == ["pallet"]
+    assert database.search_products("\"*") == []  # No words, no query syntax errors
+
+
+def test_migration_indexes_existing_rows(tmp_path: Path):
+    db_path = tmp_path / "old.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript((Path(__file__).parent / "data" / "schema_v0.sql").read_text(encoding="utf-8"))
+        conn.execute("INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (4, 'depot', 'x', 1)")
+        conn.execute("INSERT INTO products (id, name, barcode, volume_cm) VALUES (9, 'box', 1, 1)")
+    migrate_database(db_path)
+
+    database = Database(db_path)
+    assert database.search_warehouses("dep") == [(4, "depot", "x")]
+    assert [product_id for product_id, _, _ in database.search_products("bo")] == [9]
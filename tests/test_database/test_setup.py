@@ -1,9 +1,50 @@
+import sqlite3
 from importlib import resources as impresources
+from pathlib import Path
 
 from logistics import database
-from logistics.database.setup import EXPECTED_TABLES
+from logistics.database.database import Database
+from logistics.database.setup import (
+    EXPECTED_TABLES,
+    SCHEMA_VERSION,
+    TableName,
+    get_db_status,
+    migrate_database,
+    setup_new_database,
+)
 
 
 def test_code_integrity():
-    schema_script = (impresources.files(database) / "database_schema.sql").read_text(encoding="utf-8")
-    assert schema_script.count("CREATE TABLE") == len(EXPECTED_TABLES)
+    schema_script = (impresources.files(database) / "sql/.database_schema.sql").read_text(encoding="utf-8")
+    tables = schema_script.count("CREATE TABLE") + schema_script.count("CREATE VIRTUAL TABLE")
+    assert tables == len(EXPECTED_TABLES)
+
+
+def test_migrations_reach_schema_version(tmp_path: Path):
+    db_path = tmp_path / "old.sqlite"
+    # Schema of the first release, before any migration existed
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript((Path(__file__).parent / "data" / "schema_v0.sql").read_text(encoding="utf-8"))
+
+    assert migrate_database(db_path) == SCHEMA_VERSION
+    assert migrate_database(db_path) == 0
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        found_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert found_tables >= EXPECTED_TABLES
+
+
+def test_db_status_without_counting_rows(tmp_path: Path):
+    db_path = tmp_path / "test.sqlite"
+    setup_new_database(db_path)
+    status = get_db_status(db_path)
+    assert status.is_healthy
+    assert not status.is_outdated
+    assert not status.has_data
+
+    Database(db_path).add_warehouse("w1", "test", 100)
+    status = get_db_status(db_path)
+    assert status.has_data
+    assert TableName.WAREHOUSES in status.tables_with_data
+    assert status.row_counts == {}
+    assert get_db_status(db_path, count_rows=True).row_counts[TableName.WAREHOUSES] == 1
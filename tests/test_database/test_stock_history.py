@@ -0,0 +1,41 @@
+import random
+
+from logistics.database.database import Database
+from logistics.database.stock_history import (
+    KEYFRAME_EVERY,
+    StockHistoryRecorder,
+    decode_counts,
+    encode_counts,
+    get_stock_history,
+)
+
+
+def test_counts_round_trip():
+    rng = random.Random(3)  # noqa: S311
+    previous: dict[int, int] = {}
+    for _ in range(50):
+        current = {rng.randint(1, 30): rng.randint(1, 10**6) for _ in range(rng.randint(0, 10))}
+        assert decode_counts(previous, encode_counts(previous, current)) == current
+        previous = current
+
+
+def test_history_is_downsampled_from_deltas(database: Database):
+    database.add_warehouse("w1", "test", 10**6)
+    database.add_product("box", 2)
+    recorder = StockHistoryRecorder(interval_minutes=10)
+
+    # One more box every 10 minutes (from 1 box at minute 0), over more than one keyframe period
+    for minute in range(0, 10 * (KEYFRAME_EVERY + 6), 10):
+        database.add_stock(1, 1, 1)
+        assert recorder.maybe_record(database, minute) == 1
+        assert recorder.maybe_record(database, minute + 5) == 0
+
+    samples = get_stock_history(database, 1, start=10 * KEYFRAME_EVERY + 5, end=10 * KEYFRAME_EVERY + 65, step=20)
+
+    # Counts and volume at the end of each 20 minute bucket, the peak within it
+    assert [(s.filled_volume, s.peak_filled_volume, s.product_counts) for s in samples] == [
+        (2 * (KEYFRAME_EVERY + 3), 2 * (KEYFRAME_EVERY + 3), {1: KEYFRAME_EVERY + 3}),
+        (2 * (KEYFRAME_EVERY + 5), 2 * (KEYFRAME_EVERY + 5), {1: KEYFRAME_EVERY + 5}),
+        # The last recorded state is carried to the end of the range
+        (2 * (KEYFRAME_EVERY + 6), 2 * (KEYFRAME_EVERY + 6), {1: KEYFRAME_EVERY + 6}),
+    ]
@@ -0,0 +1,179 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from logistics.database.database import Database
+from logistics.database.topology_import import (
+    ConnectionRecord,
+    WarehouseRecord,
+    import_topology,
+    read_connections_csv,
+    read_geojson,
+    read_warehouses_csv,
+)
+
+
+def _connections(database: Database) -> set[tuple[int, int, int]]:
+    return {(source, target, minutes) for _, source, target, minutes in database.get_routing_graph()}
+
+
+def test_csv_import_resolves_names_and_skips_existing(database: Database, tmp_path: Path):
+    database.add_warehouse("Depot", "north", 100)
+    warehouses_path = tmp_path / "warehouses.csv"
+    warehouses_path.write_text(
+        "name,location,capacity\nHarbour,south,200\nDepot,north,100\nAirport,east,300\nharbour,south,200\n",
+        encoding="utf-8"
+    )
+    connections_path = tmp_path / "connections.csv"
+    connections_path.write_text(
+        "source,target,time,two_way\ndepot,Harbour,30,true\nHarbour,Airport,45,\nAirport,Depot,20,no\n",
+        encoding="utf-8"
+    )
+
+    report = import_topology(
+        database, read_warehouses_csv(warehouses_path), read_connections_csv(connections_path), chunk_size=1
+    )
+    assert (report.warehouses_added, report.warehouses_skipped) == (2, 2)
+    assert (report.connections_added, report.connections_skipped) == (3, 0)  # The two-way connection is one row
+    assert [name for _, name, *_ in database.iter_warehouses()] == ["depot", "harbour", "airport"]
+    assert _connections(database) == {(1, 2, 30), (2, 1, 30), (2, 3, 45), (3, 1, 20)}
+    assert report.connected
+    assert report.components == [[1, 2, 3]]
+
+    # Importing the same files again changes nothing
+    report = import_topology(database, read_warehouses_csv(warehouses_path), read_connections_csv(connections_path))
+    assert (report.warehouses_added, report.connections_added) == (0, 0)
+    assert (report.warehouses_skipped, report.connections_skipped) == (4, 3)
+
+
+def test_geojson_import(database: Database, tmp_path: Path):
+    path = tmp_path / "network.geojson"
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [8.5, 47.4]},
+             "properties": {"name": "Zurich", "capacity": 100}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [8.9, 44.4]},
+             "properties": {"name": "Genova", "location": "Port", "capacity": 200}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [2.3, 48.9]},
+             "properties": {"name": "Paris", "capacity": 300}},
+            {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[8.5, 47.4], [8.9, 44.4]]},
+             "properties": {"source": "Zurich", "target": "Genova", "time": 240, "two_way": True}},
+        ],
+    }), encoding="utf-8")
+
+    report = import_topology(database, *read_geojson(path))
+    assert [row[1:4] for row in database.iter_warehouses()] == [
+        ("zurich", "47.4, 8.5", 100), ("genova", "port", 200), ("paris", "48.9, 2.3", 300)
+    ]
+    assert _connections(database) == {(1, 2, 240), (2, 1, 240)}
+    assert not report.connected
+    assert report.components == [[1, 2], [3]]
+
+
+def test_invalid_records_are_reported(database: Database, tmp_path: Path):
+    path = tmp_path / "warehouses.csv"
+    path.write_text("name,location,capacity\nDepot,north,100\nHarbour,south,lots\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="line 3: 'capacity' must be an integer"):
+        import_topology(database, read_warehouses_csv(path), [], chunk_size=1)
+
+    with pytest.raises(ValueError, match="Unknown warehouse 'Nowhere'"):
+        import_topology(database, [WarehouseRecord("Harbour", "south", 100)], [
+            ConnectionRecord("Harbour", "Depot", 10, False), ConnectionRecord("Harbour", "Nowhere", 10, False)
+        ])
+    # Committed chunks of warehouses are kept, no connection was written before the whole list was resolved
+    assert [name for _, name, *_ in database.iter_warehouses()] == ["depot", "harbour"]
+    assert _connections(database) == set()
+
+
+@pytest.mark.parametrize(("rows", "message"), [
+    ("Depot,north\n", "line 2: 'capacity' must be an integer, not 'None'"),
+    ("Depot,,100\n", "line 2: 'location' is missing"),
+    (",north,100\n", "line 2: 'name' is missing"),
+    ("Depot,north,-5\n", "line 2: 'capacity' must not be negative"),
+])
+def test_malformed_csv_rows_are_reported(database: Database, tmp_path: Path, rows: str, message: str):
+    path = tmp_path / "warehouses.csv"
+    path.write_text("name,location,capacity\n" + rows, encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        import_topology(database, read_warehouses_csv(path), [])
+    assert list(database.iter_warehouses()) == []
+
+
+def test_malformed_csv_connections_are_reported(database: Database, tmp_path: Path):
+    path = tmp_path / "connections.csv"
+    path.write_text("source,target,time,two_way\nA,B,10,\nA,B,0,\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="line 3: 'time' must be at least one minute"):
+        list(read_connections_csv(path))
+
+    path.write_text("source,target,time,two_way\nA,B,10,maybe\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="line 2: 'two_way' must be true or false, not 'maybe'"):
+        list(read_connections_csv(path))
+
+
+def test_geojson_features_without_coordinates(database: Database, tmp_path: Path):
+    path = tmp_path / "network.geojson"
+
+    def write(*features: dict) -> None:
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": list(features)}), encoding="utf-8")
+
+    # Without coordinates a Point needs a location of its own
+    write(
+        {"type": "Feature", "geometry": {"type": "Point"},
+         "properties": {"name": "Depot", "location": "north", "capacity": 10}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": []},
+         "properties": {"name": "Harbour", "capacity": 10}},
+    )
+    with pytest.raises(ValueError, match="feature 1: 'location' is missing"):
+        import_topology(database, *read_geojson(path), chunk_size=1)
+    assert [row[1:3] for row in database.iter_warehouses()] == [("depot", "north")]
+
+    # A LineString without coordinates is still a connection, only its properties matter
+    write({"type": "Feature", "geometry": {"type": "LineString"}, "properties": {"source": "Depot", "time": 5}})
+    with pytest.raises(ValueError, match="feature 0: 'target' is missing"):
+        import_topology(database, *read_geojson(path))
+
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [None]}), encoding="utf-8")
+    with pytest.raises(ValueError, match="the features must be a list of objects"):
+        read_geojson(path)
+    path.write_text(json.dumps({"type": "Feature"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="not a GeoJSON FeatureCollection"):
+        read_geojson(path)
+
+
+def test_unknown_and_ambiguous_warehouse_references(database: Database, tmp_path: Path):
+    database.add_warehouse("Depot", "north", 100)
+    path = tmp_path / "connections.csv"
+    path.write_text("source,target,time,two_way\nNowhere,Depot,10,\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Unknown warehouse 'Nowhere'"):
+        import_topology(database, [], read_connections_csv(path))
+
+    with pytest.raises(ValueError, match="Connection from 'depot' to itself"):
+        import_topology(database, [], [ConnectionRecord("depot", "Depot", 10, False)])
+
+    # Names already used by several warehouses cannot be resolved
+    database.add_warehouse("Depot", "south", 100)
+    with pytest.raises(ValueError, match="Several warehouses are named 'Depot'"):
+        import_topology(database, [WarehouseRecord("Harbour", "east", 10)], [
+            ConnectionRecord("Harbour", "Depot", 10, False)
+        ])
+    assert _connections(database) == set()
+
+
+def test_renamed_warehouses_are_matched_in_any_case(database: Database):
+    database.add_warehouse("Depot", "north", 100)
+    database.add_warehouse("Harbour", "south", 100)
+    database.change_warehouse_name(1, "DePot")
+
+    report = import_topology(
+        database, [WarehouseRecord("Depot", "north", 100)], [ConnectionRecord("depot", "Harbour", 10, False)]
+    )
+    assert (report.warehouses_added, report.warehouses_skipped) == (0, 1)
+    assert [name for _, name, *_ in database.iter_warehouses()] == ["DePot", "harbour"]
+    assert _connections(database) == {(1, 2, 10)}
+
+    # Names differing only in case are ambiguous
+    database.change_warehouse_name(2, "depot")
+    with pytest.raises(ValueError, match="Several warehouses are named 'Depot'"):
+        import_topology(database, [], [ConnectionRecord("Depot", "Harbour", 10, False)])
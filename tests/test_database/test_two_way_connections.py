@@ -0,0 +1,99 @@
+import sqlite3
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.database.setup import migrate_database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+
+def test_transport_travels_back_along_a_two_way_connection(database: Database):
+    # 3 -> 2 -> 1 only exists as the way back of the two-way connections 1 <-> 2 and 2 <-> 3
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10, two_way=True)
+    database.add_transport_route(2, 3, 20, two_way=True)
+    assert sorted(database.get_routing_graph()) == [(-2, 3, 2, 20), (-1, 2, 1, 10), (1, 1, 2, 10), (2, 2, 3, 20)]
+
+    database.add_product("box", 1)
+    database.add_stock(3, 1, 5)
+    router = Router()
+    router.refresh(database)
+    path = router.find_path(3, 1)
+    assert path.connection_ids == [-2, -1]
+    transport_id = database.create_transports([(3, 1, path.connection_ids, {1: 5})], start_time=0)[0]
+
+    assert database.get_transport_etas(transport_id) == [(transport_id, 2, 20, 1, 30)]
+    assert [(stop[1], stop[4]) for stop in database.get_planned_stops(transport_id)] == [(2, 1)]
+    assert database.get_active_transport_details(transport_id)[0][8:10] == (3, 2)
+
+    _run_update(database, router, 20)
+    _run_update(database, router, 30)
+    _, stops, _ = database.get_finished_transport_details(transport_id)
+    assert [(stop[1], stop[4], stop[7], stop[8]) for stop in stops] == [(3, 2, 0, 20), (2, 1, 20, 30)]
+    assert database.get_stock(1) == [(1, 5)]
+
+    # Archived legs keep their direction
+    assert database.archive_finished_transports(arrived_before=100, limit=10) == 1
+    _, stops, _ = database.get_finished_transport_details(transport_id)
+    assert [(stop[1], stop[4]) for stop in stops] == [(3, 2), (2, 1)]
+
+
+def test_one_way_again_drops_the_plans_on_the_way_back(database: Database):
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10, two_way=True)
+    database.add_transport_route(3, 2, 10)
+    database.add_product("box", 1)
+    database.add_stock(3, 1, 5)
+    transport_id = database.create_transports([(3, 1, [2, -1], {1: 5})], start_time=0)[0]
+
+    database.change_warehouse_connection_two_way(1, True)  # No change, nothing is dropped
+    assert len(database.get_planned_stops(transport_id)) == 1
+    database.change_warehouse_connection_two_way(1, False)
+    assert database.get_planned_stops(transport_id) == []
+    assert (-1, 2, 1, 10) not in database.get_routing_graph()
+
+
+def test_one_way_again_keeps_the_plans_in_the_forward_direction(database: Database):
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(3, 1, 10)
+    database.add_transport_route(1, 2, 10, two_way=True)
+    database.add_product("box", 1)
+    database.add_stock(3, 1, 5)
+    transport_id = database.create_transports([(3, 2, [1, 2], {1: 5})], start_time=0)[0]
+
+    database.change_warehouse_connection_two_way(2, False)
+    assert [(stop[1], stop[4]) for stop in database.get_planned_stops(transport_id)] == [(1, 2)]
+
+
+def test_migration_merges_opposite_connections(tmp_path: Path):
+    db_path = tmp_path / "old.sqlite"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript((Path(__file__).parent / "data" / "schema_v0.sql").read_text(encoding="utf-8"))
+        conn.executemany(
+            "INSERT INTO warehouses (id, name, location, capacity_volume_cm) VALUES (?, ?, 'x', 1000)",
+            [(i, f"w{i}") for i in range(1, 4)]
+        )
+        conn.executemany(
+            "INSERT INTO connections (id, source_warehouse_id, target_warehouse_id, transportation_time_minutes) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (1, 1, 2, 10), (2, 2, 1, 10),  # Merged
+                (3, 2, 3, 10), (4, 3, 2, 15),  # Different times, two one-way connections
+                (5, 1, 2, 10),  # A parallel duplicate without a way back of its own
+            ]
+        )
+        conn.execute("INSERT INTO transports (id, source_warehouse_id, target_warehouse_id) VALUES (1, 2, 1)")
+        conn.execute(
+            "INSERT INTO transport_routes (transport_id, connection_id, start_timestamp) VALUES (1, 2, 0)"
+        )
+    migrate_database(db_path)
+
+    database = Database(db_path)
+    assert sorted(database.get_routing_graph()) == [
+        (-1, 2, 1, 10), (1, 1, 2, 10), (3, 2, 3, 10), (4, 3, 2, 15), (5, 1, 2, 10)
+    ]
+    # The leg on the dropped connection now travels the kept one backwards
+    assert database.get_due_arrivals(10) == [(1, 1, 1, 1, None, None)]
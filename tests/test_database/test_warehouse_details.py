@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from logistics.database.database import Database
+
+
+def _create_network(database: Database) -> int:
+    # 1 -> 11 -> 12, ids above 9 to catch parameters split into digits
+    for i in range(1, 13):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 11, 10)
+    database.add_transport_route(11, 12, 10)
+    database.add_product("box", 2)
+    database.add_stock(1, 1, 10)
+    return database.create_transports([(1, 12, [1, 2], {1: 4})], start_time=0)[0]
+
+
+def test_warehouse_details_sections(database: Database):
+    transport_id = _create_network(database)
+
+    warehouse, stock, incoming, outgoing, passing = database.get_warehouse_details(12)
+    assert warehouse == (12, "w12", "test", 10**6, 0, 8)
+    assert (stock, outgoing, passing) == ([], [], [])
+    assert incoming == [(transport_id, 1, "w1", "test")]
+
+    _, stock, _, outgoing, _ = database.get_warehouse_details(1)
+    assert stock == [(1, "box", stock[0][2], 6, 12)]
+    assert outgoing == [(transport_id, 12, "w12", "test")]
+
+    assert database.get_warehouse_details(11)[4] == [(transport_id, 1, "w1", "test", 12, "w12", "test")]
+
+
+def test_warehouse_details_cache_follows_every_connection(database: Database, tmp_path: Path):
+    _create_network(database)
+    details = database.get_warehouse_details(1)
+    assert database.get_warehouse_details(1) is details
+
+    database.add_stock(1, 1, 1)
+    assert database.get_warehouse_details(1)[1][0][3] == 7
+
+    Database(tmp_path / "test.sqlite").add_stock(1, 1, 1)
+    assert database.get_warehouse_details(1)[1][0][3] == 8
+
+
+def test_warehouse_details_inside_a_running_transaction(database: Database):
+    _create_network(database)
+    database._cursor.execute("UPDATE stock SET count = 9 WHERE warehouse_id = 1")  # Not committed yet
+
+    # The reads join the transaction instead of failing on a nested BEGIN, and do not roll it back
+    assert database.get_warehouse_details(1)[1][0][3] == 9
+    assert database._conn.in_transaction
+    database._conn.commit()
+    assert database.get_stock(1) == [(1, 9)]
@@ -0,0 +1,73 @@
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+import pytest
+
+from logistics import io_utils
+from logistics.io_utils import print_table, print_table_paged
+
+
+def test_print_table_paged_is_lazy(monkeypatch: pytest.MonkeyPatch):
+    consumed = 0
+
+    def rows() -> Iterator[tuple[int, str]]:
+        nonlocal consumed
+        for i in range(10_000):
+            consumed += 1
+            yield i, f"row {i}"
+
+    # Stop after the first page, only the page and its look-ahead may have been pulled from the generator
+    monkeypatch.setattr(io_utils, "get_input", lambda **_: "q")
+    printed = print_table_paged(rows(), ("ID", "NAME"), page_size=10)
+
+    assert printed == 10
+    assert consumed == 20
+
+
+def test_print_table_paged_widens_columns(capsys: pytest.CaptureFixture[str]):
+    rows = [(1, "a"), (2, "b"), (3, "a much longer value")]
+    printed = print_table_paged(rows, ("ID", "NAME"), page_size=2, interactive=False)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert printed == 3
+    # Header + divider, 2 rows, header + divider reprinted for the wider page, 1 row
+    assert len(lines) == 7
+    assert "a much longer value" in lines[-1]
+
+
+def test_print_table_paged_keeps_the_header_for_narrower_pages(capsys: pytest.CaptureFixture[str]):
+    rows = [(1, "a much longer value"), (2, "b"), (3, "a")]
+    printed = print_table_paged(rows, ("ID", "NAME"), page_size=2, interactive=False)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert printed == 3
+    # Header + divider, 2 rows, the narrower page keeps the widths and the header
+    assert len(lines) == 5
+    assert len(lines[-1]) == len(lines[2])
+
+
+def test_print_table_header_mismatch():
+    with pytest.raises(ValueError, match="number of columns"):
+        print_table([(1, 2)], ("ONLY ONE",))
+
+
+def test_ask_for_date_reads_utc_and_includes_the_end_day(monkeypatch: pytest.MonkeyPatch):
+    answers = iter(["2024-03-05", "2024-03-05", "2024-03-05 12:30", "2024-03-05T12:30+02:00"])
+    monkeypatch.setattr(io_utils, "get_input", lambda **_: next(answers))
+
+    assert io_utils.ask_for_date("Start") == datetime(2024, 3, 5, tzinfo=UTC)
+    assert io_utils.ask_for_date("End", end_of_day=True) == datetime(2024, 3, 6, tzinfo=UTC)
+    # An explicit time is taken as it is
+    assert io_utils.ask_for_date("End", end_of_day=True) == datetime(2024, 3, 5, 12, 30, tzinfo=UTC)
+    assert io_utils.ask_for_date("Start") == datetime(2024, 3, 5, 10, 30, tzinfo=UTC)
+
+
+def test_ask_for_int_looks_up_names(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]):
+    answers = iter(["dep", "nothing", "3"])
+    monkeypatch.setattr(io_utils, "get_input", lambda **_: next(answers))
+    lookup = io_utils.Lookup(lambda text: [(3, "depot")] if text == "dep" else [], ("ID", "NAME"))
+
+    assert io_utils.ask_for_int("Provide the warehouse ID", lookup=lookup) == 3
+    output = capsys.readouterr().out
+    assert "depot" in output
+    assert "Nothing matches" in output
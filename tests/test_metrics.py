@@ -0,0 +1,75 @@
+from logistics import metrics
+from logistics.database.database import Database
+from logistics.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.routing.router import Router
+
+
+def test_prometheus_exposition():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_total", "A counter"))
+    gauge = registry.register(Gauge("test_gauge", "A gauge"))
+    histogram = registry.register(Histogram("test_seconds", "A histogram", (0.1, 1), label="operation"))
+    counter.inc(3)
+    gauge.set_function(lambda: 2.5)
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value, "read")
+
+    assert registry.expose().splitlines() == [
+        "# HELP test_total A counter",
+        "# TYPE test_total counter",
+        "test_total 3",
+        "# HELP test_gauge A gauge",
+        "# TYPE test_gauge gauge",
+        "test_gauge 2.5",
+        "# HELP test_seconds A histogram",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{operation="read",le="0.1"} 2',
+        'test_seconds_bucket{operation="read",le="1"} 3',
+        'test_seconds_bucket{operation="read",le="+Inf"} 4',
+        'test_seconds_sum{operation="read"} 5.65',
+        'test_seconds_count{operation="read"} 4',
+    ]
+    assert histogram.quantile(0.5, "read") == 0.1
+    assert [row[:2] for row in registry.summary()] == [("test_total", ""), ("test_gauge", ""), ("test_seconds", "read")]
+
+
+def test_database_and_event_loop_are_instrumented(database: Database):
+    sql_before = metrics.SQL_SECONDS.snapshot().get("add_warehouse", ([0], 0))[0][-1]
+    dispatches, arrivals, unloads = metrics.DISPATCHES.value, metrics.ARRIVALS.value, metrics.UNLOADS.value
+
+    database.add_warehouse("a", "test", 1000)
+    database.add_warehouse("b", "test", 1000)
+    database.add_transport_route(1, 2, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 10)
+    database.create_transports([(1, 2, [1], {1: 1}), (1, 2, [1], {1: 1})], start_time=0)
+    _run_update(database, Router(), 10)
+
+    assert metrics.SQL_SECONDS.snapshot()["add_warehouse"][0][-1] == sql_before + 2
+    assert metrics.DISPATCHES.value == dispatches + 2
+    assert metrics.ARRIVALS.value == arrivals + 2
+    assert metrics.UNLOADS.value == unloads + 2
+    assert "iter_warehouses" not in metrics.SQL_SECONDS.snapshot()
+
+
+def test_inner_calls_are_part_of_the_outer_operation(database: Database):
+    database.add_warehouse("a", "test", 1000)
+    database.add_warehouse("b", "test", 1000)
+    database.add_transport_route(1, 2, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 10)
+
+    def count(operation: str) -> int:
+        return metrics.SQL_SECONDS.snapshot().get(operation, ([0], 0))[0][-1]
+
+    graph_version = database.get_routing_graph_version()
+    versions, dispatches = count("get_routing_graph_version"), count("dispatch_transports")
+    arrivals = metrics.ARRIVALS.value
+    database.dispatch_transports([(1, 2, [1], {1: 1})], start_time=0, graph_version=graph_version)
+    # The version check of the dispatch is not an operation of its own
+    assert (count("get_routing_graph_version"), count("dispatch_transports")) == (versions, dispatches + 1)
+
+    # Arrivals are counted by the database, whoever applies them
+    database.apply_arrivals(10, [(1, 1, 2, 2, None, [])])
+    assert metrics.ARRIVALS.value == arrivals + 1
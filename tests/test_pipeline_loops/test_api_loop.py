@@ -0,0 +1,80 @@
+import http.client
+import json
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from logistics.database.database import Database
+from logistics.pipeline_loops.api_loop import ApiServer
+
+
+@pytest.fixture
+def server(database: Database, tmp_path: Path) -> Iterator[ApiServer]:
+    server = ApiServer(tmp_path / "test.sqlite", 0, 2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server: ApiServer, path: str, etag: str | None = None) -> tuple[int, str | None, object]:
+    conn = http.client.HTTPConnection(*server.server_address)
+    try:
+        conn.request("GET", path, headers={"If-None-Match": etag} if etag is not None else {})
+        response = conn.getresponse()
+        body = response.read()
+        return response.status, response.getheader("ETag"), json.loads(body) if len(body) > 0 else None
+    finally:
+        conn.close()
+
+
+def test_etag_follows_the_data_version(database: Database, server: ApiServer):
+    database.add_warehouse("depot", "north", 1000)
+    status, etag, warehouses = _get(server, "/warehouses")
+    assert status == 200
+    assert [warehouse["name"] for warehouse in warehouses] == ["depot"]
+    assert _get(server, "/warehouses", etag) == (304, etag, None)
+
+    database.add_warehouse("harbour", "south", 1000)
+    status, new_etag, warehouses = _get(server, "/warehouses", etag)
+    assert status == 200
+    assert new_etag != etag
+    assert len(warehouses) == 2
+
+
+def test_endpoints(database: Database, server: ApiServer):
+    for name in ("a", "b", "c"):
+        database.add_warehouse(name, "test", 1000)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 20)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 10)
+    database.create_transports([(1, 3, [1, 2], {1: 4})], start_time=100)
+
+    status, _, details = _get(server, "/warehouses/1")
+    assert status == 200
+    assert details["stock"][0]["count"] == 6
+    assert details["outgoing_transports"] == [{"id": 1, "target": {"id": 3, "name": "c", "location": "test"}}]
+
+    _, _, active = _get(server, "/transports/active")
+    assert [(transport["id"], transport["next_stop"]["id"]) for transport in active] == [(1, 2)]
+    _, _, eta = _get(server, "/transports/1/eta")
+    assert eta["next_stop_eta"] == Database.from_db_time(110).isoformat()
+    assert eta["target_eta"] == Database.from_db_time(130).isoformat()
+    assert _get(server, "/transports/etas")[2] == [eta]
+
+    _, _, distribution = _get(server, "/products/1/distribution")
+    assert distribution["total_in_stock"] == 6
+    assert distribution["in_transit"] == 4
+
+    _, _, finished = _get(server, "/transports/finished?limit=10")
+    assert finished == {"transports": [], "next": None}
+
+    assert _get(server, "/warehouses/9")[0] == 404
+    assert _get(server, "/transports/9/eta")[0] == 404
+    assert _get(server, "/nothing")[0] == 404
+    assert _get(server, "/transports/finished?limit=0")[0] == 400
+    assert _get(server, "/transports/finished?before=x")[0] == 400
@@ -0,0 +1,6 @@
+from logistics.pipeline_loops.console_loop import COMMAND_HANDLER_MAP, get_task_handler
+
+
+def test_every_task_handler_resolves():
+    for task in COMMAND_HANDLER_MAP:
+        assert callable(get_task_handler(task)), task
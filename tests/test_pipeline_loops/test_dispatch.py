@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from logistics.database.database import Database, StaleGraphError
+from logistics.pipeline_loops.dispatch import dispatch_transports
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.router import Router
+
+
+def _network(database: Database, target_capacity: int = 10**6) -> None:
+    # 1 -> 2 -> 3, box of 10 cm^3
+    database.add_warehouse("w1", "test", 10**6)
+    database.add_warehouse("w2", "test", 10**6)
+    database.add_warehouse("w3", "test", target_capacity)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 3, 20)
+    database.add_product("box", 10)
+    database.add_stock(1, 1, 5)
+
+
+def test_dispatch_starts_the_first_leg_and_wakes_the_event_loop(database: Database):
+    _network(database)
+    clock = VirtualClock()
+    clock.set_scale(0)
+    woken = threading.Event()
+    waiter = threading.Thread(target=lambda: woken.set() if not clock.wait_until(None) else None)
+    waiter.start()
+
+    transport_id = dispatch_transports(database, Router(), clock, [(1, 3, {1: 3})])[0]
+    waiter.join(timeout=5)
+    assert woken.is_set()
+
+    minute = int(clock.get_time() // 60)
+    assert database.get_stock(1) == [(1, 2)]
+    assert database.get_cargo(transport_id) == [(1, 3)]
+    assert database.get_next_arrival_minute() == minute + 10
+    assert [stop[4] for stop in database.get_planned_stops(transport_id)] == [3]
+    assert next(row[5] for row in database.iter_warehouses() if row[0] == 3) == 30  # Reserved
+
+
+def test_nothing_is_written_without_stock_room_or_route(database: Database):
+    _network(database, target_capacity=45)
+    database.add_stock(3, 1, 1)
+    router, clock = Router(), VirtualClock()
+
+    dispatch_transports(database, router, clock, [(1, 3, {1: 2})])  # 10 + 20 of 45 cm^3
+    with pytest.raises(ValueError, match="capacity"):
+        dispatch_transports(database, router, clock, [(1, 2, {1: 1}), (1, 3, {1: 2})])
+    with pytest.raises(ValueError, match="does not hold"):
+        dispatch_transports(database, router, clock, [(1, 2, {1: 4})])
+    with pytest.raises(ValueError, match="No route"):
+        dispatch_transports(database, router, clock, [(3, 1, {1: 1})])
+    assert database.get_stock(1) == [(1, 3)]
+    assert database.count_in_flight_transports() == 1
+
+
+def test_routes_of_an_old_graph_are_rejected(database: Database):
+    _network(database)
+    version = database.get_routing_graph_version()
+    database.add_transport_route(1, 3, 5)
+    with pytest.raises(StaleGraphError):
+        database.dispatch_transports([(1, 3, [1, 2], {1: 1})], 0, version)
+    assert database.count_in_flight_transports() == 0
+
+    # The router is refreshed, the new connection is taken
+    transport_id = dispatch_transports(database, Router(), VirtualClock(), [(1, 3, {1: 1})])[0]
+    assert database.get_planned_stops(transport_id) == []
@@ -0,0 +1,53 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from logistics.database.database import Database
+from logistics.database.setup import setup_new_database
+from logistics.database.stock_history import StockHistoryRecorder
+from logistics.pipeline_loops import event_loop
+from logistics.pipeline_loops.dispatch import dispatch_transports
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+from logistics.routing.router import Router
+
+
+def test_dispatch_between_the_due_query_and_the_wait_wakes_the_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    db_path = tmp_path / "test.sqlite"
+    setup_new_database(db_path)
+    database = Database(db_path)
+    database.add_warehouse("w1", "test", 10**6)
+    database.add_warehouse("w2", "test", 10**6)
+    database.add_transport_route(1, 2, 1)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 5)
+
+    clock = VirtualClock()
+    clock.set_scale(0)
+    next_due_minute = event_loop._next_due_minute
+    dispatched = threading.Event()
+
+    def dispatch_after_the_query(*args: object) -> int | None:
+        due_minute = next_due_minute(*args)
+        if not dispatched.is_set():
+            # Nothing was due when the loop looked, the console dispatches and notifies before the loop waits
+            clock.set_scale(60_000)
+            console = threading.Thread(
+                target=lambda: dispatch_transports(Database(db_path), Router(), clock, [(1, 2, {1: 5})])
+            )
+            console.start()
+            console.join()
+            dispatched.set()
+        return due_minute
+
+    monkeypatch.setattr(event_loop, "_next_due_minute", dispatch_after_the_query)
+    thread = threading.Thread(
+        target=event_loop.run_event_loop, args=(db_path, clock, Router(), StockHistoryRecorder(0)), daemon=True
+    )
+    thread.start()
+
+    deadline = time.monotonic() + 5
+    while database.get_stock(2) == [] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert database.get_stock(2) == [(1, 5)]
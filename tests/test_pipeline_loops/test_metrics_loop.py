@@ -0,0 +1,28 @@
+import http.client
+import threading
+
+from logistics.metrics import Counter, MetricsRegistry
+from logistics.pipeline_loops.metrics_loop import CONTENT_TYPE, MetricsServer
+
+
+def test_metrics_endpoint():
+    registry = MetricsRegistry()
+    registry.register(Counter("test_total", "A counter")).inc()
+    server = MetricsServer(0, registry)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address)
+        conn.request("GET", "/metrics")
+        response = conn.getresponse()
+        assert response.status == 200
+        assert response.getheader("Content-Type") == CONTENT_TYPE
+        assert response.read().decode() == registry.expose()
+        conn.close()
+
+        conn = http.client.HTTPConnection(*server.server_address)
+        conn.request("GET", "/")
+        assert conn.getresponse().status == 404
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,73 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from logistics.database.database import Database
+from logistics.pipeline_loops.event_loop import _run_update
+from logistics.pipeline_loops.sharding import ShardedArrivalProcessor, ShardingMethod, partition_warehouses
+from logistics.routing.router import Router
+
+
+def _create_two_regions(database: Database) -> None:
+    # Two rings of 6 warehouses (fast connections), joined both ways by a slow bridge between 1 and 7
+    for i in range(1, 13):
+        database.add_warehouse(f"w{i}", f"{'north' if i <= 6 else 'south'}/site {i}", 10**6)
+    for offset in (0, 6):
+        for i in range(1, 7):
+            database.add_transport_route(offset + i, offset + i % 6 + 1, 5 + i)
+            database.add_transport_route(offset + i % 6 + 1, offset + i, 5 + i)
+    database.add_transport_route(1, 7, 60)
+    database.add_transport_route(7, 1, 60)
+    database.add_product("box", 1)
+    for i in range(1, 13):
+        database.add_stock(i, 1, 100)
+
+
+def _dump(database: Database) -> dict[str, list[tuple]]:
+    return {
+        table: database._cursor.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()  # noqa: S608
+        for table in ("transports", "transport_routes", "stock", "transport_route_plans", "transport_route_plan_steps")
+    }
+
+
+def _run_until_idle(database: Database, update: Callable[[int], object]) -> None:
+    while (minute := database.get_next_arrival_minute()) is not None:
+        update(minute)
+
+
+def test_partitions_keep_regions_together(database: Database):
+    _create_two_regions(database)
+    warehouses = [(warehouse[0], warehouse[2]) for warehouse in database.get_warehouses()]
+    connections = database.get_routing_graph()
+
+    regions = [list(range(1, 7)), list(range(7, 13))]
+    assert partition_warehouses(warehouses, connections, 2, ShardingMethod.LOCATION) == regions
+    assert partition_warehouses(warehouses, connections, 2, ShardingMethod.CLUSTERING) == regions
+    shards = partition_warehouses(warehouses, connections, 4, ShardingMethod.CLUSTERING)
+    assert sorted(len(shard) for shard in shards) == [3, 3, 3, 3]
+
+
+def test_sharded_processing_matches_single_threaded(database: Database, tmp_path: Path):
+    _create_two_regions(database)
+    connections = {(source, target): connection_id for connection_id, source, target, _ in database.get_routing_graph()}
+    # Planned across the bridge, and a plan of the first leg only (routed again at every stop) in both regions
+    database.create_transports([
+        (3, 10, [connections[3, 2], connections[2, 1], connections[1, 7], connections[7, 8]], {1: 5}),
+        (2, 11, [connections[2, 1]], {1: 7}),
+        (9, 4, [connections[9, 8]], {1: 3}),
+        (5, 6, [connections[5, 6]], {1: 1}),
+    ], start_time=0)
+    database.create_snapshot(tmp_path / "sharded.sqlite")
+
+    router = Router()
+    _run_until_idle(database, lambda minute: _run_update(database, router, minute))
+
+    sharded = Database(tmp_path / "sharded.sqlite")
+    processor = ShardedArrivalProcessor(tmp_path / "sharded.sqlite", 2, ShardingMethod.LOCATION)
+    try:
+        _run_until_idle(sharded, lambda minute: processor.process(sharded, router, minute))
+    finally:
+        processor.close()
+
+    assert _dump(sharded) == _dump(database)
+    assert all(transport[-1] is not None for transport in _dump(sharded)["transports"])
+    assert processor.stats.handoffs == 3  # The bridge: twice north to south, once back
@@ -0,0 +1,57 @@
+import threading
+import time
+from collections.abc import Callable
+
+from logistics.pipeline_loops.virtual_clock import VirtualClock
+
+
+def _in_background(seconds: float, action: Callable[[], None]) -> threading.Timer:
+    timer = threading.Timer(seconds, action)
+    timer.start()
+    return timer
+
+
+def test_wait_until_reaches_the_time():
+    clock = VirtualClock()
+    clock.set_scale(1000)
+    target = clock.get_time() + 60  # 60 ms of real time
+
+    start = time.monotonic()
+    assert clock.wait_until(target)
+    assert clock.get_time() >= target
+    assert time.monotonic() - start < 1
+
+
+def test_stopped_clock_only_wakes_up_when_notified():
+    clock = VirtualClock()
+    clock.set_scale(0)
+    now = clock.get_time()
+    time.sleep(0.01)
+    assert clock.get_time() == now
+
+    for action in (clock.notify, lambda: clock.set_scale(1)):
+        timer = _in_background(0.05, action)
+        start = time.monotonic()
+        assert not clock.wait_until(now + 3600)
+        assert time.monotonic() - start < 1
+        timer.join()
+        clock.set_scale(0)
+
+
+def test_jump_past_the_target_reaches_it():
+    clock = VirtualClock()
+    target = clock.get_time() + 3600
+    timer = _in_background(0.05, lambda: clock.jump(7200))
+    assert clock.wait_until(target)
+    timer.join()
+
+
+def test_notification_before_the_wait_is_not_lost():
+    clock = VirtualClock()
+    clock.set_scale(0)
+    generation = clock.generation()
+    clock.notify()  # While the caller was still computing what to wait for
+
+    start = time.monotonic()
+    assert not clock.wait_until(None, generation)
+    assert time.monotonic() - start < 1
@@ -0,0 +1,51 @@
+import random
+
+from logistics.routing.contraction import ContractionHierarchy, build_contraction_hierarchy, find_path_ch
+from logistics.routing.graph import CSRGraph, find_path
+
+
+def test_contraction_hierarchy_matches_dijkstra():
+    rng = random.Random(2)  # noqa: S311
+    connections = []
+    for source in range(1, 151):
+        for _ in range(3):
+            target = rng.randint(1, 150)
+            if target != source:
+                connections.append((len(connections) + 1, source, target, rng.randint(1, 100)))
+    graph = CSRGraph.from_connections(connections)
+    costs = {conn_id: cost for conn_id, _, _, cost in connections}
+    ends = {conn_id: (src, tgt) for conn_id, src, tgt, _ in connections}
+
+    hierarchy = build_contraction_hierarchy(connections, graph_version=0)
+    # The stored form has to answer exactly the same
+    restored = ContractionHierarchy.from_blobs(0, *hierarchy.to_blobs())
+
+    for _ in range(100):
+        source, target = rng.randint(1, 150), rng.randint(1, 150)
+        expected = find_path(graph, source, target)
+        for result in (find_path_ch(hierarchy, source, target), find_path_ch(restored, source, target)):
+            if expected is None:
+                assert result is None
+            else:
+                assert result.cost == expected.cost
+                # The unpacked connections have to add up to the reported distance
+                assert sum(costs[conn_id] for conn_id in result.connection_ids) == result.cost
+                node = source
+                for conn_id in result.connection_ids:
+                    assert ends[conn_id][0] == node
+                    node = ends[conn_id][1]
+                assert node == target
+
+
+def test_contraction_hierarchy_unpacks_the_way_back_of_connection_1():
+    # 1 <-> 2 <-> 3 as two-way connections 1 and 2, the way back of connection 1 has the id -1
+    connections = [(1, 1, 2, 10), (-1, 2, 1, 10), (2, 2, 3, 20), (-2, 3, 2, 20)]
+    graph = CSRGraph.from_connections(connections)
+    hierarchy = build_contraction_hierarchy(connections, graph_version=0)
+    restored = ContractionHierarchy.from_blobs(0, *hierarchy.to_blobs())
+    for source, target in ((3, 1), (1, 3), (2, 1)):
+        expected = find_path(graph, source, target)
+        for result in (find_path_ch(hierarchy, source, target), find_path_ch(restored, source, target)):
+            assert result.connection_ids == expected.connection_ids
+            assert result.cost == expected.cost
+    assert find_path_ch(hierarchy, 3, 1).connection_ids == [-2, -1]
@@ -0,0 +1,12 @@
+from logistics.routing.graph import CSRGraph, strongly_connected_components
+
+
+def test_strongly_connected_components():
+    # A cycle 1 -> 2 -> 3 -> 1, a one-way link to the pair 4 <-> 5 and a long chain from 5
+    connections = [(1, 1, 2, 1), (2, 2, 3, 1), (3, 3, 1, 1), (4, 3, 4, 1), (5, 4, 5, 1), (6, 5, 4, 1)]
+    connections += [(7 + i, 5 + i, 6 + i, 1) for i in range(5000)]
+
+    components = strongly_connected_components(CSRGraph.from_connections(connections))
+    assert components[:2] == [[1, 2, 3], [4, 5]]
+    assert len(components) == 2 + 5000
+    assert all(len(component) == 1 for component in components[2:])
@@ -0,0 +1,28 @@
+import random
+
+from logistics.routing.graph import CSRGraph, find_path
+from logistics.routing.landmarks import build_landmark_index, find_path_alt
+
+
+def test_alt_matches_dijkstra():
+    rng = random.Random(1)  # noqa: S311
+    connections = []
+    for source in range(1, 201):
+        for _ in range(3):
+            target = rng.randint(1, 200)
+            if target != source:
+                connections.append((len(connections) + 1, source, target, rng.randint(1, 100)))
+    graph = CSRGraph.from_connections(connections)
+    index = build_landmark_index(
+        graph, CSRGraph.from_connections(connections, reverse=True), graph_version=0, count=4
+    )
+
+    for _ in range(100):
+        source, target = rng.randint(1, 200), rng.randint(1, 200)
+        expected = find_path(graph, source, target)
+        result = find_path_alt(graph, index, source, target)
+        if expected is None:
+            assert result is None
+        else:
+            assert result.cost == expected.cost
+            assert result.nodes_expanded <= expected.nodes_expanded + 1
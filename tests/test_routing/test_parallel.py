@@ -0,0 +1,37 @@
+import pickle
+
+from logistics.database.database import Database
+from logistics.routing.parallel import RoutingPool
+from logistics.routing.router import Router
+
+
+def test_routing_pool_matches_in_process_routing(database: Database):
+    # Ring 1 -> 2 -> ... -> 6 -> 1 with a shortcut 1 -> 4
+    for i in range(1, 7):
+        database.add_warehouse(f"w{i}", "test", 100)
+    for i in range(1, 7):
+        database.add_transport_route(i, i % 6 + 1, i)
+    database.add_transport_route(1, 4, 2)
+    router = Router()
+    router.refresh(database)
+
+    graph = pickle.loads(pickle.dumps(router.graph))  # noqa: S301 - Our own data
+    assert (list(graph.node_ids), list(graph.connection_ids)) == (
+        list(router.graph.node_ids), list(router.graph.connection_ids)
+    )
+
+    requests = [(source, target) for source in range(1, 7) for target in range(1, 7)] + [(1, 99)]
+    expected = [router.find_path(source, target) for source, target in requests]
+    pool = RoutingPool(2, min_batch=8)
+    try:
+        assert pool.find_paths(router, requests[:4]) == expected[:4]
+        assert pool.parallel_batches == 0  # Too small, answered in-process
+        assert pool.find_paths(router, requests) == expected
+
+        # A new graph version restarts the workers with the new graph
+        database.add_transport_route(1, 6, 1)
+        router.refresh(database)
+        assert pool.find_paths(router, requests)[5].connection_ids == [8]
+        assert pool.parallel_batches == 2
+    finally:
+        pool.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from logistics.database.database import Database
+from logistics.routing.planner import Demand, plan_transports
+
+
+def _create_line_network(database: Database) -> None:
+    # 1 <-> 2 <-> 3, the product is stocked at both ends
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 1, 10)
+    database.add_transport_route(2, 3, 15)
+    database.add_transport_route(3, 2, 15)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 5)
+    database.add_stock(3, 1, 5)
+
+
+def test_plan_transports_takes_from_nearest_source(database: Database):
+    _create_line_network(database)
+
+    report = plan_transports(database, [Demand(1, 3, 2), Demand(1, 4, 2)], start_time=0)
+
+    # 5 units from warehouse 1 (10 min away), the remaining 2 from warehouse 3 (15 min away)
+    assert len(report.transport_ids) == 2
+    assert report.shipped_units == 7
+    assert report.total_transit_minutes == 25
+    assert report.unfulfilled == []
+    assert database.get_stock(1) == []
+    assert database.get_stock(3) == [(1, 3)]
+
+
+def test_plan_transports_reports_missing_stock(database: Database):
+    _create_line_network(database)
+
+    report = plan_transports(database, [Demand(1, 12, 2)], start_time=0)
+
+    assert report.shipped_units == 10
+    assert report.unfulfilled == [Demand(1, 2, 2)]
+
+
+def test_plan_transports_checks_the_capacity(database: Database):
+    _create_line_network(database)
+    database.add_warehouse("small", "test", 3)
+    database.add_transport_route(1, 4, 5)
+
+    with pytest.raises(ValueError, match="Not enough free capacity"):
+        plan_transports(database, [Demand(1, 4, 4)], start_time=0)
+    assert database.get_stock(1) == [(1, 5)]
+    assert database.get_active_transports() == []
@@ -0,0 +1,42 @@
+from logistics.database.database import Database
+from logistics.routing.rerouting import reroute_after_connection_change
+
+
+def _create_dispatched_transports(database: Database) -> list[int]:
+    # 1 -> 2 -> 4 (connections 1, 2) with a slower detour 2 -> 3 -> 4 (connections 3, 4)
+    for i in range(1, 5):
+        database.add_warehouse(f"w{i}", "test", 10**6)
+    database.add_transport_route(1, 2, 10)
+    database.add_transport_route(2, 4, 10)
+    database.add_transport_route(2, 3, 10)
+    database.add_transport_route(3, 4, 10)
+    database.add_product("box", 1)
+    database.add_stock(1, 1, 10)
+    return database.create_transports([(1, 4, [1, 2], {1: 5}), (1, 4, [1, 2], {1: 5})], start_time=0)
+
+
+def test_affected_transports_are_replanned(database: Database):
+    transport_ids = _create_dispatched_transports(database)
+
+    report = reroute_after_connection_change(
+        database, 2, lambda: database.change_warehouse_connection_transportation_target(2, 100)
+    )
+
+    assert report.affected == 2
+    assert report.rerouted == 2
+    assert report.unreachable == []
+    for transport_id in transport_ids:
+        assert [stop[4] for stop in database.get_planned_stops(transport_id)] == [3, 4]
+
+
+def test_faster_connection_keeps_the_plans(database: Database):
+    transport_ids = _create_dispatched_transports(database)
+
+    report = reroute_after_connection_change(
+        database, 2, lambda: database.change_warehouse_connection_transportation_target(2, 5)
+    )
+
+    assert report.affected == 2
+    assert report.rerouted == 0
+    for transport_id in transport_ids:
+        assert [stop[4] for stop in database.get_planned_stops(transport_id)] == [4]
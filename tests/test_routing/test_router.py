@@ -0,0 +1,59 @@
+import time
+
+from logistics.database.database import Database
+from logistics.routing.router import Router, RoutingAlgorithm
+
+
+def _wait_for_preprocessing(router: Router) -> None:
+    deadline = time.monotonic() + 10
+    while not router.preprocessing_ready:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_contraction_hierarchy_is_stored_and_reused(database: Database):
+    for i in range(1, 5):
+        database.add_warehouse(f"w{i}", "test", 100)
+    for source, target, minutes in ((1, 2, 5), (2, 3, 5), (3, 4, 5), (1, 4, 30)):
+        database.add_transport_route(source, target, minutes)
+
+    router = Router(RoutingAlgorithm.CH)
+    router.refresh(database)
+    _wait_for_preprocessing(router)
+    router.refresh(database)  # Persists the hierarchy built in the background
+    assert router.find_path(1, 4).cost == 15
+    assert router.accelerated_queries == 1
+
+    # A restarted router loads the stored hierarchy instead of rebuilding it
+    restarted = Router(RoutingAlgorithm.CH)
+    restarted.refresh(database)
+    assert restarted.preprocessing_ready
+
+    # Changing the connections makes it stale, Dijkstra answers until the rebuild finishes
+    database.change_warehouse_connection_transportation_target(4, 10)
+    restarted.refresh(database)
+    assert restarted.find_path(1, 4).cost == 10
+
+
+def test_router_without_building_only_loads_the_stored_hierarchy(database: Database):
+    for i in range(1, 4):
+        database.add_warehouse(f"w{i}", "test", 100)
+    database.add_transport_route(1, 2, 5)
+    database.add_transport_route(2, 3, 5)
+
+    loader = Router(RoutingAlgorithm.CH, build_hierarchy=False)
+    loader.refresh(database)
+    time.sleep(0.1)
+    assert not loader.preprocessing_ready
+    assert database.get_contraction_hierarchy() is None
+    assert loader.find_path(1, 3).cost == 10  # Dijkstra
+
+    # Picked up once another router stored it, without a change of the connections
+    builder = Router(RoutingAlgorithm.CH)
+    builder.refresh(database)
+    _wait_for_preprocessing(builder)
+    builder.refresh(database)
+    assert not loader.refresh(database)
+    assert loader.preprocessing_ready
+    assert loader.find_path(1, 3).cost == 10
+    assert loader.accelerated_queries == 1